@@ -0,0 +1,129 @@
+"""
+Benchmark da leitura das mensagens recebidas (ver ConnectionManager.handle_message).
+
+Compara, sobre a mesma mistura de mensagens de uma partida (quase tudo
+jogadas, algum chat, resync ocasional):
+
+- "legacy": json.loads, cadeia de if/elif pelo campo "action" e o modelo
+  validado a partir do dict (XAction(**data)), como era antes
+- "adapter": client_action_adapter.validate_json (parse e validação numa
+  passada só, na união discriminada) e a tabela de despacho
+
+Os handlers não fazem nada: mede só leitura, validação e despacho.
+
+Uso (a partir de backend/):
+    python -m app.bench_dispatch --messages 20000
+"""
+
+import argparse
+import json
+import random
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from .models import (
+    AddBotAction, ChatAction, CreateRoomAction, JoinRoomAction, PassTurnAction, PlayCardAction,
+    PlaySpecialAction, ResyncAction, StartGameAction, client_action_adapter
+)
+
+# (peso, mensagem) - proporções aproximadas de uma partida
+MESSAGE_MIX = (
+    (60, {"action": "play_card", "room_id": "ABC123", "card_id": "1042"}),
+    (8, {"action": "play_card", "room_id": "ABC123", "card_id": "1051", "as_value": 7}),
+    (15, {"action": "play_special", "room_id": "ABC123", "card_id": "2017", "type": "plus2"}),
+    (8, {"action": "pass_turn", "room_id": "ABC123"}),
+    (6, {"action": "chat", "room_id": "ABC123", "message": "boa jogada!"}),
+    (2, {"action": "resync", "room_id": "ABC123"}),
+    (1, {"action": "join_room", "room_id": "ABC123", "nickname": "Alice"})
+)
+
+def make_messages(count: int, seed: int = 0) -> List[str]:
+    """Mensagens JSON sorteadas de MESSAGE_MIX"""
+    rng = random.Random(seed)
+    weights = [weight for weight, _ in MESSAGE_MIX]
+    messages = [message for _, message in MESSAGE_MIX]
+    return [json.dumps(message) for message in rng.choices(messages, weights, k=count)]
+
+def _noop(player_id: str, action: Any):
+    pass
+
+def legacy_dispatch(message: str):
+    """Leitura antiga: json.loads + if/elif + validação do modelo"""
+    data = json.loads(message)
+    action = data.get("action")
+    if action == "create_room":
+        _noop("p", CreateRoomAction(**data))
+    elif action == "join_room":
+        _noop("p", JoinRoomAction(**data))
+    elif action == "start_game":
+        _noop("p", StartGameAction(**data))
+    elif action == "play_card":
+        _noop("p", PlayCardAction(**data))
+    elif action == "play_special":
+        _noop("p", PlaySpecialAction(**data))
+    elif action == "pass_turn":
+        _noop("p", PassTurnAction(**data))
+    elif action == "chat":
+        _noop("p", ChatAction(**data))
+    elif action == "add_bot":
+        _noop("p", AddBotAction(**data))
+    elif action == "resync":
+        _noop("p", ResyncAction(**data))
+
+HANDLERS: Dict[str, Callable[[str, Any], None]] = {
+    name: _noop for name in (
+        "create_room", "join_room", "start_game", "play_card", "play_special",
+        "pass_turn", "chat", "add_bot", "resync"
+    )
+}
+
+def adapter_dispatch(message: str):
+    """Leitura atual: validação compilada da união + tabela de despacho"""
+    action = client_action_adapter.validate_json(message)
+    HANDLERS[action.action]("p", action)
+
+def _best_time(fn: Callable[[str], None], messages: List[str], repeats: int) -> float:
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        for message in messages:
+            fn(message)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def compare_dispatch(messages: List[str], repeats: int = 5) -> Dict[str, Any]:
+    """Tempo por mensagem e vazão de cada forma de leitura"""
+    results = {}
+    for name, fn in (("legacy", legacy_dispatch), ("adapter", adapter_dispatch)):
+        elapsed = _best_time(fn, messages, repeats)
+        results[name] = {
+            "us_per_message": round(elapsed / len(messages) * 1e6, 3),
+            "messages_per_second": round(len(messages) / elapsed)
+        }
+    results["adapter"]["speedup"] = round(results["legacy"]["us_per_message"] / results["adapter"]["us_per_message"], 2)
+    return {"messages": len(messages), "results": results}
+
+def format_report(report: Dict[str, Any]) -> str:
+    lines = [
+        f"Messages: {report['messages']}",
+        f"{'path':<10}{'us/msg':>10}{'msg/s':>12}{'speedup':>9}"
+    ]
+    for name, result in report["results"].items():
+        lines.append(
+            f"{name:<10}{result['us_per_message']:>10}{result['messages_per_second']:>12}{result.get('speedup', 1.0):>9}"
+        )
+    return "\n".join(lines)
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Compare inbound websocket message parsing and dispatch")
+    parser.add_argument("--messages", type=int, default=20000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeats", type=int, default=5, help="timing repetitions (best is reported)")
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    args = parser.parse_args(argv)
+
+    report = compare_dispatch(make_messages(args.messages, args.seed), args.repeats)
+    print(json.dumps(report, indent=2) if args.json else format_report(report))
+
+if __name__ == "__main__":
+    main()
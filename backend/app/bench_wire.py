@@ -0,0 +1,151 @@
+"""
+Benchmark das codificações do websocket (ver services/wire.py).
+
+Grava o tráfego real que um jogador recebe em partidas simuladas (frames
+"batch" com eventos + patch, room_state completo na entrada) pelo
+ConnectionManager, e compara, sobre as mesmas mensagens, tamanho em bytes e
+tempo de codificação/decodificação de cada codec disponível.
+
+Uso (a partir de backend/):
+    python -m app.bench_wire --games 20 --players 8
+
+Os codecs binários só aparecem com as dependências opcionais instaladas
+(msgpack, cbor2; declaradas em requirements.txt).
+"""
+
+import argparse
+import asyncio
+import json
+import time
+from typing import Any, Dict, List, Optional
+
+from .services.room_manager import room_manager
+from .services.wire import CODECS
+from .engine.state import GameStateManager
+from .ws import ConnectionManager
+
+DEFAULT_MAX_TURNS = 2000
+
+class _RecordingSocket:
+    """Socket falso que guarda os frames recebidos"""
+
+    def __init__(self):
+        self.frames: List[Any] = []
+
+    async def send_text(self, text: str):
+        self.frames.append(text)
+
+    async def send_bytes(self, data: bytes):
+        self.frames.append(data)
+
+    async def close(self, code: int = 1000):
+        pass
+
+async def _record_game(manager: ConnectionManager, seed: int, players: int, max_turns: int) -> List[Any]:
+    """Uma partida com um jogador conectado (jogando como o Greedy) e bots nos outros assentos"""
+    viewer_id = f"viewer-{seed}"
+    room = room_manager.create_room("Viewer", players, viewer_id)
+    difficulties = ("MID", "HIGH", "LOW")
+    for index in range(players - 1):
+        manager.bot_manager.add_bot_to_room(room, difficulties[index % len(difficulties)])
+
+    socket = _RecordingSocket()
+    manager.active_connections[viewer_id] = socket
+    manager.player_connections[socket] = viewer_id
+    await manager.broadcast_room_state(room.id)
+    await manager.drain()
+
+    greedy = manager.bot_manager.strategies["MID"]
+    manager.game_engine.start_game(room, seed)
+    manager._queue_events(room, [
+        {"event": "round_started", "limit": room.round_limit},
+        {"event": "turn_changed", "player_id": room.current_turn}
+    ])
+    await manager.drain()
+
+    for _ in range(max_turns):
+        if GameStateManager.check_game_over(room):
+            break
+        player = GameStateManager.get_player_by_id(room, room.current_turn)
+        action = greedy.choose_action(room, player, manager.game_engine)
+        result = manager.game_engine.apply_action(room, player.id, action)
+        if not result["success"]:
+            break
+        await manager._handle_game_events(room, result["events"])
+        manager.bot_scheduler.stop(room.id)
+        await manager.drain()
+
+    del manager.active_connections[viewer_id]
+    del manager.player_connections[socket]
+    await room_manager.remove_room(room.id)
+    return socket.frames
+
+def record_traffic(games: int, players: int = 8, seed: int = 0, max_turns: int = DEFAULT_MAX_TURNS) -> List[Dict[str, Any]]:
+    """Mensagens (já decodificadas) recebidas por um jogador em `games` partidas"""
+    manager = ConnectionManager()
+
+    async def run():
+        frames = []
+        for game in range(games):
+            frames.extend(await _record_game(manager, seed + game, players, max_turns))
+        return frames
+
+    return [json.loads(frame) for frame in asyncio.run(run())]
+
+def _best_time(fn, repeats: int) -> float:
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def compare_codecs(messages: List[Dict[str, Any]], repeats: int = 5) -> Dict[str, Any]:
+    """Tamanho e tempos de cada codec sobre as mesmas mensagens"""
+    results = {}
+    for name, codec in CODECS.items():
+        encoded = [codec.encode(message) for message in messages]
+        assert [codec.decode(payload) for payload in encoded] == messages, f"{name} round trip failed"
+        sizes = [len(payload.encode() if isinstance(payload, str) else payload) for payload in encoded]
+        encode_time = _best_time(lambda: [codec.encode(message) for message in messages], repeats)
+        decode_time = _best_time(lambda: [codec.decode(payload) for payload in encoded], repeats)
+        results[name] = {
+            "bytes": sum(sizes),
+            "bytes_per_frame": round(sum(sizes) / len(sizes), 1),
+            "encode_us_per_frame": round(encode_time / len(messages) * 1e6, 2),
+            "decode_us_per_frame": round(decode_time / len(messages) * 1e6, 2)
+        }
+
+    baseline = results["somo.json"]["bytes"]
+    for result in results.values():
+        result["size_vs_json"] = round(result["bytes"] / baseline, 3)
+    return {"frames": len(messages), "codecs": results}
+
+def format_report(report: Dict[str, Any]) -> str:
+    lines = [
+        f"Frames: {report['frames']} (games: {report['games']}, players: {report['players']})",
+        f"{'codec':<18}{'bytes':>12}{'B/frame':>10}{'vs json':>9}{'enc us':>9}{'dec us':>9}"
+    ]
+    for name, result in report["codecs"].items():
+        lines.append(
+            f"{name:<18}{result['bytes']:>12}{result['bytes_per_frame']:>10}{result['size_vs_json']:>9}"
+            f"{result['encode_us_per_frame']:>9}{result['decode_us_per_frame']:>9}"
+        )
+    return "\n".join(lines)
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Compare websocket wire encodings on simulated game traffic")
+    parser.add_argument("--games", type=int, default=20)
+    parser.add_argument("--players", type=int, default=8, help="seats per room (1 connected player + bots)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--max-turns", type=int, default=DEFAULT_MAX_TURNS)
+    parser.add_argument("--repeats", type=int, default=5, help="timing repetitions (best is reported)")
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    args = parser.parse_args(argv)
+
+    messages = record_traffic(args.games, args.players, args.seed, args.max_turns)
+    report = {"games": args.games, "players": args.players, **compare_codecs(messages, args.repeats)}
+    print(json.dumps(report, indent=2) if args.json else format_report(report))
+
+if __name__ == "__main__":
+    main()
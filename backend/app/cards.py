@@ -0,0 +1,277 @@
+"""
+Estruturas de cartas usadas pela engine (sem dependência dos modelos Pydantic).
+
+Fica fora de `engine/` para que `models.py` possa usá-las como campos sem
+criar importação circular com os módulos da engine.
+
+Codificação compacta: cada carta é um int
+    bits 0-3  -> face (0-9 = números, 10+ = especiais)
+    bits 4-7  -> valor escolhido + 1 para um Joker jogado (0 = sem valor)
+    bits 8+   -> id sequencial da carta dentro da sala (1..90)
+
+A engine trabalha só com esses ints; a conversão para CardComp/dict acontece
+apenas na borda (eventos e mensagens para os clientes).
+"""
+
+import random
+from itertools import islice
+from typing import Any, Callable, Dict, Iterable, Iterator, List, MutableSequence, Optional, Union
+
+# Faces das cartas
+FACE_JOKER = 10
+FACE_PLUS2 = 11
+FACE_TIMES2 = 12
+FACE_RESET0 = 13
+FACE_REVERSE = 14
+FACE_COUNT = 15
+
+# Nome de cada face (mesmos valores de models.CardKind)
+FACE_KINDS = ("number",) * 10 + ("joker", "plus2", "times2", "reset0", "reverse")
+
+# Tipo de carta especial (como recebido em play_special) -> face
+SPECIAL_FACES = {
+    "plus2": FACE_PLUS2,
+    "times2": FACE_TIMES2,
+    "reset0": FACE_RESET0,
+    "reverse": FACE_REVERSE
+}
+
+FACE_MASK = 0xF
+VALUE_SHIFT = 4
+VALUE_MASK = 0xF << VALUE_SHIFT
+UID_SHIFT = 8
+
+# Composição do baralho: face -> número de cópias (90 cartas)
+DECK_COMPOSITION = {
+    **{value: 6 for value in range(10)},  # 60 cartas numéricas: 6 de cada 0-9
+    FACE_REVERSE: 6,
+    FACE_TIMES2: 6,
+    FACE_PLUS2: 7,
+    FACE_RESET0: 7,
+    FACE_JOKER: 4
+}
+
+def encode_card(uid: int, face: int) -> int:
+    """Codifica uma carta a partir do id sequencial e da face"""
+    return (uid << UID_SHIFT) | face
+
+def card_uid(card: int) -> int:
+    """Id sequencial da carta (único dentro da sala)"""
+    return card >> UID_SHIFT
+
+def card_face(card: int) -> int:
+    return card & FACE_MASK
+
+def card_kind(card: int) -> str:
+    return FACE_KINDS[card & FACE_MASK]
+
+def card_value(card: int) -> Optional[int]:
+    """Valor numérico da carta (Joker só tem valor depois de jogado)"""
+    face = card & FACE_MASK
+    if face < FACE_JOKER:
+        return face
+    if face == FACE_JOKER and card & VALUE_MASK:
+        return ((card & VALUE_MASK) >> VALUE_SHIFT) - 1
+    return None
+
+def with_joker_value(card: int, value: int) -> int:
+    """Registra o valor escolhido para um Joker jogado"""
+    return (card & ~VALUE_MASK) | ((value + 1) << VALUE_SHIFT)
+
+def clear_joker_value(card: int) -> int:
+    return card & ~VALUE_MASK
+
+def parse_card_id(card_id: Union[str, int]) -> Optional[int]:
+    """Converte o id recebido do cliente ("17") no id sequencial; None se inválido"""
+    if isinstance(card_id, int):
+        return card_id
+    try:
+        return int(card_id)
+    except (TypeError, ValueError):
+        return None
+
+def card_to_dict(card: int) -> Dict[str, Any]:
+    """Representação de uma carta para o fio (mesmo formato de CardComp)"""
+    return {"id": str(card >> UID_SHIFT), "kind": FACE_KINDS[card & FACE_MASK], "value": card_value(card)}
+
+def _build_full_deck() -> tuple:
+    cards = []
+    for face, copies in DECK_COMPOSITION.items():
+        for _ in range(copies):
+            cards.append(encode_card(len(cards) + 1, face))
+    return tuple(cards)
+
+# Baralho completo não embaralhado; cada jogo parte de uma cópia desta tupla
+FULL_DECK = _build_full_deck()
+
+class Deck:
+    """
+    Monte de compra com cursor e pilha de descarte (cartas codificadas como int)
+
+    - Comprar k cartas custa O(k): o cursor avança, a lista não é copiada
+    - Quando o monte acaba, o descarte (exceto a carta do topo) é
+      reembaralhado de forma transparente e volta para o monte
+    """
+
+    __slots__ = ("cards", "pos", "discard_pile", "shuffle")
+
+    def __init__(self, cards: Optional[List[int]] = None, discard_pile: Optional[List[int]] = None,
+                 shuffle: Callable[[MutableSequence[int]], None] = random.shuffle):
+        self.cards: List[int] = cards if cards is not None else []
+        self.pos = 0  # Índice da próxima carta a ser comprada
+        self.discard_pile: List[int] = discard_pile if discard_pile is not None else []
+        self.shuffle = shuffle
+
+    def __len__(self) -> int:
+        return len(self.cards) - self.pos
+
+    def __iter__(self) -> Iterator[int]:
+        """Itera sobre as cartas restantes no monte, do topo para o fundo"""
+        return islice(self.cards, self.pos, None)
+
+    def draw(self, count: int) -> List[int]:
+        """
+        Retira até `count` cartas do topo do monte
+
+        Se o monte não tiver cartas suficientes, reembaralha o descarte antes.
+        Retorna menos cartas apenas se monte + descarte não forem suficientes.
+        """
+        if count > len(self):
+            self.refill()
+
+        end = min(self.pos + count, len(self.cards))
+        drawn = self.cards[self.pos:end]
+        self.pos = end
+        return drawn
+
+    def deal(self, hands: Iterable[List[int]], count: int):
+        """Distribui `count` cartas para cada mão, na ordem dada"""
+        for hand in hands:
+            hand.extend(self.draw(count))
+
+    def refill(self, shuffle: Optional[Callable[[MutableSequence[int]], None]] = None):
+        """
+        Devolve o descarte (exceto a carta do topo) ao fundo do monte, embaralhado
+
+        As cartas que ainda restavam no monte continuam no topo. O custo é
+        O(monte + descarte), mas só acontece quando o monte se esgota.
+
+        Args:
+            shuffle: Embaralhador a usar no lugar do do monte (jogadas hipotéticas)
+        """
+        if len(self.discard_pile) <= 1:
+            return
+
+        # Jokers voltam ao monte sem o valor com que foram jogados
+        recycled = [clear_joker_value(card) for card in self.discard_pile[:-1]]
+        (shuffle or self.shuffle)(recycled)
+
+        self.cards = self.cards[self.pos:] + recycled
+        self.pos = 0
+        del self.discard_pile[:-1]
+
+    def discard(self, card: int):
+        """Coloca uma carta no topo da pilha de descarte"""
+        self.discard_pile.append(card)
+
+    def top_discard(self) -> Optional[int]:
+        """Retorna a carta do topo do descarte, ou None se estiver vazio"""
+        return self.discard_pile[-1] if self.discard_pile else None
+
+class Hand:
+    """
+    Mão de um jogador indexada por id e por face
+
+    - cards: id sequencial -> carta, para achar/remover uma carta em O(1)
+    - faces: para cada face, uma pilha com os ids das cartas dessa face
+      (ordem de chegada), o que dá contagem por tipo/valor e uma carta
+      representativa (o topo) em O(1). Tirar o topo e devolver a carta com
+      append deixa a mão como estava, sem depender do resto da ordem
+    """
+
+    __slots__ = ("cards", "faces")
+
+    def __init__(self, cards: Iterable[int] = ()):
+        self.cards: Dict[int, int] = {}
+        self.faces: List[List[int]] = [[] for _ in range(FACE_COUNT)]
+        self.extend(cards)
+
+    def __len__(self) -> int:
+        return len(self.cards)
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(self.cards.values())
+
+    def __contains__(self, card: int) -> bool:
+        return self.cards.get(card >> UID_SHIFT) == card
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, Hand):
+            return self.cards == other.cards
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return f"Hand({list(self.cards.values())})"
+
+    def append(self, card: int):
+        uid = card >> UID_SHIFT
+        self.cards[uid] = card
+        self.faces[card & FACE_MASK].append(uid)
+
+    def extend(self, cards: Iterable[int]):
+        for card in cards:
+            self.append(card)
+
+    def get(self, uid: int) -> Optional[int]:
+        """Carta com o id dado, ou None se não estiver na mão"""
+        return self.cards.get(uid)
+
+    def remove(self, uid: int) -> Optional[int]:
+        """Remove e retorna a carta com o id dado, ou None se não estiver na mão"""
+        card = self.cards.pop(uid, None)
+        if card is not None:
+            bucket = self.faces[card & FACE_MASK]
+            if bucket[-1] == uid:
+                bucket.pop()
+            else:
+                bucket.remove(uid)  # No máximo as cópias de uma face
+        return card
+
+    def count(self, face: int) -> int:
+        return len(self.faces[face])
+
+    def has(self, face: int) -> bool:
+        return bool(self.faces[face])
+
+    def signature(self) -> tuple:
+        """Contagem de cada face (a mão como multiconjunto, sem os ids das cartas)"""
+        return tuple(map(len, self.faces))
+
+    def face_mask(self) -> int:
+        """Bits das faces presentes na mão (bit f = tem ao menos uma carta da face f)"""
+        mask = 0
+        for face, bucket in enumerate(self.faces):
+            if bucket:
+                mask |= 1 << face
+        return mask
+
+    def first(self, face: int) -> Optional[int]:
+        """Uma carta da face dada (o topo da pilha: a que chegou por último), ou None"""
+        bucket = self.faces[face]
+        if not bucket:
+            return None
+        return self.cards[bucket[-1]]
+
+    def lowest_number(self, max_value: int = 9) -> Optional[int]:
+        """Menor carta numérica com valor <= max_value (no máximo 10 consultas)"""
+        for value in range(min(max_value, 9) + 1):
+            if self.faces[value]:
+                return value
+        return None
+
+    def highest_number(self, max_value: int = 9) -> Optional[int]:
+        """Maior carta numérica com valor <= max_value (no máximo 10 consultas)"""
+        for value in range(min(max_value, 9), -1, -1):
+            if self.faces[value]:
+                return value
+        return None
@@ -0,0 +1,471 @@
+"""
+Engine em lote (vetorizada com NumPy) para simulação em massa.
+
+Mantém N partidas como arrays e avança todas em lockstep, um turno por
+passo, com versões vetorizadas das estratégias Random/Greedy/Defensive.
+Reproduz exatamente as regras de rules.py (ver tests/test_batch.py, que
+compara passo a passo com GameEngine); serve para estudos de equilíbrio
+com milhões de partidas.
+
+Dependência opcional: requer `numpy` (declarado em requirements-dev.txt),
+que não faz parte do servidor e por isso este módulo não é importado por
+engine/__init__.py.
+
+Representação (n = partidas, p = assentos, f = faces de cards.py):
+    hands[n, p, f]      contagem de cartas de cada face na mão
+    deck[n, 90]         faces do monte; cursor/deck_len delimitam o que resta
+    discard[n, 90]      faces do descarte (discard_len = tamanho)
+    order[n, p]         assentos na ordem dos turnos; pos_of_seat é o inverso
+    total, limit        soma acumulada e limite da rodada
+    pend_kind/pend_src  efeito pendente (nenhum/+2/x2) e assento de origem
+"""
+
+import time
+from typing import Any, Dict, List, Mapping, Optional, Sequence
+
+import numpy as np
+
+from ..cards import (
+    FACE_COUNT, FACE_JOKER, FACE_PLUS2, FACE_TIMES2, FACE_RESET0, FACE_REVERSE,
+    FULL_DECK, card_face
+)
+from .bots import GREEDY_DANGER_THRESHOLD, GREEDY_RESET_THRESHOLD, BotManager
+
+# Código de ação "passar o turno" (as demais ações são a face jogada; Joker vale 0)
+ACTION_PASS = FACE_COUNT
+
+PEND_NONE = 0
+PEND_ADD = 1   # +2
+PEND_MUL = 2   # x2
+
+POLICY_RANDOM = 0
+POLICY_GREEDY = 1
+POLICY_DEFENSIVE = 2
+
+# Dificuldade (BotManager) -> política vetorizada equivalente
+DIFFICULTY_POLICIES = {
+    "LOW": POLICY_RANDOM,
+    "MID": POLICY_GREEDY,
+    "HIGH": POLICY_DEFENSIVE
+}
+
+# Limiares da Greedy que a política vetorizada consulta (a Defensive não tem
+# parâmetros: o =0 já é a 1ª prioridade dela)
+POLICY_PARAMS = ("reset_threshold", "danger_threshold")
+
+def strategy_params(strategy: Any) -> Dict[str, float]:
+    """Limiares de uma estratégia do BotManager no formato de BatchEngine(params=...)"""
+    return {name: getattr(strategy, name) for name in POLICY_PARAMS if hasattr(strategy, name)}
+
+DECK_SIZE = len(FULL_DECK)
+FULL_FACES = np.array([card_face(card) for card in FULL_DECK], dtype=np.int8)
+HAND_SIZE = 7
+STARTING_TOKENS = 3
+
+class BatchState:
+    """Estado de n partidas com p assentos cada"""
+
+    def __init__(self, n: int, p: int):
+        self.n = n
+        self.p = p
+        self.hands = np.zeros((n, p, FACE_COUNT), dtype=np.int16)
+        self.tokens = np.full((n, p), STARTING_TOKENS, dtype=np.int8)
+        self.active = np.ones((n, p), dtype=bool)
+        self.order = np.tile(np.arange(p, dtype=np.int8), (n, 1))
+        self.pos_of_seat = self.order.copy()
+        self.cur = np.zeros(n, dtype=np.int64)
+        self.clockwise = np.ones(n, dtype=bool)
+        self.total = np.zeros(n, dtype=np.int16)
+        self.limit = np.zeros(n, dtype=np.int16)
+        self.pend_kind = np.zeros(n, dtype=np.int8)
+        self.pend_src = np.zeros(n, dtype=np.int64)
+        self.deck = np.zeros((n, DECK_SIZE), dtype=np.int8)
+        self.deck_len = np.zeros(n, dtype=np.int64)
+        self.cursor = np.zeros(n, dtype=np.int64)
+        self.discard = np.zeros((n, DECK_SIZE), dtype=np.int8)
+        self.discard_len = np.zeros(n, dtype=np.int64)
+        self.done = np.zeros(n, dtype=bool)
+        self.winner = np.full(n, -1, dtype=np.int64)
+        self.turns = np.zeros(n, dtype=np.int64)
+        self.penalties = np.zeros((n, p), dtype=np.int16)
+
+    @classmethod
+    def new_games(cls, n: int, p: int, rng: np.random.Generator) -> "BatchState":
+        """Equivalente vetorizado de GameEngine.start_game para n partidas"""
+        state = cls(n, p)
+        rows = np.arange(n)
+
+        state.deck[:] = rng.permuted(np.tile(FULL_FACES, (n, 1)), axis=1)
+        state.deck_len[:] = DECK_SIZE
+
+        # 7 cartas para cada assento, na ordem dos assentos (room.players)
+        for seat in range(p):
+            faces = state.deck[:, seat * HAND_SIZE:(seat + 1) * HAND_SIZE]
+            for column in range(HAND_SIZE):
+                state.hands[rows, seat, faces[:, column]] += 1
+        state.cursor[:] = HAND_SIZE * p
+
+        state.order[:] = rng.permuted(state.order, axis=1)
+        state.pos_of_seat[:] = np.argsort(state.order, axis=1)
+        state.cur[:] = state.order[:, 0]
+        state.limit[:] = rng.integers(1, 21, n)
+        return state
+
+    @classmethod
+    def from_rooms(cls, rooms: Sequence[Any]) -> "BatchState":
+        """
+        Converte salas do GameEngine (todas com o mesmo número de jogadores)
+        para um BatchState; o assento é a posição em room.players
+        """
+        from .state import GameStateManager
+
+        p = len(rooms[0].players)
+        state = cls(len(rooms), p)
+        for g, room in enumerate(rooms):
+            seat_of = {player.id: seat for seat, player in enumerate(room.players)}
+            for seat, player in enumerate(room.players):
+                for face in range(FACE_COUNT):
+                    state.hands[g, seat, face] = player.hand.count(face)
+                state.tokens[g, seat] = player.tokens
+                state.active[g, seat] = not GameStateManager.is_player_eliminated(room, player.id)
+                state.penalties[g, seat] = STARTING_TOKENS - player.tokens
+
+            # Eliminados já saíram de turn_order: entram no fim, sem efeito
+            order = [seat_of[pid] for pid in room.turn_order]
+            order += [seat for seat in range(p) if seat not in order]
+            state.order[g] = order
+            state.pos_of_seat[g] = np.argsort(state.order[g])
+            state.cur[g] = seat_of[room.current_turn] if room.current_turn else -1
+            state.clockwise[g] = room.direction
+            state.total[g] = room.accumulated_sum
+            state.limit[g] = room.round_limit
+
+            pending = room.pending_effect
+            if pending:
+                state.pend_kind[g] = PEND_MUL if pending.multiplier else PEND_ADD
+                state.pend_src[g] = seat_of[pending.source_player_id]
+
+            remaining = [card_face(card) for card in room.deck]
+            state.deck[g, :len(remaining)] = remaining
+            state.deck_len[g] = len(remaining)
+            discarded = [card_face(card) for card in room.deck.discard_pile]
+            state.discard[g, :len(discarded)] = discarded
+            state.discard_len[g] = len(discarded)
+
+            state.done[g] = GameStateManager.check_game_over(room) is not None
+        return state
+
+class BatchEngine:
+    """
+    Avança um BatchState em lockstep
+
+    Args:
+        policies: Política de cada assento (POLICY_*)
+        params: Limiares da estratégia de cada assento (ver strategy_params);
+                os que faltarem usam os padrões de bots.py
+        rng: Gerador NumPy (rolagens do D20, política Random e reembaralhamentos)
+        shuffle_refill: Se False, o descarte volta ao monte sem embaralhar
+                        (usado no teste diferencial contra GameEngine)
+    """
+
+    def __init__(self, policies: Sequence[int], rng: Optional[np.random.Generator] = None,
+                 shuffle_refill: bool = True, params: Optional[Sequence[Mapping[str, float]]] = None):
+        self.policies = np.asarray(policies, dtype=np.int8)
+        params = params if params is not None else [{}] * len(self.policies)
+        self.reset_threshold = np.array([p.get("reset_threshold", GREEDY_RESET_THRESHOLD) for p in params])
+        self.danger_threshold = np.array([p.get("danger_threshold", GREEDY_DANGER_THRESHOLD) for p in params])
+        self.rng = rng if rng is not None else np.random.default_rng()
+        self.shuffle_refill = shuffle_refill
+
+    # ------------------------------------------------------------------
+    # Políticas
+    # ------------------------------------------------------------------
+
+    def choose_actions(self, state: BatchState, games: np.ndarray) -> np.ndarray:
+        """Ação (face jogada ou ACTION_PASS) do jogador da vez em cada partida"""
+        cur = state.cur[games]
+        hand = state.hands[games, cur]
+        total = state.total[games].astype(np.int64)
+        limit = state.limit[games].astype(np.int64)
+        room_left = limit - total
+
+        num_ok = (hand[:, :FACE_JOKER] > 0) & (np.arange(FACE_JOKER) <= room_left[:, None])
+        has_num = num_ok.any(axis=1)
+        lowest_num = np.argmax(num_ok, axis=1)
+        highest_num = FACE_JOKER - 1 - np.argmax(num_ok[:, ::-1], axis=1)
+        joker_ok = (hand[:, FACE_JOKER] > 0) & (room_left >= 0)
+        has = {face: hand[:, face] > 0 for face in (FACE_PLUS2, FACE_TIMES2, FACE_RESET0, FACE_REVERSE)}
+        any_move = has_num | joker_ok | has[FACE_PLUS2] | has[FACE_TIMES2] | has[FACE_RESET0] | has[FACE_REVERSE]
+
+        actions = np.full(len(games), ACTION_PASS, dtype=np.int64)
+        policy = self.policies[cur]
+
+        greedy = policy == POLICY_GREEDY
+        if greedy.any():
+            actions[greedy] = self._greedy(
+                total, limit, hand, has, num_ok, has_num, lowest_num, joker_ok,
+                state.pend_kind[games], state.pend_src[games], cur
+            )[greedy]
+
+        defensive = policy == POLICY_DEFENSIVE
+        if defensive.any():
+            actions[defensive] = self._defensive(has, has_num, highest_num, joker_ok)[defensive]
+
+        random_policy = policy == POLICY_RANDOM
+        if random_policy.any():
+            actions[random_policy] = self._random(hand[random_policy], num_ok[random_policy], joker_ok[random_policy])
+
+        return np.where(any_move, actions, ACTION_PASS)
+
+    @staticmethod
+    def _by_priority(has: Dict[int, np.ndarray], priority: Sequence[int]) -> np.ndarray:
+        """Primeira face (na ordem de prioridade) presente na mão, ou ACTION_PASS"""
+        choice = np.full(len(has[priority[0]]), ACTION_PASS, dtype=np.int64)
+        for face in reversed(priority):
+            choice = np.where(has[face], face, choice)
+        return choice
+
+    def _greedy(self, total, limit, hand, has, num_ok, has_num, lowest_num, joker_ok,
+                pend_kind, pend_src, cur) -> np.ndarray:
+        """GreedyBotStrategy vetorizada"""
+        specials = self._by_priority(has, (FACE_PLUS2, FACE_TIMES2, FACE_REVERSE, FACE_RESET0))
+
+        # Menor número; o Joker (valor 0) só perde para um 0 de verdade
+        numbers = np.where(num_ok[:, 0], 0,
+                  np.where(joker_ok, FACE_JOKER,
+                  np.where(has_num, lowest_num, ACTION_PASS)))
+        actions = np.where(numbers != ACTION_PASS, numbers, specials)
+
+        dangerous = (pend_kind == PEND_MUL) | ((pend_kind == PEND_ADD) & (total + 2 > limit * self.danger_threshold[cur]))
+        use_reverse = (pend_kind != PEND_NONE) & (pend_src != cur) & has[FACE_REVERSE] & dangerous
+        actions = np.where(use_reverse, FACE_REVERSE, actions)
+
+        use_reset = (total > limit * self.reset_threshold[cur]) & has[FACE_RESET0]
+        return np.where(use_reset, FACE_RESET0, actions)
+
+    def _defensive(self, has, has_num, highest_num, joker_ok) -> np.ndarray:
+        """DefensiveBotStrategy vetorizada (o =0 acima de 50% já é a 1ª prioridade)"""
+        specials = self._by_priority(has, (FACE_RESET0, FACE_REVERSE, FACE_PLUS2, FACE_TIMES2))
+        numbers = np.where(has_num, highest_num, np.where(joker_ok, FACE_JOKER, ACTION_PASS))
+        return np.where(specials != ACTION_PASS, specials, numbers)
+
+    def _random(self, hand, num_ok, joker_ok) -> np.ndarray:
+        """RandomBotStrategy vetorizada: sorteio ponderado pelo número de cartas"""
+        weights = hand.astype(np.float64)
+        weights[:, :FACE_JOKER] *= num_ok
+        weights[:, FACE_JOKER] *= joker_ok
+        cumulative = np.cumsum(weights, axis=1)
+        draw = self.rng.random(len(hand)) * cumulative[:, -1]
+        choice = np.argmax(cumulative > draw[:, None], axis=1)
+        return np.where(cumulative[:, -1] > 0, choice, ACTION_PASS)
+
+    # ------------------------------------------------------------------
+    # Regras
+    # ------------------------------------------------------------------
+
+    def _next_active(self, state: BatchState, games: np.ndarray, seats: np.ndarray) -> np.ndarray:
+        """Próximo assento ativo depois de `seats`, no sentido atual (-1 se nenhum)"""
+        p = state.p
+        pos = state.pos_of_seat[games, seats].astype(np.int64)
+        step = np.where(state.clockwise[games], 1, -1)
+        result = np.full(len(games), -1, dtype=np.int64)
+        for k in range(1, p):
+            candidate = state.order[games, (pos + k * step) % p].astype(np.int64)
+            result = np.where((result < 0) & state.active[games, candidate], candidate, result)
+        return result
+
+    def _refill(self, state: BatchState, g: int):
+        """Deck.refill para uma partida (caminho raro, fora do laço vetorizado)"""
+        discard_len = state.discard_len[g]
+        if discard_len <= 1:
+            return
+        remaining = state.deck[g, state.cursor[g]:state.deck_len[g]]
+        recycled = state.discard[g, :discard_len - 1]
+        if self.shuffle_refill:
+            recycled = self.rng.permutation(recycled)
+        refilled = np.concatenate([remaining, recycled])
+        state.deck[g, :len(refilled)] = refilled
+        state.deck_len[g] = len(refilled)
+        state.cursor[g] = 0
+        state.discard[g, 0] = state.discard[g, discard_len - 1]
+        state.discard_len[g] = 1
+
+    def _draw(self, state: BatchState, games: np.ndarray, seats, count: int):
+        """Cada (partida, assento) compra `count` cartas, uma de cada vez"""
+        seats = np.broadcast_to(seats, games.shape)
+        for _ in range(count):
+            empty = state.cursor[games] >= state.deck_len[games]
+            for g in games[empty]:
+                self._refill(state, g)
+            ok = state.cursor[games] < state.deck_len[games]
+            g, s = games[ok], seats[ok]
+            faces = state.deck[g, state.cursor[g]]
+            state.hands[g, s, faces] += 1
+            state.cursor[g] += 1
+
+    def _reset_round(self, state: BatchState, games: np.ndarray, rolls: Optional[np.ndarray]):
+        state.total[games] = 0
+        state.pend_kind[games] = PEND_NONE
+        if rolls is None:
+            state.limit[games] = self.rng.integers(1, 21, len(games))
+        else:
+            state.limit[games] = rolls[games]
+
+    def _advance(self, state: BatchState, games: np.ndarray):
+        following = self._next_active(state, games, state.cur[games])
+        state.cur[games] = np.where(following < 0, state.cur[games], following)
+
+    def step(self, state: BatchState, rolls: Optional[np.ndarray] = None,
+             actions: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Avança um turno em todas as partidas não terminadas
+
+        Args:
+            rolls: Rolagens do D20 por partida (usadas só onde a rodada reinicia);
+                   None para rolar com self.rng
+            actions: Ações já escolhidas por partida; None para usar as políticas
+
+        Returns:
+            Ação aplicada em cada partida (-1 nas terminadas)
+        """
+        games = np.flatnonzero(~state.done)
+        applied = np.full(state.n, -1, dtype=np.int64)
+        if len(games) == 0:
+            return applied
+
+        chosen = self.choose_actions(state, games) if actions is None else actions[games]
+        applied[games] = chosen
+        cur = state.cur[games]
+
+        # Carta jogada: sai da mão e vai para o descarte
+        played = chosen != ACTION_PASS
+        g, c, f = games[played], cur[played], chosen[played]
+        state.hands[g, c, f] -= 1
+        state.discard[g, state.discard_len[g]] = f
+        state.discard_len[g] += 1
+
+        # Números e Joker: soma o valor base e consome o efeito pendente
+        is_number = chosen <= FACE_JOKER
+        numbers = games[is_number]
+        state.total[numbers] += np.where(chosen[is_number] == FACE_JOKER, 0, chosen[is_number]).astype(np.int16)
+        state.pend_kind[numbers] = PEND_NONE
+        hit = state.total[numbers] == state.limit[numbers]
+        exact = numbers[hit]
+        self._draw(state, exact, state.cur[exact], 2)
+        self._reset_round(state, exact, rolls)
+        self._advance(state, numbers[~hit])
+
+        # Especiais
+        is_special = played & ~is_number
+        specials, special_faces = games[is_special], chosen[is_special]
+        state.total[specials[special_faces == FACE_RESET0]] = 0
+        for face, kind in ((FACE_PLUS2, PEND_ADD), (FACE_TIMES2, PEND_MUL)):
+            g = specials[special_faces == face]
+            state.pend_kind[g] = kind
+            state.pend_src[g] = state.cur[g]
+        reversed_games = specials[special_faces == FACE_REVERSE]
+        state.clockwise[reversed_games] = ~state.clockwise[reversed_games]
+        bounced = reversed_games[state.pend_kind[reversed_games] != PEND_NONE]
+        state.cur[bounced] = state.pend_src[bounced]
+        self._advance(state, specials)
+
+        # Passar: punição, eliminação, todos compram 2 e a rodada reinicia
+        passed = games[~played]
+        seats = cur[~played]
+        state.tokens[passed, seats] -= 1
+        state.penalties[passed, seats] += 1
+        eliminated = state.tokens[passed, seats] <= 0
+        out, out_seats = passed[eliminated], seats[eliminated]
+        successor = self._next_active(state, out, out_seats)
+        state.active[out, out_seats] = False
+        state.cur[out] = successor
+        for seat in range(state.p):
+            self._draw(state, passed[state.active[passed, seat]], seat, 2)
+        self._reset_round(state, passed, rolls)
+
+        state.turns[games] += 1
+
+        # Fim de jogo: no máximo um jogador ativo
+        active_count = state.active[games].sum(axis=1)
+        over = games[active_count <= 1]
+        state.done[over] = True
+        state.winner[over] = np.where(state.active[over].any(axis=1), np.argmax(state.active[over], axis=1), -1)
+
+        return applied
+
+    def run(self, state: BatchState, max_turns: int = 5000) -> BatchState:
+        """Avança todas as partidas até o fim (ou até max_turns turnos)"""
+        for _ in range(max_turns):
+            if state.done.all():
+                break
+            self.step(state)
+        return state
+
+def run_batch_simulation(games: int, difficulties: Sequence[str], seed: int = 0,
+                         max_turns: int = 5000, chunk_size: int = 100_000,
+                         strategies: Optional[Mapping[str, Any]] = None) -> Dict[str, Any]:
+    """
+    Equivalente vetorizado de sim.run_simulation (mesmo formato de relatório)
+
+    As partidas rodam em blocos de `chunk_size` para limitar a memória.
+
+    Args:
+        strategies: Estratégia de cada dificuldade, de onde vêm os limiares
+                    (padrão: as do BotManager, com SOMO_BOT_PARAMS aplicado)
+    """
+    difficulties = list(difficulties)
+    unknown = [d for d in difficulties if d not in DIFFICULTY_POLICIES]
+    if unknown:
+        raise ValueError(f"Unknown difficulties: {unknown}")
+    if len(difficulties) < 2:
+        raise ValueError("Need at least 2 players")
+
+    policies = [DIFFICULTY_POLICIES[d] for d in difficulties]
+    strategies = strategies if strategies is not None else BotManager().strategies
+    params = [strategy_params(strategies[d]) for d in difficulties]
+    rng = np.random.default_rng(seed)
+    p = len(difficulties)
+
+    wins = np.zeros(p, dtype=np.int64)
+    seat_penalties = np.zeros(p, dtype=np.int64)
+    histogram = np.zeros(STARTING_TOKENS * p + 1, dtype=np.int64)
+    total_turns = 0
+    unfinished = 0
+
+    start = time.perf_counter()
+    for offset in range(0, games, chunk_size):
+        n = min(chunk_size, games - offset)
+        state = BatchEngine(policies, rng, params=params).run(BatchState.new_games(n, p, rng), max_turns)
+
+        finished = state.winner >= 0
+        wins += np.bincount(state.winner[finished], minlength=p)
+        seat_penalties += state.penalties.sum(axis=0)
+        histogram += np.bincount(state.penalties.sum(axis=1), minlength=len(histogram))
+        total_turns += int(state.turns.sum())
+        unfinished += int((~finished).sum())
+    elapsed = time.perf_counter() - start
+
+    seats_per_difficulty: Dict[str, List[int]] = {}
+    for seat, difficulty in enumerate(difficulties):
+        seats_per_difficulty.setdefault(difficulty, []).append(seat)
+
+    return {
+        "games": games,
+        "unfinished": unfinished,
+        "players": difficulties,
+        "elapsed_sec": round(elapsed, 3),
+        "games_per_sec": round(games / elapsed, 1) if elapsed > 0 else None,
+        "avg_turns": round(total_turns / games, 2) if games else 0,
+        "win_rate": {
+            difficulty: round(int(wins[seats].sum()) / (games * len(seats)), 4) if games else 0
+            for difficulty, seats in seats_per_difficulty.items()
+        },
+        "penalties": {
+            "avg_per_game": round(int(seat_penalties.sum()) / games, 2) if games else 0,
+            "avg_per_seat": {
+                difficulty: round(int(seat_penalties[seats].sum()) / (games * len(seats)), 2) if games else 0
+                for difficulty, seats in seats_per_difficulty.items()
+            },
+            "histogram": {count: int(n) for count, n in enumerate(histogram) if n}
+        }
+    }
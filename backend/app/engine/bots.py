@@ -1,14 +1,78 @@
+import json
+import logging
+import os
 import random
-from typing import List, Dict, Any, Optional
-from ..models import RoomState, PlayerState, CardComp, CardKind
+from functools import partial
+from typing import Callable, Hashable, List, Dict, Any, NamedTuple, Optional, Union
+from ..cards import FACE_COUNT, FACE_MASK, FACE_JOKER, FACE_PLUS2, FACE_TIMES2, FACE_RESET0, FACE_REVERSE, Hand
+from ..models import RoomState, PlayerState
 from .state import GameStateManager
-from .rules import GameEngine
+from .rules import GameEngine, Move, PASS_MOVE
+from .mcts import MCTSSearch, Observation
+from .decision_cache import DecisionCache, decision_cache, pending_key, playable_faces
+from .policy import ACTION_PASS, ACTION_RESET0, ACTION_SKIP, MAX_LIMIT, SKIP_FACES, PolicyTable, abstract_hand
 import uuid
-import time
+
+logger = logging.getLogger(__name__)
+
+# Intervalo (em segundos) do "pensamento" simulado dos bots
+BOT_THINK_DELAY_RANGE = (5, 10)
+
+# Tempo de busca por jogada do bot EXPERT (segundos)
+MCTS_TIME_BUDGET = 1.0
+
+# Limiares padrão das heurísticas, em fração do limite da rodada
+# (valores ajustados podem vir de um arquivo, ver load_bot_params e app/tuner.py)
+GREEDY_RESET_THRESHOLD = 0.7
+GREEDY_DANGER_THRESHOLD = 0.8
+DEFENSIVE_RESET_THRESHOLD = 0.5
+
+# Arquivo JSON opcional com parâmetros das estratégias por dificuldade
+BOT_PARAMS_PATH = os.environ.get("SOMO_BOT_PARAMS")
+
+def _planned(action: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """Decisão já tomada em plan_action (função de módulo: picklable)"""
+    return action
+
+class SearchDecision(NamedTuple):
+    """Ação escolhida por uma busca e as métricas dela ({"iterations", "nodes_per_sec"})"""
+    action: Optional[Dict[str, Any]]
+    stats: Dict[str, float]
+
+def planned_action(result: Union[SearchDecision, Optional[Dict[str, Any]]]) -> Optional[Dict[str, Any]]:
+    """Ação do retorno de uma decisão planejada (a ação ou um SearchDecision)"""
+    return result.action if isinstance(result, SearchDecision) else result
 
 class BotStrategy:
     """Classe base para estratégias de bot"""
     
+    # Onde a decisão roda (ver services/bot_executor.py):
+    # "inline" no event loop, "thread" ou "process" num pool
+    execution = "inline"
+    
+    def plan_action(self, room: RoomState, bot_player: PlayerState, game_engine: GameEngine) -> Callable[[], Optional[Dict[str, Any]]]:
+        """
+        Separa a decisão em duas fases
+        
+        A leitura da sala acontece aqui, no event loop; o retorno é uma
+        função sem argumentos que produz a ação sem tocar na sala, e que
+        pode rodar em outra thread (ou, se for picklable, em outro processo).
+        Estratégias de busca podem produzir um SearchDecision, que leva
+        junto as métricas da busca (ver planned_action). Por padrão decide
+        na hora.
+        """
+        action = self.choose_action(room, bot_player, game_engine)
+        return partial(_planned, action)
+    
+    def decision_key(self, room: RoomState, bot_player: PlayerState) -> Optional[Hashable]:
+        """
+        Chave do estado para o cache de decisões (ver decision_cache.py)
+        
+        None (padrão) = a estratégia não usa o cache. Só deve devolver uma
+        chave quem decide como função determinística do que ela cobre.
+        """
+        return None
+    
     def choose_action(self, room: RoomState, bot_player: PlayerState, game_engine: GameEngine) -> Optional[Dict[str, Any]]:
         """
         Escolhe uma ação para o bot
@@ -30,51 +94,59 @@ class GreedyBotStrategy(BotStrategy):
     - Caso contrário, joga o menor número viável
     - Usa Reverse para devolver efeito pendente perigoso
     - Se não puder jogar, passa o turno
+    
+    Args:
+        reset_threshold: Fração do limite acima da qual usa =0
+        danger_threshold: Fração do limite acima da qual um +2 pendente é perigoso
     """
     
+    def __init__(self, reset_threshold: float = GREEDY_RESET_THRESHOLD,
+                 danger_threshold: float = GREEDY_DANGER_THRESHOLD):
+        self.reset_threshold = reset_threshold
+        self.danger_threshold = danger_threshold
+    
+    def decision_key(self, room: RoomState, bot_player: PlayerState) -> Optional[Hashable]:
+        # O que a escolha abaixo consulta: os dois limiares e as faces jogáveis
+        pending = room.pending_effect
+        return (
+            room.accumulated_sum > room.round_limit * self.reset_threshold,
+            bool(pending) and pending.source_player_id != bot_player.id and self._is_effect_dangerous(pending, room),
+            playable_faces(room, bot_player)
+        )
+    
     def choose_action(self, room: RoomState, bot_player: PlayerState, game_engine: GameEngine) -> Optional[Dict[str, Any]]:
-        valid_plays = game_engine.get_valid_plays(room, bot_player.id)
+        moves = game_engine.legal_moves(room, bot_player.id)
         
-        if not valid_plays:
+        if not moves:
             return None
         
         # Se só pode passar o turno, passa
-        if len(valid_plays) == 1 and valid_plays[0]["type"] == "pass_turn":
+        if moves[0] is PASS_MOVE:
             return {"type": "pass_turn"}
         
-        # Filtra jogadas por tipo
-        number_plays = [p for p in valid_plays if p["type"] == "play_card" and p.get("card_kind") in ["number", "joker"]]
-        special_plays = [p for p in valid_plays if p["type"] == "play_special"]
+        hand = bot_player.hand
         
-        # Estratégia: se a soma está alta (> 70% do limite), tenta usar =0
-        high_threshold = room.round_limit * 0.7
-        if room.accumulated_sum > high_threshold:
-            reset_plays = [p for p in special_plays if p.get("special_type") == "reset0"]
-            if reset_plays:
-                return self._convert_to_action(reset_plays[0])
+        # Estratégia: se a soma está alta (> 70% do limite, por padrão), tenta usar =0
+        high_threshold = room.round_limit * self.reset_threshold
+        if room.accumulated_sum > high_threshold and hand.has(FACE_RESET0):
+            return game_engine.move_to_action(bot_player, Move("play_special", FACE_RESET0))
         
         # Se há efeito pendente perigoso, tenta usar Reverse para devolver
         if room.pending_effect and room.pending_effect.source_player_id != bot_player.id:
-            reverse_plays = [p for p in special_plays if p.get("special_type") == "reverse"]
-            if reverse_plays:
-                # Só usa Reverse se o efeito é realmente perigoso
-                if self._is_effect_dangerous(room.pending_effect, room):
-                    return self._convert_to_action(reverse_plays[0])
-        
-        # Tenta jogar cartas numéricas (menor valor primeiro)
-        if number_plays:
-            # Ordena por valor (menor primeiro)
-            number_plays.sort(key=lambda p: p.get("card_value", p.get("as_value", 10)))
-            return self._convert_to_action(number_plays[0])
+            # Só usa Reverse se o efeito é realmente perigoso
+            if hand.has(FACE_REVERSE) and self._is_effect_dangerous(room.pending_effect, room):
+                return game_engine.move_to_action(bot_player, Move("play_special", FACE_REVERSE))
+        
+        # Tenta jogar cartas numéricas (menor valor primeiro; número antes de Joker)
+        number_moves = [m for m in moves if m.type == "play_card"]
+        if number_moves:
+            return game_engine.move_to_action(bot_player, min(number_moves, key=lambda m: m.value))
         
         # Se não pode jogar números, usa cartas especiais
-        if special_plays:
-            # Prioridade: +2 > x2 > Reverse > =0
-            priority_order = ["plus2", "times2", "reverse", "reset0"]
-            for special_type in priority_order:
-                matching_plays = [p for p in special_plays if p.get("special_type") == special_type]
-                if matching_plays:
-                    return self._convert_to_action(matching_plays[0])
+        # Prioridade: +2 > x2 > Reverse > =0
+        for face in (FACE_PLUS2, FACE_TIMES2, FACE_REVERSE, FACE_RESET0):
+            if hand.has(face):
+                return game_engine.move_to_action(bot_player, Move("play_special", face))
         
         # Se chegou aqui, passa o turno
         return {"type": "pass_turn"}
@@ -90,60 +162,27 @@ class GreedyBotStrategy(BotStrategy):
         
         if pending_effect.add and pending_effect.add > 0:
             # Perigoso se a soma + efeito pode estourar facilmente
-            danger_threshold = room.round_limit * 0.8
+            danger_threshold = room.round_limit * self.danger_threshold
             return room.accumulated_sum + pending_effect.add > danger_threshold
         
         return False
-    
-    def _convert_to_action(self, play: Dict[str, Any]) -> Dict[str, Any]:
-        """Converte uma jogada válida em ação do bot"""
-        if play["type"] == "play_card":
-            action = {
-                "type": "play_card",
-                "card_id": play["card_id"]
-            }
-            if "as_value" in play:
-                action["as_value"] = play["as_value"]
-            return action
-        
-        elif play["type"] == "play_special":
-            return {
-                "type": "play_special",
-                "card_id": play["card_id"],
-                "special_type": play["special_type"]
-            }
-        
-        return {"type": "pass_turn"}
 
 class RandomBotStrategy(BotStrategy):
     """Bot que joga aleatoriamente entre as jogadas válidas"""
     
     def choose_action(self, room: RoomState, bot_player: PlayerState, game_engine: GameEngine) -> Optional[Dict[str, Any]]:
-        valid_plays = game_engine.get_valid_plays(room, bot_player.id)
+        moves = game_engine.legal_moves(room, bot_player.id)
         
-        if not valid_plays:
+        if not moves:
             return None
         
-        # Escolhe uma jogada aleatória
-        chosen_play = random.choice(valid_plays)
-        
-        if chosen_play["type"] == "play_card":
-            action = {
-                "type": "play_card",
-                "card_id": chosen_play["card_id"]
-            }
-            if "as_value" in chosen_play:
-                action["as_value"] = chosen_play["as_value"]
-            return action
-        
-        elif chosen_play["type"] == "play_special":
-            return {
-                "type": "play_special",
-                "card_id": chosen_play["card_id"],
-                "special_type": chosen_play["special_type"]
-            }
+        # Escolhe uma jogada aleatória, com peso pelo número de cartas de cada face
+        # (mesma distribuição de sortear entre as cartas jogáveis)
+        hand = bot_player.hand
+        weights = [hand.count(m.face) if m.face >= 0 else 1 for m in moves]
+        chosen_move = GameStateManager.bot_rng(room).choices(moves, weights=weights)[0]
         
-        return {"type": "pass_turn"}
+        return game_engine.move_to_action(bot_player, chosen_move)
 
 class DefensiveBotStrategy(BotStrategy):
     """
@@ -151,77 +190,241 @@ class DefensiveBotStrategy(BotStrategy):
     - Prefere cartas especiais para controlar o jogo
     - Joga números altos quando seguro
     - Usa =0 frequentemente para resetar
+    
+    Sem parâmetros ajustáveis: o =0 também é a 1ª prioridade das especiais,
+    então o limiar de DEFENSIVE_RESET_THRESHOLD não muda nenhuma jogada.
     """
     
+    def decision_key(self, room: RoomState, bot_player: PlayerState) -> Optional[Hashable]:
+        # A escolha abaixo só depende das faces jogáveis (ver a nota da classe sobre o limiar)
+        return playable_faces(room, bot_player)
+    
     def choose_action(self, room: RoomState, bot_player: PlayerState, game_engine: GameEngine) -> Optional[Dict[str, Any]]:
-        valid_plays = game_engine.get_valid_plays(room, bot_player.id)
+        moves = game_engine.legal_moves(room, bot_player.id)
         
-        if not valid_plays:
+        if not moves:
             return None
         
         # Se só pode passar o turno, passa
-        if len(valid_plays) == 1 and valid_plays[0]["type"] == "pass_turn":
+        if moves[0] is PASS_MOVE:
             return {"type": "pass_turn"}
         
-        # Filtra jogadas por tipo
-        number_plays = [p for p in valid_plays if p["type"] == "play_card" and p.get("card_kind") in ["number", "joker"]]
-        special_plays = [p for p in valid_plays if p["type"] == "play_special"]
+        hand = bot_player.hand
         
-        # Se a soma está moderadamente alta (> 50% do limite), usa =0
-        moderate_threshold = room.round_limit * 0.5
-        if room.accumulated_sum > moderate_threshold:
-            reset_plays = [p for p in special_plays if p.get("special_type") == "reset0"]
-            if reset_plays:
-                return self._convert_to_action(reset_plays[0])
+        # Se a soma está moderadamente alta (> 50% do limite, por padrão), usa =0
+        moderate_threshold = room.round_limit * DEFENSIVE_RESET_THRESHOLD
+        if room.accumulated_sum > moderate_threshold and hand.has(FACE_RESET0):
+            return game_engine.move_to_action(bot_player, Move("play_special", FACE_RESET0))
         
         # Prefere cartas especiais para controlar o jogo
-        if special_plays:
-            # Prioridade defensiva: =0 > Reverse > +2 > x2
-            priority_order = ["reset0", "reverse", "plus2", "times2"]
-            for special_type in priority_order:
-                matching_plays = [p for p in special_plays if p.get("special_type") == special_type]
-                if matching_plays:
-                    return self._convert_to_action(matching_plays[0])
+        # Prioridade defensiva: =0 > Reverse > +2 > x2
+        for face in (FACE_RESET0, FACE_REVERSE, FACE_PLUS2, FACE_TIMES2):
+            if hand.has(face):
+                return game_engine.move_to_action(bot_player, Move("play_special", face))
         
         # Se deve jogar números, prefere valores altos (mais seguros)
-        if number_plays:
-            # Ordena por valor (maior primeiro)
-            number_plays.sort(key=lambda p: p.get("card_value", p.get("as_value", 0)), reverse=True)
-            return self._convert_to_action(number_plays[0])
+        number_moves = [m for m in moves if m.type == "play_card"]
+        if number_moves:
+            return game_engine.move_to_action(bot_player, max(number_moves, key=lambda m: m.value))
         
         # Se chegou aqui, passa o turno
         return {"type": "pass_turn"}
+
+class MCTSBotStrategy(BotStrategy):
+    """
+    Bot EXPERT: busca Monte Carlo em árvore sobre mãos adversárias sorteadas
+    (ver mcts.py), com orçamento de tempo por jogada
+    """
+    
+    # A busca é CPU pura: roda num processo, longe do GIL do event loop
+    execution = "process"
+    
+    def __init__(self, time_budget: float = MCTS_TIME_BUDGET, max_iterations: Optional[int] = None):
+        self.search = MCTSSearch(time_budget, max_iterations)
     
-    def _convert_to_action(self, play: Dict[str, Any]) -> Dict[str, Any]:
-        """Converte uma jogada válida em ação do bot"""
-        if play["type"] == "play_card":
-            action = {
-                "type": "play_card",
-                "card_id": play["card_id"]
-            }
-            if "as_value" in play:
-                action["as_value"] = play["as_value"]
-            return action
-        
-        elif play["type"] == "play_special":
-            return {
-                "type": "play_special",
-                "card_id": play["card_id"],
-                "special_type": play["special_type"]
-            }
+    def choose_action(self, room: RoomState, bot_player: PlayerState, game_engine: GameEngine) -> Optional[Dict[str, Any]]:
+        return planned_action(self.plan_action(room, bot_player, game_engine)())
+    
+    def decision_key(self, room: RoomState, bot_player: PlayerState) -> Optional[Hashable]:
+        """
+        Tudo o que a Observation usa, sem ids: soma, limite, efeito pendente
+        e assento de quem o colocou, direção, a mão inteira por face,
+        jogadores a partir do bot (tokens, cartas na mão, eliminado) e as
+        faces do descarte
         
-        return {"type": "pass_turn"}
+        A busca é aleatória: num acerto, o bot repete a jogada que uma busca
+        anterior escolheu para a mesma informação.
+        """
+        order = room.turn_order
+        if bot_player.id not in order:
+            return None
+        start = order.index(bot_player.id)
+        seats = order[start:] + order[:start]
+        by_id = GameStateManager.registry(room).by_id
+        
+        pending = room.pending_effect
+        source = pending.source_player_id if pending else None
+        discard = [0] * FACE_COUNT
+        for card in room.deck.discard_pile:
+            discard[card & FACE_MASK] += 1
+        
+        return (
+            room.accumulated_sum,
+            room.round_limit,
+            pending_key(room, bot_player),
+            bot_player.hand.signature(),
+            room.direction,
+            tuple((by_id[pid].tokens, len(by_id[pid].hand), by_id[pid].is_eliminated) for pid in seats),
+            seats.index(source) if source in seats else None,
+            tuple(discard)
+        )
+    
+    def plan_action(self, room: RoomState, bot_player: PlayerState, game_engine: GameEngine) -> Callable[[], Optional[Dict[str, Any]]]:
+        moves = game_engine.legal_moves(room, bot_player.id)
+        if not moves:
+            return partial(_planned, None)
+        
+        # Sem escolha a fazer, não há o que buscar
+        if len(moves) == 1:
+            return partial(_planned, game_engine.move_to_action(bot_player, moves[0]))
+        
+        observation = Observation(room, bot_player)
+        seed = GameStateManager.bot_rng(room).getrandbits(64)
+        return partial(self._decide, observation, seed, game_engine)
+    
+    def _decide(self, observation: Observation, seed: int, game_engine: GameEngine) -> SearchDecision:
+        """Roda a busca (fora do event loop) e converte a jogada em ação, com as métricas da busca"""
+        result = self.search.search(observation, random.Random(seed))
+        
+        # A mão observada tem a mesma ordem da real: mesma carta representativa
+        bot_view = PlayerState.model_construct(id=observation.bot_id, hand=Hand(observation.hand))
+        return SearchDecision(
+            game_engine.move_to_action(bot_view, result["move"]),
+            {"iterations": result["iterations"], "nodes_per_sec": result["nodes_per_sec"]}
+        )
+
+class PolicyBotStrategy(BotStrategy):
+    """
+    Bot MASTER: consulta a tabela de política resolvida offline (ver
+    policy.py e policy_solver.py), uma leitura por decisão
+    
+    Sem a tabela (ou fora da abstração), decide como o Greedy.
+    """
+    
+    def __init__(self, table: Optional[PolicyTable] = None):
+        self.table = table or PolicyTable()
+        self.fallback = GreedyBotStrategy()
+        self._warned = False
+    
+    def choose_action(self, room: RoomState, bot_player: PlayerState, game_engine: GameEngine) -> Optional[Dict[str, Any]]:
+        moves = game_engine.legal_moves(room, bot_player.id)
+        
+        if not moves:
+            return None
+        
+        if moves[0] is PASS_MOVE:
+            return {"type": "pass_turn"}
+        
+        move = None
+        room_left = game_engine.playable_room(room)
+        if not self.table.available():
+            if not self._warned:
+                logger.warning(f"Policy table not found at {self.table.path}; MASTER bots play as MID")
+                self._warned = True
+        elif 1 <= room_left <= room.round_limit <= MAX_LIMIT:
+            code = self.table.lookup(room_left, room.round_limit, abstract_hand(bot_player.hand))
+            move = self._move_for(code, bot_player.hand)
+        
+        if move not in moves:
+            return self.fallback.choose_action(room, bot_player, game_engine)
+        
+        return game_engine.move_to_action(bot_player, move)
+    
+    def _move_for(self, code: int, hand: Hand) -> Optional[Move]:
+        """Jogada concreta para o código da tabela"""
+        if code == ACTION_PASS:
+            return PASS_MOVE
+        
+        if code == ACTION_RESET0:
+            return Move("play_special", FACE_RESET0)
+        
+        if code == ACTION_SKIP:
+            for face in SKIP_FACES:
+                if hand.has(face):
+                    if face == 0 or face == FACE_JOKER:
+                        return Move("play_card", face, 0)
+                    return Move("play_special", face)
+            return None
+        
+        return Move("play_card", code, code)
+
+# Estratégias com parâmetros ajustáveis, por dificuldade
+TUNABLE_STRATEGIES = {
+    "MID": GreedyBotStrategy
+}
+
+def load_bot_params(path: str) -> Dict[str, Dict[str, float]]:
+    """
+    Lê parâmetros de estratégia ({"MID": {"reset_threshold": 0.65}, ...})
+    
+    Chaves começando com "_" (metadados do tuner) são ignoradas.
+    
+    Raises:
+        ValueError: dificuldade ou parâmetro desconhecido
+    """
+    with open(path) as f:
+        data = json.load(f)
+    
+    params = {}
+    for difficulty, values in data.items():
+        if difficulty.startswith("_"):
+            continue
+        strategy_class = TUNABLE_STRATEGIES.get(difficulty)
+        if strategy_class is None:
+            raise ValueError(f"No tunable strategy for difficulty {difficulty!r}")
+        try:
+            strategy_class(**values)
+        except TypeError as e:
+            raise ValueError(f"Invalid parameters for {difficulty}: {e}")
+        params[difficulty] = values
+    return params
 
 class BotManager:
-    """Gerencia os bots no jogo"""
+    """
+    Gerencia os bots no jogo
+    
+    Args:
+        params: Parâmetros das estratégias ajustáveis, por dificuldade (por
+                padrão, os do arquivo em SOMO_BOT_PARAMS, se definido)
+    """
     
-    def __init__(self):
+    def __init__(self, params: Optional[Dict[str, Dict[str, float]]] = None):
         self.strategies = {
             "LOW": RandomBotStrategy(),
             "MID": GreedyBotStrategy(),
-            "HIGH": DefensiveBotStrategy()
+            "HIGH": DefensiveBotStrategy(),
+            "EXPERT": MCTSBotStrategy(),
+            "MASTER": PolicyBotStrategy()
         }
         self.game_engine = GameEngine()
+        self.decision_cache: DecisionCache = decision_cache
+        
+        if params is None and BOT_PARAMS_PATH:
+            params = load_bot_params(BOT_PARAMS_PATH)
+            logger.info(f"Loaded bot parameters from {BOT_PARAMS_PATH}")
+        if params:
+            self.configure(params)
+    
+    def configure(self, params: Dict[str, Dict[str, float]]):
+        """
+        Troca as estratégias ajustáveis pelas versões com os parâmetros dados
+        
+        Pode ser chamado em tempo de execução: o cache de decisões é limpo,
+        já que as mesmas situações podem passar a ter outra resposta.
+        """
+        for difficulty, values in params.items():
+            self.strategies[difficulty] = TUNABLE_STRATEGIES[difficulty](**values)
+        self.decision_cache.clear()
     
     def add_bot_to_room(self, room: RoomState, difficulty: str = "LOW") -> Optional[PlayerState]:
         """
@@ -229,7 +432,7 @@ class BotManager:
         
         Args:
             room: Estado da sala
-            difficulty: Dificuldade do bot ("LOW", "MID", "HIGH")
+            difficulty: Dificuldade do bot ("LOW", "MID", "HIGH", "EXPERT", "MASTER")
             
         Returns:
             PlayerState do bot criado ou None se não foi possível adicionar
@@ -259,41 +462,62 @@ class BotManager:
             is_bot=True
         )
         
-        room.players.append(bot_player)
+        GameStateManager.add_player(room, bot_player)
         return bot_player
     
+    def get_think_delay(self, bot_player: PlayerState) -> float:
+        """
+        Retorna o tempo de "pensamento" do bot (5–10s)
+        
+        O atraso não é aplicado aqui: quem chama agenda um wakeup no event loop
+        (ver services/bot_scheduler.py), sem bloquear as outras salas.
+        Por ser só temporização (não muda o estado da partida), não usa os
+        geradores da sala.
+        """
+        return random.randint(*BOT_THINK_DELAY_RANGE)
+    
     def get_bot_action(self, room: RoomState, bot_player: PlayerState) -> Optional[Dict[str, Any]]:
         """
-        Obtém a próxima ação de um bot com delay aleatório (5–10s)
+        Obtém a próxima ação de um bot
+        
+        A decisão é imediata e não bloqueia; o atraso de "pensamento" é
+        responsabilidade do chamador (ver get_think_delay). Estratégias com
+        decision_key passam pelo cache de decisões do processo.
         """
         if not bot_player.is_bot:
             return None
         
-        # Simula tempo de "pensar"
-        time.sleep(random.randint(5, 10))
-        
-        # Determina a dificuldade baseada no nickname
-        difficulty = "LOW"  # padrão
-        if "MID" in bot_player.nickname:
-            difficulty = "MID"
-        elif "HIGH" in bot_player.nickname:
-            difficulty = "HIGH"
-        
-        strategy = self.strategies.get(difficulty, self.strategies["LOW"])
-        return strategy.choose_action(room, bot_player, self.game_engine)
+        difficulty = self.get_difficulty(bot_player)
+        strategy = self.strategies[difficulty]
+        key = strategy.decision_key(room, bot_player)
+        if key is not None:
+            action = self.decision_cache.lookup(difficulty, key, bot_player, self.game_engine)
+            if action is not None:
+                return action
+        
+        action = strategy.choose_action(room, bot_player, self.game_engine)
+        if key is not None:
+            self.decision_cache.store(difficulty, key, bot_player, action, self.game_engine)
+        return action
+    
+    def get_strategy(self, bot_player: PlayerState) -> BotStrategy:
+        """Estratégia do bot, pela dificuldade no nickname"""
+        return self.strategies[self.get_difficulty(bot_player)]
+    
+    def get_difficulty(self, bot_player: PlayerState) -> str:
+        """Determina a dificuldade baseada no nickname ("LOW" por padrão)"""
+        for difficulty in ("EXPERT", "MASTER", "HIGH", "MID"):
+            if difficulty in bot_player.nickname:
+                return difficulty
+        return "LOW"
     
     def get_bot_count_by_difficulty(self, room: RoomState) -> Dict[str, int]:
         """Retorna contagem de bots por dificuldade na sala"""
-        counts = {"LOW": 0, "MID": 0, "HIGH": 0}
+        counts = {difficulty: 0 for difficulty in self.strategies}
         
         for player in room.players:
             if player.is_bot:
-                if "LOW" in player.nickname:
-                    counts["LOW"] += 1
-                elif "MID" in player.nickname:
-                    counts["MID"] += 1
-                elif "HIGH" in player.nickname:
-                    counts["HIGH"] += 1
+                counts[self.get_difficulty(player)] += 1
         
         return counts
 
@@ -0,0 +1,121 @@
+"""
+Cache de transposição das decisões dos bots (um por processo).
+
+A mesma situação de decisão se repete o tempo todo, na mesma sala e entre
+salas. Cada estratégia define a chave do que ela de fato enxerga (ver
+BotStrategy.decision_key), sem ids de carta; a jogada compacta (Move) fica
+guardada sob essa chave e, num acerto, a ação é remontada com as cartas da
+mão atual (GameEngine.move_to_action).
+
+Entradas saem por LRU (max_entries) ou por idade (ttl). Quem muda os
+parâmetros de uma estratégia em tempo de execução deve chamar clear().
+"""
+
+import threading
+import time
+from collections import Counter, OrderedDict
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+from ..cards import FACE_JOKER
+from ..models import RoomState, PlayerState
+from .rules import GameEngine, Move
+
+# Bits das faces que não são números (Joker e especiais)
+NON_NUMBER_FACES = ~((1 << FACE_JOKER) - 1)
+
+def pending_key(room: RoomState, bot_player: PlayerState) -> Optional[Tuple]:
+    """Efeito pendente sem ids: (soma, multiplicador, foi o próprio bot que colocou)"""
+    pending = room.pending_effect
+    if not pending:
+        return None
+    return (pending.add, pending.multiplier, pending.source_player_id == bot_player.id)
+
+def playable_faces(room: RoomState, bot_player: PlayerState) -> int:
+    """
+    Bits das faces jogáveis da mão (Joker, especiais e números que cabem)
+
+    Quantidades e números acima do espaço restante ficam de fora: para as
+    heurísticas, mãos diferentes com as mesmas faces jogáveis são a mesma
+    situação.
+    """
+    room_left = room.round_limit - room.accumulated_sum
+    numbers = (1 << (min(room_left, 9) + 1)) - 1 if room_left >= 0 else 0
+    return bot_player.hand.face_mask() & (NON_NUMBER_FACES | numbers)
+
+class DecisionCache:
+    """
+    LRU com TTL de jogadas por (dificuldade, chave de estado)
+
+    Args:
+        max_entries: Máximo de entradas (as menos usadas saem primeiro)
+        ttl: Idade máxima de uma entrada, em segundos
+    """
+
+    def __init__(self, max_entries: int = 50000, ttl: float = 600.0):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.entries: "OrderedDict[Hashable, Tuple[Move, float]]" = OrderedDict()
+        self.hits: Counter = Counter()  # Por dificuldade
+        self.misses: Counter = Counter()
+        self.evictions = 0
+        self.expirations = 0
+        self.lock = threading.Lock()
+
+    def lookup(self, difficulty: str, key: Hashable, bot_player: PlayerState,
+               game_engine: GameEngine) -> Optional[Dict[str, Any]]:
+        """Ação guardada para o estado (com as cartas da mão atual), ou None"""
+        with self.lock:
+            entry = self.entries.get((difficulty, key))
+            if entry is not None and time.monotonic() - entry[1] > self.ttl:
+                del self.entries[(difficulty, key)]
+                self.expirations += 1
+                entry = None
+            if entry is None:
+                self.misses[difficulty] += 1
+                return None
+            self.entries.move_to_end((difficulty, key))
+            self.hits[difficulty] += 1
+        return game_engine.move_to_action(bot_player, entry[0])
+
+    def store(self, difficulty: str, key: Hashable, bot_player: PlayerState,
+              action: Optional[Dict[str, Any]], game_engine: GameEngine):
+        """Guarda a decisão tomada pela estratégia (chamar antes de aplicar a ação)"""
+        if action is None:
+            return
+        move = game_engine.action_to_move(bot_player, action)
+        if move is None:
+            return
+        with self.lock:
+            self.entries[(difficulty, key)] = (move, time.monotonic())
+            self.entries.move_to_end((difficulty, key))
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Taxa de acerto geral e por dificuldade"""
+        def rate(hits: int, misses: int) -> Optional[float]:
+            total = hits + misses
+            return round(hits / total, 4) if total else None
+
+        hits = sum(self.hits.values())
+        misses = sum(self.misses.values())
+        return {
+            "entries": len(self.entries),
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": rate(hits, misses),
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "by_difficulty": {
+                difficulty: rate(self.hits[difficulty], self.misses[difficulty])
+                for difficulty in sorted(set(self.hits) | set(self.misses))
+            }
+        }
+
+# Instância do processo, compartilhada por todas as salas
+decision_cache = DecisionCache()
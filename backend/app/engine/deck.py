@@ -1,12 +1,12 @@
 import random
-from typing import List
-from ..models import CardComp, CardKind
+from typing import Iterable, List, Optional
+from ..cards import Deck, FULL_DECK, FACE_JOKER, FACE_KINDS, card_face
 
 class DeckManager:
     """Gerencia a criação, embaralhamento e distribuição de cartas"""
     
     @staticmethod
-    def create_deck() -> List[CardComp]:
+    def create_deck() -> List[int]:
         """
         Cria um baralho completo seguindo as especificações do jogo:
         - 60 cartas numéricas: 6 cópias de cada 0-9
@@ -15,69 +15,35 @@ class DeckManager:
         - 7 +2 (Soma +2)
         - 7 =0 (Zera)
         - 4 Joker (Coringa)
-        """
-        deck = []
-        
-        # 60 cartas numéricas: 6 cópias de cada 0-9
-        for value in range(10):  # 0 a 9
-            for _ in range(6):  # 6 cópias de cada
-                deck.append(CardComp(
-                    kind=CardKind.NUMBER,
-                    value=value
-                ))
-        
-        # 6 Reverse
-        for _ in range(6):
-            deck.append(CardComp(kind=CardKind.REVERSE))
-        
-        # 6 x2 (Multiplica por 2)
-        for _ in range(6):
-            deck.append(CardComp(kind=CardKind.TIMES2))
-        
-        # 7 +2 (Soma +2)
-        for _ in range(7):
-            deck.append(CardComp(kind=CardKind.PLUS2))
         
-        # 7 =0 (Zera)
-        for _ in range(7):
-            deck.append(CardComp(kind=CardKind.RESET0))
-        
-        # 4 Joker (Coringa)
-        for _ in range(4):
-            deck.append(CardComp(kind=CardKind.JOKER))
-        
-        return deck
+        As cartas são ints (ver cards.py) com ids sequenciais 1..90, copiados
+        de um baralho pré-montado: sem UUIDs nem validação Pydantic por jogo.
+        """
+        return list(FULL_DECK)
     
     @staticmethod
-    def shuffle_deck(deck: List[CardComp]) -> List[CardComp]:
-        """Embaralha o baralho"""
+    def shuffle_deck(deck: List[int], rng: Optional[random.Random] = None) -> List[int]:
+        """Embaralha o baralho (com o gerador da sala, se dado)"""
         shuffled = deck.copy()
-        random.shuffle(shuffled)
+        (rng or random).shuffle(shuffled)
         return shuffled
     
     @staticmethod
-    def draw_cards(deck: List[CardComp], count: int) -> tuple[List[CardComp], List[CardComp]]:
+    def draw_cards(deck: Deck, count: int) -> List[int]:
         """
         Retira cartas do topo do baralho
         
         Args:
-            deck: Baralho atual
+            deck: Baralho atual (o cursor avança, sem copiar a lista)
             count: Número de cartas para retirar
             
         Returns:
-            Tupla com (cartas_retiradas, baralho_restante)
+            Cartas retiradas (menos que `count` se monte + descarte não bastarem)
         """
-        if count > len(deck):
-            # Se não há cartas suficientes, retorna todas as disponíveis
-            return deck.copy(), []
-        
-        drawn_cards = deck[:count]
-        remaining_deck = deck[count:]
-        
-        return drawn_cards, remaining_deck
+        return deck.draw(count)
     
     @staticmethod
-    def get_deck_stats(deck: List[CardComp]) -> dict:
+    def get_deck_stats(deck: Iterable[int]) -> dict:
         """
         Retorna estatísticas do baralho para debug/validação
         
@@ -85,19 +51,21 @@ class DeckManager:
             Dicionário com contagem de cada tipo de carta
         """
         stats = {
-            "total": len(deck),
+            "total": 0,
             "numbers": {},
             "specials": {}
         }
         
         for card in deck:
-            if card.kind == CardKind.NUMBER:
-                value = card.value
+            stats["total"] += 1
+            face = card_face(card)
+            if face < FACE_JOKER:
+                value = face
                 if value not in stats["numbers"]:
                     stats["numbers"][value] = 0
                 stats["numbers"][value] += 1
             else:
-                kind_name = card.kind.value
+                kind_name = FACE_KINDS[face]
                 if kind_name not in stats["specials"]:
                     stats["specials"][kind_name] = 0
                 stats["specials"][kind_name] += 1
@@ -105,7 +73,7 @@ class DeckManager:
         return stats
     
     @staticmethod
-    def validate_deck(deck: List[CardComp]) -> bool:
+    def validate_deck(deck: Iterable[int]) -> bool:
         """
         Valida se o baralho tem a composição correta
         
@@ -139,37 +107,27 @@ class DeckManager:
         return True
     
     @staticmethod
-    def create_and_shuffle_deck() -> List[CardComp]:
+    def create_and_shuffle_deck(rng: Optional[random.Random] = None) -> Deck:
         """
         Método de conveniência que cria e embaralha um baralho completo
         
+        Args:
+            rng: Gerador da sala; também é usado nos reembaralhamentos do descarte
+        
         Returns:
-            Baralho completo embaralhado
+            Baralho completo embaralhado, com descarte vazio
         """
-        deck = DeckManager.create_deck()
-        return DeckManager.shuffle_deck(deck)
+        rng = rng or random
+        cards = DeckManager.create_deck()
+        rng.shuffle(cards)
+        return Deck(cards, shuffle=rng.shuffle)
     
     @staticmethod
-    def reshuffle_with_discard(deck: List[CardComp], discard_pile: List[CardComp], keep_top: bool = True) -> List[CardComp]:
+    def reshuffle_with_discard(deck: Deck):
         """
-        Reembaralha o baralho com as cartas do descarte
+        Reembaralha o descarte (exceto a carta do topo) de volta no baralho
         
-        Args:
-            deck: Baralho atual (pode estar vazio)
-            discard_pile: Pilha de descarte
-            keep_top: Se True, mantém a carta do topo do descarte fora do reembaralhamento
-            
-        Returns:
-            Novo baralho embaralhado
+        Normalmente não precisa ser chamado: Deck.draw faz isso sozinho
+        quando o monte se esgota.
         """
-        cards_to_shuffle = deck.copy()
-        
-        if keep_top and discard_pile:
-            # Adiciona todas as cartas do descarte exceto a do topo
-            cards_to_shuffle.extend(discard_pile[:-1])
-        else:
-            # Adiciona todas as cartas do descarte
-            cards_to_shuffle.extend(discard_pile)
-        
-        return DeckManager.shuffle_deck(cards_to_shuffle)
-
+        deck.refill()
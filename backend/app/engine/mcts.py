@@ -0,0 +1,231 @@
+"""
+Busca Monte Carlo em árvore (MCTS) para o bot EXPERT.
+
+O bot não vê as mãos dos adversários nem a ordem do monte. Cada iteração
+da busca sorteia uma "determinização": as cartas que o bot não viu (fora da
+sua mão e do descarte) são distribuídas entre os adversários, respeitando
+quantas cartas cada um tem, e o resto vira o monte. A árvore é compartilhada
+entre determinizações (ISMCTS): cada nó é uma jogada compacta (Move) e a
+seleção UCB só considera as jogadas disponíveis na determinização atual.
+
+Simulação: jogadas aleatórias até a primeira punição (ou um limite de
+jogadas). A recompensa de cada jogador é quanto os outros perderam de tokens
+menos quanto ele perdeu. As jogadas são aplicadas e desfeitas com
+GameEngine.make_move/unmake_move, então cada determinização é montada uma vez
+e reaproveitada por várias iterações.
+
+A busca é CPU pura e síncrona: quem chama deve rodá-la fora do event loop
+(ver ConnectionManager._process_bot_turn).
+"""
+
+import math
+import random
+import time
+from typing import Any, Dict, Optional
+
+from ..cards import FULL_DECK, Deck, Hand, card_uid
+from ..models import RoomState, PlayerState
+from .rules import GameEngine, Move
+from .state import GameStateManager
+
+# Constante de exploração do UCB1
+EXPLORATION = 1.4
+
+class Observation:
+    """
+    O que o bot sabe da sala no momento da decisão (cópia, sem mãos alheias)
+
+    Montada no event loop (MCTSBotStrategy.plan_action) e usada pela busca
+    em outra thread, sem tocar na sala real.
+    """
+
+    __slots__ = (
+        "bot_id", "hand", "discard", "unseen", "players", "turn_order", "current_turn",
+        "direction", "accumulated_sum", "round_limit", "pending_effect"
+    )
+
+    def __init__(self, room: RoomState, bot_player: PlayerState):
+        self.bot_id = bot_player.id
+        self.hand = list(bot_player.hand)
+        self.discard = list(room.deck.discard_pile)
+
+        # Cartas que o bot não viu: nem na própria mão nem no descarte
+        seen = {card_uid(card) for card in self.hand}
+        seen.update(card_uid(card) for card in self.discard)
+        self.unseen = [card for card in FULL_DECK if card_uid(card) not in seen]
+
+        # (id, tokens, eliminado, nº de cartas) de cada jogador, na ordem da sala
+        self.players = [(p.id, p.tokens, p.is_eliminated, len(p.hand)) for p in room.players]
+        self.turn_order = list(room.turn_order)
+        self.current_turn = room.current_turn
+        self.direction = room.direction
+        self.accumulated_sum = room.accumulated_sum
+        self.round_limit = room.round_limit
+        pending = room.pending_effect
+        self.pending_effect = pending.model_copy() if pending else None
+
+    def determinize(self, rng: random.Random) -> RoomState:
+        """Sala hipotética coerente com a observação (mãos alheias e monte sorteados)"""
+        unseen = self.unseen.copy()
+        rng.shuffle(unseen)
+
+        players = []
+        dealt = 0
+        for player_id, tokens, is_eliminated, hand_count in self.players:
+            if player_id == self.bot_id:
+                hand = Hand(self.hand)
+            else:
+                hand = Hand(unseen[dealt:dealt + hand_count])
+                dealt += hand_count
+            players.append(PlayerState.model_construct(
+                id=player_id, nickname="", tokens=tokens, hand=hand,
+                is_bot=True, is_eliminated=is_eliminated
+            ))
+
+        # Gerador próprio da determinização (D20 e reembaralhamentos hipotéticos)
+        chance = random.Random(rng.getrandbits(64))
+        return RoomState.model_construct(
+            id="search",
+            players=players,
+            game_started=True,
+            current_turn=self.current_turn,
+            direction=self.direction,
+            accumulated_sum=self.accumulated_sum,
+            round_limit=self.round_limit,
+            pending_effect=self.pending_effect,
+            deck=Deck(unseen[dealt:], list(self.discard), shuffle=chance.shuffle),
+            turn_order=list(self.turn_order),
+            seed=0,
+            action_log=[],
+            action_base=0,
+            rng=chance,
+            registry=None
+        )
+
+class Node:
+    """Nó da árvore: estatísticas da jogada `move` feita por `player_id`"""
+
+    __slots__ = ("move", "player_id", "children", "visits", "available", "reward")
+
+    def __init__(self, move: Optional[Move] = None, player_id: Optional[str] = None):
+        self.move = move
+        self.player_id = player_id
+        self.children: Dict[Move, "Node"] = {}
+        self.visits = 0
+        self.available = 0  # Vezes em que a jogada estava disponível (ISMCTS)
+        self.reward = 0.0
+
+    def ucb(self) -> float:
+        return self.reward / self.visits + EXPLORATION * math.sqrt(math.log(self.available) / self.visits)
+
+class MCTSSearch:
+    """
+    Busca com orçamento de tempo
+
+    Args:
+        time_budget: Tempo máximo de busca por jogada, em segundos
+        max_iterations: Limite opcional de iterações (testes, simulações)
+        rollout_depth: Máximo de jogadas por simulação
+        samples_reuse: Iterações por determinização (reaproveitada com unmake_move)
+    """
+
+    def __init__(self, time_budget: float = 0.5, max_iterations: Optional[int] = None,
+                 rollout_depth: int = 40, samples_reuse: int = 8):
+        self.time_budget = time_budget
+        self.max_iterations = max_iterations
+        self.rollout_depth = rollout_depth
+        self.samples_reuse = samples_reuse
+        self.engine = GameEngine()
+
+    def search(self, observation: Observation, rng: random.Random) -> Dict[str, Any]:
+        """
+        Escolhe uma jogada para o bot observado
+
+        Returns:
+            {"move", "iterations", "nodes", "elapsed", "nodes_per_sec"}
+            (nodes = jogadas aplicadas na árvore e nas simulações)
+        """
+        engine = self.engine
+        root = Node()
+        start = time.perf_counter()
+        deadline = start + self.time_budget
+        iterations = 0
+        nodes = 0
+        room = None
+
+        while time.perf_counter() < deadline:
+            if self.max_iterations is not None and iterations >= self.max_iterations:
+                break
+            if iterations % self.samples_reuse == 0:
+                room = observation.determinize(rng)
+                chance = room.rng  # Gerador próprio da determinização (D20, reembaralhamentos)
+                tokens_before = {p.id: p.tokens for p in room.players}
+
+            undos = []
+            path = []
+            node = root
+
+            # Seleção e expansão
+            while not GameStateManager.check_game_over(room):
+                player_id = room.current_turn
+                moves = engine.legal_moves(room, player_id)
+                untried = [m for m in moves if m not in node.children]
+                for move in moves:
+                    child = node.children.get(move)
+                    if child:
+                        child.available += 1
+
+                if untried:
+                    move = rng.choice(untried)
+                    child = node.children[move] = Node(move, player_id)
+                    child.available = 1
+                else:
+                    child = max((node.children[m] for m in moves), key=Node.ucb)
+
+                undos.append(engine.make_move(room, player_id, child.move, chance))
+                path.append(child)
+                node = child
+                if untried:
+                    break
+
+            # Simulação: jogadas aleatórias até alguém ser punido
+            depth = 0
+            while depth < self.rollout_depth and not GameStateManager.check_game_over(room):
+                if self._tokens_lost(room, tokens_before):
+                    break
+                player_id = room.current_turn
+                undos.append(engine.make_move(room, player_id, rng.choice(engine.legal_moves(room, player_id)), chance))
+                depth += 1
+
+            # Retropropagação
+            rewards = self._rewards(room, tokens_before)
+            for visited in path:
+                visited.visits += 1
+                visited.reward += rewards[visited.player_id]
+
+            nodes += len(undos)
+            for undo in reversed(undos):
+                engine.unmake_move(room, undo)
+            iterations += 1
+
+        elapsed = time.perf_counter() - start
+        best = max(root.children.values(), key=lambda child: child.visits) if root.children else None
+        return {
+            "move": best.move if best else None,
+            "iterations": iterations,
+            "nodes": nodes,
+            "elapsed": elapsed,
+            "nodes_per_sec": nodes / elapsed if elapsed > 0 else 0.0
+        }
+
+    @staticmethod
+    def _tokens_lost(room: RoomState, tokens_before: Dict[str, int]) -> int:
+        return sum(tokens_before[p.id] - max(p.tokens, 0) for p in room.players)
+
+    @staticmethod
+    def _rewards(room: RoomState, tokens_before: Dict[str, int]) -> Dict[str, float]:
+        """Recompensa por jogador: perda média dos outros menos a própria perda"""
+        lost = {p.id: tokens_before[p.id] - max(p.tokens, 0) for p in room.players}
+        total = sum(lost.values())
+        others = max(len(lost) - 1, 1)
+        return {pid: (total - own) / others - own for pid, own in lost.items()}
@@ -0,0 +1,118 @@
+"""
+Tabela de política pré-resolvida para o bot MASTER (só biblioteca padrão).
+
+O solver offline (policy_solver.py, requer numpy) resolve uma abstração do
+jogo do ponto de vista de quem joga e grava a melhor jogada de cada estado
+abstrato num arquivo binário. Em jogo, a decisão é uma consulta de um byte
+num arquivo mapeado em memória (mmap): O(1), sem carregar nada na importação.
+
+Abstração (o que importa para decidir na vez do jogador):
+    r           espaço até o limite (limite - soma), 1..limite
+    L           limite da rodada (volta a ser o espaço depois de um =0), 1..20
+    números     presença de cada número 1..9 na mão (9 bits)
+    "pulos"     cartas que passam a vez sem mudar a soma: 0, Joker (jogado
+                como 0), +2, x2 e Reverse (o efeito pendente não altera a
+                soma) - contagem até 3
+    =0          contagem até 2
+
+Formato do arquivo (little-endian):
+    cabeçalho   MAGIC (8 bytes), versão, limite máximo, nº de estados de mão,
+                nº de adversários do modelo (uint16 cada)
+    corpo       um código de ação (4 bits) por estado, dois por byte
+"""
+
+import mmap
+import os
+import struct
+from typing import Optional
+
+from ..cards import FACE_JOKER, FACE_PLUS2, FACE_TIMES2, FACE_RESET0, FACE_REVERSE, Hand
+
+MAGIC = b"SOMOPOL1"
+VERSION = 1
+HEADER = struct.Struct("<8sHHHH")
+
+MAX_LIMIT = 20
+MAX_SKIPS = 3
+MAX_RESETS = 2
+NUMBER_MASKS = 1 << 9
+HAND_STATES = NUMBER_MASKS * (MAX_SKIPS + 1) * (MAX_RESETS + 1)
+ROUND_STATES = MAX_LIMIT * (MAX_LIMIT + 1) // 2  # Pares (r, L) com 1 <= r <= L <= 20
+
+# Códigos de ação na tabela (1..9 = jogar aquele número)
+ACTION_PASS = 0
+ACTION_SKIP = 10
+ACTION_RESET0 = 11
+
+# Cartas "pulo", na ordem em que são gastas: o 0 primeiro, o Joker (que
+# pode valer qualquer número) por último
+SKIP_FACES = (0, FACE_PLUS2, FACE_TIMES2, FACE_REVERSE, FACE_JOKER)
+
+DEFAULT_TABLE_PATH = os.path.join(os.path.dirname(__file__), "data", "policy_table.bin")
+
+def round_index(room_left: int, limit: int) -> int:
+    """Índice do par (r, L) no eixo das rodadas da tabela"""
+    return limit * (limit - 1) // 2 + room_left - 1
+
+def hand_index(number_mask: int, skips: int, resets: int) -> int:
+    """Índice da mão abstrata (bit v-1 de number_mask = tem o número v)"""
+    return number_mask + NUMBER_MASKS * (min(skips, MAX_SKIPS) + (MAX_SKIPS + 1) * min(resets, MAX_RESETS))
+
+def abstract_hand(hand: Hand) -> int:
+    """Resume a mão real no índice da mão abstrata, em O(1) pelas contagens por face"""
+    number_mask = 0
+    for value in range(1, 10):
+        if hand.has(value):
+            number_mask |= 1 << (value - 1)
+    skips = sum(hand.count(face) for face in SKIP_FACES)
+    return hand_index(number_mask, skips, hand.count(FACE_RESET0))
+
+class PolicyTable:
+    """Tabela de política mapeada em memória (aberta na primeira consulta)"""
+
+    def __init__(self, path: str = DEFAULT_TABLE_PATH):
+        self.path = path
+        self.opponents = None
+        self._map: Optional[mmap.mmap] = None
+
+    def _open(self) -> mmap.mmap:
+        with open(self.path, "rb") as f:
+            table = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, max_limit, hand_states, opponents = HEADER.unpack_from(table, 0)
+        if magic != MAGIC or version != VERSION or max_limit != MAX_LIMIT or hand_states != HAND_STATES:
+            table.close()
+            raise ValueError(f"Incompatible policy table: {self.path}")
+        self.opponents = opponents
+        self._map = table
+        return table
+
+    def available(self) -> bool:
+        return self._map is not None or os.path.exists(self.path)
+
+    def lookup(self, room_left: int, limit: int, hand: int) -> int:
+        """Código de ação para o estado abstrato (uma leitura de byte)"""
+        table = self._map or self._open()
+        index = round_index(room_left, limit) * HAND_STATES + hand
+        packed = table[HEADER.size + index // 2]
+        return packed >> 4 if index % 2 else packed & 0xF
+
+    def close(self):
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+
+def write_table(path: str, actions, opponents: int):
+    """
+    Grava a tabela (actions: sequência de códigos na ordem dos índices)
+
+    Usado pelo solver; os códigos cabem em 4 bits e vão dois por byte.
+    """
+    codes = bytes(actions)
+    if len(codes) != ROUND_STATES * HAND_STATES:
+        raise ValueError(f"Expected {ROUND_STATES * HAND_STATES} actions, got {len(codes)}")
+    packed = bytes(low | (high << 4) for low, high in zip(codes[0::2], codes[1::2]))
+
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, VERSION, MAX_LIMIT, HAND_STATES, opponents))
+        f.write(packed)
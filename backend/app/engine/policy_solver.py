@@ -0,0 +1,282 @@
+"""
+Solver offline da tabela de política do bot MASTER (requer numpy, ver requirements-dev.txt).
+
+Resolve por iteração de valor o processo de decisão abstrato descrito em
+policy.py, do ponto de vista de um jogador:
+
+- Na vez dele, o estado é (r, L, mão abstrata). Jogar o número v leva a
+  r - v; acertar o limite (v == r) compra 2 cartas e ele joga de novo numa
+  rodada nova; um "pulo" mantém r; o =0 volta r para L. Sem jogada, é
+  punido (-1), todos compram 2 e ele joga de novo numa rodada nova.
+- Depois da jogada, os adversários jogam um a um. O comportamento deles é
+  um modelo estatístico medido em partidas entre os bots existentes
+  (estimate_opponent_model): para cada (r, L), a chance de cada novo r, de
+  acerto exato (o mesmo adversário joga de novo) e de punição (recompensa
+  1/nº de adversários; todos compram 2).
+- Cartas compradas seguem a composição do baralho.
+
+O valor é a soma descontada (por vez do jogador) das punições dos
+adversários menos as próprias; a tabela guarda a jogada de maior valor.
+
+Uso (a partir de backend/):
+    python -m app.engine.policy_solver --games 2000 --opponents 2
+"""
+
+import argparse
+import logging
+import time
+from typing import Any, Dict, Optional, Sequence, Tuple
+
+import numpy as np
+
+from ..cards import DECK_COMPOSITION, FACE_RESET0
+from .policy import (
+    ACTION_PASS, ACTION_RESET0, ACTION_SKIP, DEFAULT_TABLE_PATH, HAND_STATES, MAX_LIMIT,
+    MAX_RESETS, MAX_SKIPS, NUMBER_MASKS, ROUND_STATES, SKIP_FACES, round_index, write_table
+)
+
+logger = logging.getLogger(__name__)
+
+# Adversários usados para medir o modelo de transição
+DEFAULT_OPPONENTS = ("LOW", "MID", "HIGH")
+
+# Desconto por vez do jogador (horizonte efetivo de ~50 vezes, uma partida típica)
+DISCOUNT = 0.98
+
+# Colunas extras do modelo dos adversários (as primeiras são os estados de rodada)
+OUTCOME_PENALTY = ROUND_STATES
+OUTCOME_EXACT = ROUND_STATES + 1
+
+def _round_axes() -> Tuple[np.ndarray, np.ndarray]:
+    """r e L de cada índice de rodada"""
+    room_left = np.zeros(ROUND_STATES, dtype=np.int64)
+    limit = np.zeros(ROUND_STATES, dtype=np.int64)
+    for L in range(1, MAX_LIMIT + 1):
+        for r in range(1, L + 1):
+            room_left[round_index(r, L)] = r
+            limit[round_index(r, L)] = L
+    return room_left, limit
+
+def estimate_opponent_model(games: int = 2000, difficulties: Sequence[str] = DEFAULT_OPPONENTS,
+                            seed: int = 0, max_turns: int = 5000) -> np.ndarray:
+    """
+    Mede, em partidas entre bots, o que acontece numa vez de um adversário
+
+    Returns:
+        Matriz (ROUND_STATES, ROUND_STATES + 2) de probabilidades: para cada
+        (r, L) no início da vez, a chance de cada (r', L) ao fim dela, de
+        acerto exato e de punição
+    """
+    from ..sim import create_sim_room, default_strategies
+    from .rules import GameEngine
+    from .state import GameStateManager
+
+    engine = GameEngine()
+    strategies = default_strategies()
+
+    counts = np.zeros((ROUND_STATES, ROUND_STATES + 2))
+    for game in range(games):
+        room = create_sim_room(difficulties, f"policy-{game}")
+        engine.start_game(room, seed + game)
+        seat_of = {player.id: index for index, player in enumerate(room.players)}
+
+        for _ in range(max_turns):
+            if GameStateManager.check_game_over(room):
+                break
+            player = GameStateManager.get_player_by_id(room, room.current_turn)
+            limit = room.round_limit
+            before = round_index(limit - room.accumulated_sum, limit)
+
+            strategy = strategies[difficulties[seat_of[player.id]]]
+            action = strategy.choose_action(room, player, engine) or {"type": "pass_turn"}
+            result = engine.apply_action(room, player.id, action)
+            if not result["success"]:
+                raise RuntimeError(f"Game {game}: bot action rejected ({result['error']}): {action}")
+
+            kinds = {event["event"]: event for event in result["events"]}
+            if "penalty" in kinds:
+                counts[before, OUTCOME_PENALTY] += 1
+            elif "round_reset" in kinds:
+                counts[before, OUTCOME_EXACT] += 1
+            else:
+                counts[before, round_index(limit - room.accumulated_sum, limit)] += 1
+
+    # Estados nunca vistos (ou raros): um pseudo-registro de "pulo" (r não muda)
+    counts[np.arange(ROUND_STATES), np.arange(ROUND_STATES)] += 0.5
+    return counts / counts.sum(axis=1, keepdims=True)
+
+class PolicySolver:
+    """
+    Iteração de valor sobre (rodada, mão abstrata)
+
+    Args:
+        model: Modelo dos adversários (estimate_opponent_model)
+        opponents: Número de adversários entre duas vezes do jogador
+        discount: Desconto por vez do jogador
+    """
+
+    def __init__(self, model: np.ndarray, opponents: int = 2, discount: float = DISCOUNT):
+        self.model = model
+        self.opponents = opponents
+        self.discount = discount
+        self.penalty_reward = 1.0 / opponents
+
+        self.room_left, self.limit = _round_axes()
+        self.fresh = np.array([round_index(L, L) for L in range(1, MAX_LIMIT + 1)])  # Rodadas novas (D20)
+
+        hands = np.arange(HAND_STATES)
+        masks = hands % NUMBER_MASKS
+        skips = (hands // NUMBER_MASKS) % (MAX_SKIPS + 1)
+        resets = hands // (NUMBER_MASKS * (MAX_SKIPS + 1))
+        self.skips = skips
+        self.resets = resets
+        self.has_number = {v: (masks >> (v - 1)) & 1 == 1 for v in range(1, 10)}
+        self.without_number = {v: hands & ~(1 << (v - 1)) for v in range(1, 10)}
+        self.without_skip = hands - NUMBER_MASKS
+        self.without_reset = hands - NUMBER_MASKS * (MAX_SKIPS + 1)
+
+        # Uma compra: cada classe de carta, com a chance dada pela composição do baralho
+        draws = [(DECK_COMPOSITION[v] / 90, hands | (1 << (v - 1))) for v in range(1, 10)]
+        skip_cards = sum(DECK_COMPOSITION[face] for face in SKIP_FACES)
+        draws.append((skip_cards / 90, np.where(skips < MAX_SKIPS, hands + NUMBER_MASKS, hands)))
+        draws.append((DECK_COMPOSITION[FACE_RESET0] / 90,
+                      np.where(resets < MAX_RESETS, hands + NUMBER_MASKS * (MAX_SKIPS + 1), hands)))
+        self.draws = draws
+        self.actions = self._actions()
+
+    def _draw2(self, values: np.ndarray) -> np.ndarray:
+        """Valor esperado depois de comprar 2 cartas (último eixo = mão)"""
+        for _ in range(2):
+            values = sum(p * values[..., target] for p, target in self.draws)
+        return values
+
+    def _new_round(self, values: np.ndarray) -> np.ndarray:
+        """Valor esperado numa rodada nova (média sobre o D20), por mão"""
+        return values[self.fresh].mean(axis=0)
+
+    def solve(self, max_sweeps: int = 1000, tolerance: float = 1e-5) -> Dict[str, Any]:
+        """
+        Itera até convergir
+
+        Returns:
+            {"policy" (códigos por estado, na ordem da tabela), "value",
+             "sweeps", "delta", "elapsed"}
+        """
+        start = time.perf_counter()
+        moves = self.model[:, :ROUND_STATES]
+        penalty = self.model[:, OUTCOME_PENALTY, None]
+        exact = self.model[:, OUTCOME_EXACT, None]
+        shape = (ROUND_STATES, HAND_STATES)
+
+        value = np.zeros(shape)
+        segments = [np.zeros(shape) for _ in range(self.opponents + 1)]  # segments[j]: faltam j adversários
+        delta = float("inf")
+        sweeps = 0
+
+        while sweeps < max_sweeps and delta > tolerance:
+            # Vez dos adversários (segments[0] = próxima vez do jogador)
+            segments[0] = self.discount * value
+            for j in range(1, self.opponents + 1):
+                previous = segments[j]
+                punished = self.penalty_reward + self._draw2(self._new_round(previous))
+                segments[j] = moves @ segments[j - 1] + penalty * punished + exact * self._new_round(previous)
+            after_move = segments[self.opponents]
+
+            # Vez do jogador: acerto exato e punição levam a uma rodada nova com 2 cartas a mais
+            replay = self.discount * self._draw2(self._new_round(value))
+            best, _ = self._improve(after_move, replay)
+
+            delta = float(np.abs(best - value).max())
+            value = best
+            sweeps += 1
+
+        _, policy = self._improve(after_move, replay, with_policy=True)
+        elapsed = time.perf_counter() - start
+        logger.info(f"Policy solved in {sweeps} sweeps ({elapsed:.1f}s, delta {delta:.2e})")
+        return {"policy": policy, "value": value, "sweeps": sweeps, "delta": delta, "elapsed": elapsed}
+
+    def _actions(self):
+        """
+        Jogadas do jogador, calculadas uma vez: (código, índices)
+
+        Os índices apontam para o vetor montado em _improve: valores após a
+        jogada, depois os de uma rodada nova (acerto exato) e por fim -inf
+        (jogada ilegal naquele estado).
+        """
+        shape = (ROUND_STATES, HAND_STATES)
+        rows = np.arange(ROUND_STATES)
+        replay_base = ROUND_STATES * HAND_STATES
+        illegal = replay_base + HAND_STATES
+        actions = []
+
+        def add(code: int, next_rows: np.ndarray, hands: np.ndarray, legal: np.ndarray, exact=None):
+            index = next_rows[:, None] * HAND_STATES + hands[None, :]
+            if exact is not None:
+                index = np.where(exact[:, None], replay_base + hands[None, :], index)
+            actions.append((code, np.where(legal, index, illegal).astype(np.int32)))
+
+        for v in range(1, 10):
+            remaining = self.room_left - v
+            next_rows = np.where(remaining > 0, self.limit * (self.limit - 1) // 2 + remaining - 1, rows)
+            legal = (remaining >= 0)[:, None] & self.has_number[v][None, :]
+            add(v, next_rows, self.without_number[v], legal, exact=remaining == 0)
+
+        add(ACTION_SKIP, rows, np.maximum(self.without_skip, 0), np.broadcast_to(self.skips >= 1, shape))
+        add(ACTION_RESET0, self.fresh[self.limit - 1], np.maximum(self.without_reset, 0),
+            np.broadcast_to(self.resets >= 1, shape))
+        return actions
+
+    def _improve(self, after_move: np.ndarray, replay: np.ndarray,
+                 with_policy: bool = False) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+        """Melhor valor (e, se pedido, a jogada) de cada estado dados os valores após a jogada"""
+        values = np.concatenate([after_move.ravel(), replay, [-np.inf]])
+        best = np.full(after_move.shape, -np.inf)
+        policy = np.full(after_move.shape, ACTION_PASS, dtype=np.uint8) if with_policy else None
+
+        for code, index in self.actions:
+            q = values.take(index)
+            if with_policy:
+                policy[q > best] = code
+            np.maximum(best, q, out=best)
+
+        # Sem jogada: punição
+        return np.where(best == -np.inf, replay - 1.0, best), policy
+
+def build_table(path: str = DEFAULT_TABLE_PATH, games: int = 2000, opponents: int = 2,
+                seed: int = 0, max_sweeps: int = 1000) -> Dict[str, Any]:
+    """Mede o modelo, resolve e grava a tabela; retorna um resumo"""
+    start = time.perf_counter()
+    model = estimate_opponent_model(games, DEFAULT_OPPONENTS, seed)
+    measured = time.perf_counter() - start
+
+    result = PolicySolver(model, opponents).solve(max_sweeps)
+    write_table(path, result["policy"].tobytes(), opponents)
+
+    actions = np.bincount(result["policy"].ravel(), minlength=ACTION_RESET0 + 1)
+    return {
+        "path": path,
+        "games": games,
+        "opponents": opponents,
+        "model_seconds": round(measured, 1),
+        "sweeps": result["sweeps"],
+        "delta": result["delta"],
+        "solve_seconds": round(result["elapsed"], 1),
+        "actions": {str(code): int(count) for code, count in enumerate(actions)}
+    }
+
+def main(argv: Optional[Sequence[str]] = None):
+    parser = argparse.ArgumentParser(description="Solve the MASTER bot policy table")
+    parser.add_argument("--games", type=int, default=2000, help="bot games used to measure the opponent model")
+    parser.add_argument("--opponents", type=int, default=2, help="opponents between two turns of the bot")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--sweeps", type=int, default=1000, help="maximum value-iteration sweeps")
+    parser.add_argument("--out", default=DEFAULT_TABLE_PATH)
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO)
+    summary = build_table(args.out, args.games, args.opponents, args.seed, args.sweeps)
+    for key, value in summary.items():
+        print(f"{key}: {value}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""
+Gravação e replay determinístico de partidas.
+
+Toda a aleatoriedade de uma partida sai dos geradores da sala, semeados em
+GameEngine.start_game (ver GameStateManager.seed_room). Assim uma partida
+fica definida por:
+    - jogadores no início da partida, na ordem de room.players (room.roster)
+    - room.seed
+    - room.action_log (ações aceitas, no formato de GameEngine.apply_action,
+      incluindo as saídas de jogadores no meio da partida)
+
+Reaplicar o log sobre uma sala nova com a mesma semente reproduz a partida
+bit a bit, sem bots nem atrasos: serve para benchmarks reprodutíveis e para
+reproduzir offline partidas de produção.
+"""
+
+import hashlib
+import json
+from typing import Any, Dict, Optional
+
+from ..models import RoomState, PlayerState
+from .state import GameStateManager
+from .rules import GameEngine
+
+class ReplayError(Exception):
+    """Uma ação registrada foi rejeitada durante o replay (o log não bate com a semente)"""
+
+def export_record(room: RoomState) -> Dict[str, Any]:
+    """
+    Registro serializável (JSON) da partida da sala
+    
+    Raises:
+        ValueError: se a sala foi restaurada de um snapshot e o log em
+                    memória não cobre a partida inteira
+    """
+    if room.action_base:
+        raise ValueError(f"Room {room.id} was restored from a snapshot; in-memory action log is incomplete")
+    return {
+        "room_id": room.id,
+        "max_players": room.max_players,
+        "seed": room.seed,
+        "players": list(room.roster) or [
+            {"id": p.id, "nickname": p.nickname, "is_bot": p.is_bot}
+            for p in room.players
+        ],
+        "actions": list(room.action_log)
+    }
+
+def replay(record: Dict[str, Any], engine: Optional[GameEngine] = None,
+           until: Optional[int] = None) -> RoomState:
+    """
+    Reconstrói a sala aplicando as ações registradas
+
+    Args:
+        record: Registro produzido por export_record
+        engine: Engine a usar (uma nova por padrão)
+        until: Aplica só as primeiras `until` ações (None = todas)
+
+    Returns:
+        Sala no estado após as ações aplicadas
+    """
+    engine = engine or GameEngine()
+    room = RoomState(id=record["room_id"], max_players=record.get("max_players", 8))
+    for player in record["players"]:
+        GameStateManager.add_player(room, PlayerState(**player))
+
+    engine.start_game(room, record["seed"])
+
+    for index, action in enumerate(record["actions"][:until]):
+        result = engine.apply_action(room, action["player_id"], action)
+        if not result["success"]:
+            raise ReplayError(f"Action {index} rejected during replay ({result['error']}): {action}")
+    return room
+
+def state_digest(room: RoomState) -> str:
+    """
+    Hash do estado de jogo da sala, para comparar uma partida com seu replay
+
+    Cobre mãos, monte, descarte, turno, direção, soma, limite e efeito pendente.
+    """
+    pending = room.pending_effect
+    state = {
+        "players": [
+            [p.id, p.tokens, p.is_eliminated, sorted(p.hand)]
+            for p in room.players
+        ],
+        "deck": list(room.deck),
+        "discard": room.deck.discard_pile,
+        "turn_order": room.turn_order,
+        "current_turn": room.current_turn,
+        "direction": room.direction,
+        "sum": room.accumulated_sum,
+        "limit": room.round_limit,
+        "pending": [pending.add, pending.multiplier, pending.source_player_id] if pending else None
+    }
+    return hashlib.sha256(json.dumps(state, separators=(",", ":")).encode()).hexdigest()
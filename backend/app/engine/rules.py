@@ -1,26 +1,89 @@
 import random
-from typing import List, Dict, Any, Optional
-from ..models import RoomState, PlayerState, CardComp, CardKind, PendingEffect
+from typing import List, Dict, Any, NamedTuple, Optional, Union
+from ..cards import (
+    FACE_JOKER, FACE_KINDS, FACE_PLUS2, FACE_TIMES2, FACE_RESET0, FACE_REVERSE, SPECIAL_FACES,
+    Hand, card_face, card_to_dict, card_uid, with_joker_value
+)
+from ..models import RoomState, PlayerState, PendingEffect
 from .state import GameStateManager
 from .deck import DeckManager
 
+# Acaso das jogadas hipotéticas sem gerador próprio (make_move nunca usa o da sala)
+_search_rng = random.Random()
+
+# Faces especiais, na ordem em que aparecem nas jogadas válidas
+SPECIAL_FACE_ORDER = (FACE_PLUS2, FACE_TIMES2, FACE_RESET0, FACE_REVERSE)
+
+class Move(NamedTuple):
+    """
+    Jogada compacta: cartas da mesma face são equivalentes, então uma jogada
+    é descrita pela face (e pelo valor somado), não por uma carta específica
+    """
+    type: str                    # "play_card", "play_special" ou "pass_turn"
+    face: int = -1               # Face da carta (ver cards.py)
+    value: Optional[int] = None  # Valor somado (número ou valor escolhido para o Joker)
+
+PASS_MOVE = Move("pass_turn")
+
+class MoveUndo:
+    """
+    Registro para desfazer uma jogada aplicada com GameEngine.make_move
+    
+    Guarda só o que a jogada pode mudar: escalares da rodada, cursor do
+    monte, carta jogada, cartas compradas e, numa eliminação, a posição do
+    jogador na ordem e no anel. A única cópia (o descarte) é feita no caso
+    raro de reembaralhamento. O acaso (D20, reembaralhamento) sai de um
+    gerador da busca, e não da sala, então não há estado de gerador a guardar.
+    """
+    
+    __slots__ = (
+        "player", "card", "accumulated_sum", "round_limit", "pending_effect", "direction",
+        "current_turn", "deck_cards", "deck_pos", "discard_len", "discard_backup",
+        "drawn", "tokens", "turn_index", "neighbors"
+    )
+    
+    def __init__(self, room: RoomState, player: PlayerState):
+        self.player = player
+        self.card: Optional[int] = None  # Carta jogada, como estava na mão
+        self.accumulated_sum = room.accumulated_sum
+        self.round_limit = room.round_limit
+        self.pending_effect = room.pending_effect
+        self.direction = room.direction
+        self.current_turn = room.current_turn
+        self.deck_cards = room.deck.cards  # Deck.refill troca a lista, não a altera
+        self.deck_pos = room.deck.pos
+        self.discard_len = len(room.deck.discard_pile)
+        self.discard_backup: Optional[List[int]] = None
+        self.drawn: List[tuple] = []  # (mão, cartas compradas)
+        self.tokens = player.tokens
+        self.turn_index: Optional[int] = None  # Posição em turn_order (só em eliminação)
+        self.neighbors: Optional[tuple] = None  # (anterior, próximo) no anel (só em eliminação)
+
 class GameEngine:
     """Engine principal que implementa as regras do jogo SOMO"""
     
-    def start_game(self, room: RoomState):
+    def start_game(self, room: RoomState, seed: Optional[int] = None):
         """
         Inicia o jogo na sala
+        - Semeia os geradores da sala (toda a aleatoriedade da partida sai deles)
         - Cria e embaralha o baralho
         - Distribui 7 cartas para cada jogador
         - Define ordem dos turnos
         - Inicia primeira rodada
+        
+        Args:
+            seed: Semente da partida; None sorteia uma nova (fica em room.seed)
         """
+        GameStateManager.seed_room(room, seed)
+        room.action_log = []
+        room.action_base = 0
+        room.roster = [{"id": p.id, "nickname": p.nickname, "is_bot": p.is_bot} for p in room.players]
+        
         # Cria e embaralha o baralho
-        room.deck = DeckManager.create_and_shuffle_deck()
-        room.discard_pile = []
+        room.deck = DeckManager.create_and_shuffle_deck(GameStateManager.rng(room))
         
         # Distribui 7 cartas para cada jogador
-        room.deck = GameStateManager.distribute_cards_to_all(room, room.deck, 7)
+        GameStateManager.distribute_cards_to_all(room, 7)
         
         # Inicializa ordem dos turnos
         GameStateManager.initialize_turn_order(room)
@@ -73,7 +136,7 @@ class GameEngine:
         
         return modified_value
     
-    def play_card(self, room: RoomState, player_id: str, card_id: str, as_value: Optional[int] = None) -> Dict[str, Any]:
+    def play_card(self, room: RoomState, player_id: str, card_id: Union[str, int], as_value: Optional[int] = None) -> Dict[str, Any]:
         """
         Joga uma carta numérica ou joker
         
@@ -98,25 +161,30 @@ class GameEngine:
             return {"success": False, "error": "Player not found"}
         
         card = GameStateManager.find_card_in_hand(player, card_id)
-        if not card:
+        if card is None:
             return {"success": False, "error": "CardComp not in hand"}
         
         # Verifica se é carta numérica ou joker
-        if card.kind not in [CardKind.NUMBER, CardKind.JOKER]:
+        face = card_face(card)
+        if face > FACE_JOKER:
             return {"success": False, "error": "Use play_special for special cards"}
         
         # Para joker, valida o valor escolhido
-        if card.kind == CardKind.JOKER:
+        if face == FACE_JOKER:
             if as_value is None or as_value < 0 or as_value > 9:
                 return {"success": False, "error": "Joker requires as_value between 0-9"}
             card_value = as_value
         else:
-            card_value = card.value
+            card_value = face
         
         # Verifica se pode jogar a carta (sem efeito pendente na validação)
         if not self.can_play_number(card_value, room.accumulated_sum, room.round_limit):
             return {"success": False, "error": "CardComp would exceed limit"}
         
+        self._record_action(room, {
+            "type": "play_card", "player_id": player_id, "card_id": str(card_uid(card)), "as_value": as_value
+        })
+        
         # Remove a carta da mão
         GameStateManager.remove_card_from_hand(player, card_id)
         
@@ -127,10 +195,8 @@ class GameEngine:
         room.accumulated_sum += card_value  # Soma sempre usa o valor base da carta
         
         # Adiciona à pilha de descarte
-        played_card = card.model_copy()
-        if card.kind == CardKind.JOKER:
-            played_card.value = as_value
-        room.discard_pile.append(played_card)
+        played_card = with_joker_value(card, as_value) if face == FACE_JOKER else card
+        room.deck.discard(played_card)
         
         events = []
         
@@ -138,7 +204,7 @@ class GameEngine:
         events.append({
             "event": "card_played",
             "player_id": player_id,
-            "card": played_card.model_dump(),
+            "card": card_to_dict(played_card),
             "sum": room.accumulated_sum
         })
         
@@ -149,7 +215,7 @@ class GameEngine:
         # Verifica acerto exato
         if room.accumulated_sum == room.round_limit:
             # Jogador compra +2 cartas
-            room.deck = GameStateManager.distribute_cards_to_player(room, room.deck, player_id, 2)
+            GameStateManager.distribute_cards_to_player(room, player_id, 2)
             
             events.append({
                 "event": "draw_cards",
@@ -179,10 +245,9 @@ class GameEngine:
             })
             
             # Todos compram 2 cartas
-            draw_events = []
-            for p in GameStateManager.get_active_players(room):
-                room.deck = GameStateManager.distribute_cards_to_player(room, room.deck, p.id, 2)
-                draw_events.append({"id": p.id, "amount": 2})
+            active_players = GameStateManager.get_active_players(room)
+            GameStateManager.distribute_cards_to_all(room, 2)
+            draw_events = [{"id": p.id, "amount": 2} for p in active_players]
             
             if draw_events:
                 events.append({
@@ -222,7 +287,7 @@ class GameEngine:
         
         return {"success": True, "events": events}
     
-    def play_special(self, room: RoomState, player_id: str, card_id: str, special_type: str) -> Dict[str, Any]:
+    def play_special(self, room: RoomState, player_id: str, card_id: Union[str, int], special_type: str) -> Dict[str, Any]:
         """
         Joga uma carta especial
         
@@ -247,25 +312,24 @@ class GameEngine:
             return {"success": False, "error": "Player not found"}
         
         card = GameStateManager.find_card_in_hand(player, card_id)
-        if not card:
+        if card is None:
             return {"success": False, "error": "CardComp not in hand"}
         
         # Verifica se a carta corresponde ao tipo especial
-        expected_kind = {
-            "plus2": CardKind.PLUS2,
-            "times2": CardKind.TIMES2,
-            "reset0": CardKind.RESET0,
-            "reverse": CardKind.REVERSE
-        }.get(special_type)
-        
-        if card.kind != expected_kind:
+        expected_face = SPECIAL_FACES.get(special_type)
+        
+        if card_face(card) != expected_face:
             return {"success": False, "error": f"CardComp is not {special_type}"}
         
+        self._record_action(room, {
+            "type": "play_special", "player_id": player_id, "card_id": str(card_uid(card)), "special_type": special_type
+        })
+        
         # Remove a carta da mão
         GameStateManager.remove_card_from_hand(player, card_id)
         
         # Adiciona à pilha de descarte
-        room.discard_pile.append(card)
+        room.deck.discard(card)
         
         events = []
         
@@ -342,6 +406,8 @@ class GameEngine:
         if not player:
             return {"success": False, "error": "Player not found"}
         
+        self._record_action(room, {"type": "pass_turn", "player_id": player_id})
+        
         events = []
         
         # Aplica punição
@@ -354,10 +420,9 @@ class GameEngine:
         })
         
         # Todos compram 2 cartas
-        draw_events = []
-        for p in GameStateManager.get_active_players(room):
-            room.deck = GameStateManager.distribute_cards_to_player(room, room.deck, p.id, 2)
-            draw_events.append({"id": p.id, "amount": 2})
+        active_players = GameStateManager.get_active_players(room)
+        GameStateManager.distribute_cards_to_all(room, 2)
+        draw_events = [{"id": p.id, "amount": 2} for p in active_players]
         
         if draw_events:
             events.append({
@@ -388,63 +453,258 @@ class GameEngine:
         
         return {"success": True, "events": events}
     
-    def get_valid_plays(self, room: RoomState, player_id: str) -> List[Dict[str, Any]]:
+    def _record_action(self, room: RoomState, action: Dict[str, Any]):
         """
-        Retorna lista de jogadas válidas para um jogador
+        Registra uma ação aceita no log da sala (no formato de apply_action)
+        
+        Com room.seed e o log, a partida pode ser reproduzida (ver replay.py).
+        """
+        room.action_log.append(action)
+    
+    def apply_action(self, room: RoomState, player_id: str, action: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Aplica uma ação no formato produzido pelos bots
+        ({"type": "play_card" | "play_special" | "pass_turn", ...}) ou a
+        saída de um jogador registrada no log ({"type": "leave"})
         
         Returns:
-            Lista de dicionários descrevendo jogadas válidas
+            Dicionário com resultado da ação (como play_card/play_special/force_penalty)
+        """
+        action_type = action.get("type")
+        if action_type == "play_card":
+            return self.play_card(room, player_id, action["card_id"], action.get("as_value"))
+        if action_type == "play_special":
+            return self.play_special(room, player_id, action["card_id"], action["special_type"])
+        if action_type == "pass_turn":
+            return self.force_penalty(room, player_id)
+        if action_type == "leave":
+            if not GameStateManager.remove_player(room, player_id):
+                return {"success": False, "error": "Player not found"}
+            return {"success": True, "events": []}
+        return {"success": False, "error": f"Unknown action type: {action_type}"}
+    
+    def playable_room(self, room: RoomState) -> int:
+        """Maior valor numérico que ainda cabe na soma atual (negativo se nenhum)"""
+        return room.round_limit - room.accumulated_sum
+    
+    def lowest_playable_number(self, room: RoomState, hand: Hand) -> Optional[int]:
+        """Menor carta numérica jogável da mão, em O(1)"""
+        return hand.lowest_number(self.playable_room(room))
+    
+    def has_legal_play(self, room: RoomState, hand: Hand) -> bool:
+        """Verifica, em O(1), se a mão tem alguma jogada além de passar o turno"""
+        room_left = self.playable_room(room)
+        if room_left < 0:
+            return any(hand.has(face) for face in SPECIAL_FACE_ORDER)
+        return (
+            hand.lowest_number(room_left) is not None
+            or hand.has(FACE_JOKER)
+            or any(hand.has(face) for face in SPECIAL_FACE_ORDER)
+        )
+    
+    def legal_moves(self, room: RoomState, player_id: str) -> List[Move]:
+        """
+        Retorna as jogadas válidas de um jogador, uma por face distinta
+        
+        Usa as contagens por face da mão: no máximo 15 jogadas, sem percorrer
+        as cartas. Se não há jogada possível, retorna apenas PASS_MOVE.
         """
         player = GameStateManager.get_player_by_id(room, player_id)
         if not player or room.current_turn != player_id:
             return []
         
-        valid_plays = []
+        hand = player.hand
+        room_left = self.playable_room(room)
+        moves = []
         
-        for card in player.hand:
-            if card.kind == CardKind.NUMBER:
-                if self.can_play_number(card.value, room.accumulated_sum, room.round_limit):
-                    valid_plays.append({
-                        "type": "play_card",
-                        "card_id": card.id,
-                        "card_kind": card.kind.value,
-                        "card_value": card.value
-                    })
-            
-            elif card.kind == CardKind.JOKER:
-                # Joker pode ser jogado com qualquer valor que seja válido
-                for value in range(10):
-                    if self.can_play_number(value, room.accumulated_sum, room.round_limit):
-                        valid_plays.append({
-                            "type": "play_card",
-                            "card_id": card.id,
-                            "card_kind": card.kind.value,
-                            "as_value": value
-                        })
-                        break  # Só precisa de uma opção válida para joker
-            
-            else:
-                # Cartas especiais sempre podem ser jogadas
-                special_type = {
-                    CardKind.PLUS2: "plus2",
-                    CardKind.TIMES2: "times2",
-                    CardKind.RESET0: "reset0",
-                    CardKind.REVERSE: "reverse"
-                }.get(card.kind)
-                
-                if special_type:
-                    valid_plays.append({
-                        "type": "play_special",
-                        "card_id": card.id,
-                        "card_kind": card.kind.value,
-                        "special_type": special_type
-                    })
+        for value in range(min(room_left, 9) + 1):
+            if hand.has(value):
+                moves.append(Move("play_card", value, value))
         
-        # Se não há jogadas válidas, pode passar o turno (força punição)
-        if not valid_plays:
-            valid_plays.append({
-                "type": "pass_turn"
-            })
+        # Joker vale o menor valor válido (0) se ainda couber algo
+        if room_left >= 0 and hand.has(FACE_JOKER):
+            moves.append(Move("play_card", FACE_JOKER, 0))
+        
+        # Cartas especiais sempre podem ser jogadas
+        for face in SPECIAL_FACE_ORDER:
+            if hand.has(face):
+                moves.append(Move("play_special", face))
+        
+        if not moves:
+            moves.append(PASS_MOVE)
+        
+        return moves
+    
+    def move_to_action(self, player: PlayerState, move: Move) -> Dict[str, Any]:
+        """Converte uma jogada compacta na ação (com card_id) usada por bots e ws"""
+        if move.type == "play_card":
+            action = {"type": "play_card", "card_id": card_uid(player.hand.first(move.face))}
+            if move.face == FACE_JOKER:
+                action["as_value"] = move.value
+            return action
+        
+        if move.type == "play_special":
+            return {
+                "type": "play_special",
+                "card_id": card_uid(player.hand.first(move.face)),
+                "special_type": FACE_KINDS[move.face]
+            }
+        
+        return {"type": "pass_turn"}
+    
+    def action_to_move(self, player: PlayerState, action: Dict[str, Any]) -> Optional[Move]:
+        """
+        Jogada compacta de uma ação (inverso de move_to_action)
+        
+        Returns:
+            Move, ou None se a carta da ação não está na mão do jogador
+        """
+        if action["type"] == "pass_turn":
+            return PASS_MOVE
+        
+        card = GameStateManager.find_card_in_hand(player, action["card_id"])
+        if card is None:
+            return None
+        
+        face = card_face(card)
+        if action["type"] == "play_special":
+            return Move("play_special", face)
+        if face == FACE_JOKER:
+            return Move("play_card", face, action.get("as_value"))
+        return Move("play_card", face, face)
+    
+    def get_valid_plays(self, room: RoomState, player_id: str) -> List[Dict[str, Any]]:
+        """
+        Retorna lista de jogadas válidas para um jogador
+        
+        Uma entrada por face distinta (ver legal_moves), com uma carta
+        representativa daquela face.
+        
+        Returns:
+            Lista de dicionários descrevendo jogadas válidas
+        """
+        player = GameStateManager.get_player_by_id(room, player_id)
+        valid_plays = []
+        
+        for move in self.legal_moves(room, player_id):
+            play = self.move_to_action(player, move)
+            if move.type == "play_card":
+                play["card_kind"] = FACE_KINDS[move.face]
+                if move.face != FACE_JOKER:
+                    play["card_value"] = move.value
+            elif move.type == "play_special":
+                play["card_kind"] = play["special_type"]
+            valid_plays.append(play)
         
         return valid_plays
-
+    
+    # ------------------------------------------------------------------
+    # Make/unmake: jogadas hipotéticas para bots com busca
+    # ------------------------------------------------------------------
+    
+    def make_move(self, room: RoomState, player_id: str, move: Move,
+                  chance: Optional[random.Random] = None) -> MoveUndo:
+        """
+        Aplica uma jogada de legal_moves sem gerar eventos nem registrar no log
+        
+        Mesmas regras de play_card/play_special/force_penalty, mas pensado
+        para busca: nada de cópias da sala, e o retorno desfaz a jogada com
+        unmake_move. O turno deve ser de player_id e a jogada, válida.
+        
+        Args:
+            chance: Gerador do D20 e dos reembaralhamentos da jogada (o da
+                    busca); sem ele, um gerador do módulo. O gerador da sala
+                    nunca é usado, então desfazer não precisa restaurá-lo
+        
+        Returns:
+            Registro para unmake_move (desfazer na ordem inversa)
+        """
+        chance = chance or _search_rng
+        player = GameStateManager.get_player_by_id(room, player_id)
+        undo = MoveUndo(room, player)
+        
+        if move.type == "pass_turn":
+            if player.tokens <= 1:
+                # Eliminação: guarda a posição para desfazer sem refazer o anel
+                registry = GameStateManager.registry(room)
+                undo.turn_index = room.turn_order.index(player_id)
+                undo.neighbors = (registry.prev_id[player_id], registry.next_id[player_id])
+            GameStateManager.apply_penalty(room, player_id)
+            for other in GameStateManager.get_active_players(room):
+                self._draw_for_search(room, other, 2, undo, chance)
+            GameStateManager.reset_round(room, chance)
+            return undo
+        
+        card = player.hand.first(move.face)
+        player.hand.remove(card_uid(card))
+        undo.card = card
+        
+        if move.type == "play_card":
+            room.accumulated_sum += move.value
+            room.deck.discard(with_joker_value(card, move.value) if move.face == FACE_JOKER else card)
+            room.pending_effect = None
+            
+            if room.accumulated_sum == room.round_limit:
+                self._draw_for_search(room, player, 2, undo, chance)
+                GameStateManager.reset_round(room, chance)
+                return undo
+        else:
+            room.deck.discard(card)
+            if move.face == FACE_RESET0:
+                room.accumulated_sum = 0
+            elif move.face == FACE_PLUS2:
+                room.pending_effect = PendingEffect(add=2, source_player_id=player_id)
+            elif move.face == FACE_TIMES2:
+                room.pending_effect = PendingEffect(multiplier=2, source_player_id=player_id)
+            elif move.face == FACE_REVERSE:
+                GameStateManager.reverse_direction(room)
+        
+        GameStateManager.advance_turn(room)
+        return undo
+    
+    def unmake_move(self, room: RoomState, undo: MoveUndo):
+        """Desfaz uma jogada aplicada com make_move (a mais recente ainda não desfeita)"""
+        player = undo.player
+        deck = room.deck
+        
+        for hand, cards in reversed(undo.drawn):
+            for card in reversed(cards):  # Topos das pilhas primeiro: remoção O(1)
+                hand.remove(card_uid(card))
+        
+        if undo.discard_backup is not None:
+            deck.discard_pile[:] = undo.discard_backup
+        del deck.discard_pile[undo.discard_len:]
+        deck.cards = undo.deck_cards
+        deck.pos = undo.deck_pos
+        
+        if undo.card is not None:
+            # A carta saiu do topo da pilha da face: devolvê-la ao topo basta
+            player.hand.append(undo.card)
+        
+        player.tokens = undo.tokens
+        if undo.turn_index is not None:
+            # Desfaz a eliminação: volta à ordem e ao anel na posição original
+            registry = GameStateManager.registry(room)
+            player.is_eliminated = False
+            registry.active_count += 1
+            room.turn_order.insert(undo.turn_index, player.id)
+            registry.relink(player.id, *undo.neighbors)
+        
+        room.accumulated_sum = undo.accumulated_sum
+        room.round_limit = undo.round_limit
+        room.pending_effect = undo.pending_effect
+        room.direction = undo.direction
+        room.current_turn = undo.current_turn
+    
+    def _draw_for_search(self, room: RoomState, player: PlayerState, count: int, undo: MoveUndo,
+                         chance: random.Random):
+        """Compra cartas guardando no registro o necessário para desfazer"""
+        deck = room.deck
+        if count > len(deck) and len(deck.discard_pile) > 1:
+            # O monte vai ser refeito com o descarte, embaralhado pelo gerador da busca
+            if undo.discard_backup is None:
+                undo.discard_backup = list(deck.discard_pile)
+            deck.refill(chance.shuffle)
+        cards = deck.draw(count)
+        player.hand.extend(cards)
+        undo.drawn.append((player.hand, cards))
@@ -1,10 +1,142 @@
 import random
-from typing import List, Optional
-from ..models import RoomState, PlayerState, CardComp, PendingEffect
+from typing import Dict, Iterable, List, Optional, Union
+from ..cards import parse_card_id
+from ..models import RoomState, PlayerState, PendingEffect
+
+def is_active(player: PlayerState) -> bool:
+    return not player.is_eliminated and player.tokens > 0
+
+class PlayerRegistry:
+    """
+    Índice de jogadores de uma sala
+    
+    - by_id: id -> jogador (lookup O(1))
+    - active_count: número de jogadores ativos, mantido a cada eliminação
+    - next_id/prev_id: anel circular dos jogadores ativos na ordem dos turnos,
+      de forma que avançar o turno ou eliminar alguém custa O(1)
+    """
+    
+    __slots__ = ("by_id", "active_count", "next_id", "prev_id")
+    
+    def __init__(self, players: Iterable[PlayerState] = (), turn_order: Iterable[str] = ()):
+        self.by_id: Dict[str, PlayerState] = {p.id: p for p in players}
+        self.active_count = sum(1 for p in self.by_id.values() if is_active(p))
+        self.next_id: Dict[str, str] = {}
+        self.prev_id: Dict[str, str] = {}
+        self.build_ring(turn_order)
+    
+    def build_ring(self, turn_order: Iterable[str]):
+        """Monta o anel com os jogadores ativos, na ordem dos turnos"""
+        order = [pid for pid in turn_order if pid in self.by_id and is_active(self.by_id[pid])]
+        self.next_id = {pid: order[(i + 1) % len(order)] for i, pid in enumerate(order)}
+        self.prev_id = {pid: order[i - 1] for i, pid in enumerate(order)}
+    
+    def step(self, player_id: str, clockwise: bool) -> Optional[str]:
+        """Vizinho de um jogador no anel, na direção dada"""
+        return (self.next_id if clockwise else self.prev_id).get(player_id)
+    
+    def unlink(self, player_id: str) -> bool:
+        """Remove um jogador do anel; retorna False se ele não estava no anel"""
+        nxt = self.next_id.pop(player_id, None)
+        prv = self.prev_id.pop(player_id, None)
+        if nxt is None:
+            return False
+        if nxt != player_id:
+            self.next_id[prv] = nxt
+            self.prev_id[nxt] = prv
+        return True
+    
+    def relink(self, player_id: str, prev_id: str, next_id: str):
+        """Devolve ao anel, entre os vizinhos de antes, um jogador tirado com unlink (desfazer)"""
+        self.prev_id[player_id] = prev_id
+        self.next_id[player_id] = next_id
+        self.next_id[prev_id] = player_id
+        self.prev_id[next_id] = player_id
+
+# Fonte das sementes de salas sem semente definida (não compartilha estado
+# com o módulo random global)
+_seed_source = random.SystemRandom()
 
 class GameStateManager:
     """Gerencia o estado do jogo, turnos e transições"""
     
+    @staticmethod
+    def seed_room(room: RoomState, seed: Optional[int] = None):
+        """
+        Define a semente da sala e recria seus geradores
+        
+        Args:
+            seed: Semente; None sorteia uma nova (registrada em room.seed)
+        """
+        room.seed = seed if seed is not None else _seed_source.getrandbits(63)
+        room.rng = random.Random(room.seed)
+    
+    @staticmethod
+    def rng(room: RoomState) -> random.Random:
+        """Gerador da engine para a sala (baralho, ordem dos turnos, D20)"""
+        if room.rng is None:
+            GameStateManager.seed_room(room, room.seed)
+        return room.rng
+    
+    @staticmethod
+    def action_count(room: RoomState) -> int:
+        """Número de ações aplicadas na partida (inclui as anteriores a um snapshot restaurado)"""
+        return room.action_base + len(room.action_log)
+    
+    @staticmethod
+    def bot_rng(room: RoomState) -> random.Random:
+        """
+        Gerador para a próxima decisão de bot da sala
+        
+        Fluxo separado do da engine (o replay reaplica as ações registradas
+        sem consultar os bots) e derivado de (semente, nº da ação), sem estado
+        próprio a guardar: a decisão é a mesma numa sala restaurada.
+        """
+        if room.seed is None:
+            GameStateManager.seed_room(room)
+        return random.Random(f"{room.seed}:bots:{GameStateManager.action_count(room)}")
+    
+    @staticmethod
+    def registry(room: RoomState) -> PlayerRegistry:
+        """Retorna o índice de jogadores da sala, criando-o na primeira vez"""
+        registry = room.registry
+        if registry is None:
+            registry = room.registry = PlayerRegistry(room.players, room.turn_order)
+        return registry
+    
+    @staticmethod
+    def add_player(room: RoomState, player: PlayerState):
+        """Adiciona um jogador à sala mantendo o índice atualizado"""
+        registry = GameStateManager.registry(room)
+        room.players.append(player)
+        registry.by_id[player.id] = player
+        if is_active(player):
+            registry.active_count += 1
+    
+    @staticmethod
+    def remove_player(room: RoomState, player_id: str) -> Optional[PlayerState]:
+        """
+        Remove um jogador da sala mantendo o índice atualizado
+        
+        Com o jogo em andamento, o jogador sai do anel de turnos como se tivesse
+        sido eliminado (a vez passa adiante se era dele) e a saída entra no
+        log de ações, para que o replay a reproduza no mesmo ponto.
+        """
+        registry = GameStateManager.registry(room)
+        player = registry.by_id.get(player_id)
+        if not player:
+            return None
+        
+        if is_active(player):
+            GameStateManager._leave_turn_order(room, player_id)
+            registry.active_count -= 1
+        
+        del registry.by_id[player_id]
+        room.players.remove(player)
+        if room.game_started:
+            room.action_log.append({"type": "leave", "player_id": player_id})
+        return player
+    
     @staticmethod
     def initialize_turn_order(room: RoomState):
         """
@@ -18,7 +150,7 @@ class GameStateManager:
             return
         
         # Embaralha a ordem dos jogadores
-        random.shuffle(active_players)
+        GameStateManager.rng(room).shuffle(active_players)
         
         # Define a ordem dos turnos
         room.turn_order = [p.id for p in active_players]
@@ -28,6 +160,8 @@ class GameStateManager:
         
         # Direção inicial é sempre horária
         room.direction = True
+        
+        GameStateManager.registry(room).build_ring(room.turn_order)
     
     @staticmethod
     def get_current_player_index(room: RoomState) -> Optional[int]:
@@ -46,29 +180,11 @@ class GameStateManager:
         Retorna o ID do próximo jogador na ordem dos turnos
         Considera a direção atual (horária ou anti-horária)
         """
-        current_index = GameStateManager.get_current_player_index(room)
-        if current_index is None:
-            return None
-        
-        active_players = [pid for pid in room.turn_order 
-                         if not GameStateManager.is_player_eliminated(room, pid)]
-        
-        if not active_players:
-            return None
-        
-        # Encontra o índice do jogador atual na lista de jogadores ativos
-        try:
-            current_active_index = active_players.index(room.current_turn)
-        except ValueError:
+        if not room.current_turn:
             return None
         
-        # Calcula o próximo índice baseado na direção
-        if room.direction:  # Horário
-            next_index = (current_active_index + 1) % len(active_players)
-        else:  # Anti-horário
-            next_index = (current_active_index - 1) % len(active_players)
-        
-        return active_players[next_index]
+        # Vizinho no anel de jogadores ativos: O(1)
+        return GameStateManager.registry(room).step(room.current_turn, room.direction)
     
     @staticmethod
     def advance_turn(room: RoomState) -> Optional[str]:
@@ -102,8 +218,25 @@ class GameStateManager:
     @staticmethod
     def is_player_eliminated(room: RoomState, player_id: str) -> bool:
         """Verifica se um jogador foi eliminado"""
-        player = next((p for p in room.players if p.id == player_id), None)
-        return player is None or player.is_eliminated or player.tokens <= 0
+        player = GameStateManager.registry(room).by_id.get(player_id)
+        return player is None or not is_active(player)
+    
+    @staticmethod
+    def _leave_turn_order(room: RoomState, player_id: str):
+        """Tira um jogador do anel e da ordem dos turnos, passando a vez se era dele"""
+        registry = GameStateManager.registry(room)
+        
+        # O sucessor é calculado antes de desfazer o anel
+        successor = registry.step(player_id, room.direction)
+        registry.unlink(player_id)
+        
+        # Remove da ordem dos turnos
+        if player_id in room.turn_order:
+            room.turn_order.remove(player_id)
+        
+        # Se era o jogador atual, a vez passa para o próximo
+        if room.current_turn == player_id:
+            room.current_turn = successor if successor != player_id else None
     
     @staticmethod
     def eliminate_player(room: RoomState, player_id: str):
@@ -111,23 +244,26 @@ class GameStateManager:
         Elimina um jogador do jogo
         Remove da ordem dos turnos e marca como eliminado
         """
-        player = next((p for p in room.players if p.id == player_id), None)
+        registry = GameStateManager.registry(room)
+        player = registry.by_id.get(player_id)
         if player:
+            # apply_penalty já zerou os tokens: conta pelo flag de eliminação
+            if not player.is_eliminated:
+                registry.active_count -= 1
             player.is_eliminated = True
             player.tokens = 0
         
-        # Remove da ordem dos turnos
-        if player_id in room.turn_order:
-            room.turn_order.remove(player_id)
-        
-        # Se era o jogador atual, avança para o próximo
-        if room.current_turn == player_id:
-            GameStateManager.advance_turn(room)
+        GameStateManager._leave_turn_order(room, player_id)
     
     @staticmethod
     def get_active_players(room: RoomState) -> List[PlayerState]:
         """Retorna lista de jogadores ativos (não eliminados)"""
-        return [p for p in room.players if not p.is_eliminated and p.tokens > 0]
+        return [p for p in room.players if is_active(p)]
+    
+    @staticmethod
+    def get_active_count(room: RoomState) -> int:
+        """Número de jogadores ativos, sem percorrer a lista"""
+        return GameStateManager.registry(room).active_count
     
     @staticmethod
     def check_game_over(room: RoomState) -> Optional[str]:
@@ -137,24 +273,24 @@ class GameStateManager:
         Returns:
             ID do jogador vencedor ou None se o jogo continua
         """
-        active_players = GameStateManager.get_active_players(room)
-        
-        if len(active_players) <= 1:
-            return active_players[0].id if active_players else None
+        # Caso comum (jogo continua) resolvido pela contagem mantida
+        if GameStateManager.get_active_count(room) > 1:
+            return None
         
-        return None
+        winner = next((p for p in room.players if is_active(p)), None)
+        return winner.id if winner else None
     
     @staticmethod
-    def reset_round(room: RoomState):
+    def reset_round(room: RoomState, rng: Optional[random.Random] = None):
         """
         Reinicia uma rodada
         - Zera accumulated_sum
         - Remove pending_effect
-        - Rola novo D20 para round_limit
+        - Rola novo D20 para round_limit (com `rng`, se dado, e não o gerador da sala)
         """
         room.accumulated_sum = 0
         room.pending_effect = None
-        room.round_limit = random.randint(1, 20)  # D20
+        room.round_limit = (rng or GameStateManager.rng(room)).randint(1, 20)  # D20
     
     @staticmethod
     def apply_penalty(room: RoomState, player_id: str) -> bool:
@@ -166,7 +302,7 @@ class GameStateManager:
         Returns:
             True se o jogador foi eliminado, False caso contrário
         """
-        player = next((p for p in room.players if p.id == player_id), None)
+        player = GameStateManager.registry(room).by_id.get(player_id)
         if not player:
             return False
         
@@ -179,77 +315,61 @@ class GameStateManager:
         return False
     
     @staticmethod
-    def distribute_cards_to_all(room: RoomState, deck: List[CardComp], cards_per_player: int) -> List[CardComp]:
+    def distribute_cards_to_all(room: RoomState, cards_per_player: int):
         """
         Distribui cartas para todos os jogadores ativos
         
         Args:
-            room: Estado da sala
-            deck: Baralho atual
+            room: Estado da sala (as cartas saem de room.deck)
             cards_per_player: Número de cartas por jogador
-            
-        Returns:
-            Baralho restante após distribuição
         """
         active_players = GameStateManager.get_active_players(room)
-        remaining_deck = deck.copy()
-        
-        for player in active_players:
-            cards_to_draw = min(cards_per_player, len(remaining_deck))
-            if cards_to_draw > 0:
-                drawn_cards = remaining_deck[:cards_to_draw]
-                remaining_deck = remaining_deck[cards_to_draw:]
-                player.hand.extend(drawn_cards)
-        
-        return remaining_deck
+        room.deck.deal((p.hand for p in active_players), cards_per_player)
     
     @staticmethod
-    def distribute_cards_to_player(room: RoomState, deck: List[CardComp], player_id: str, card_count: int) -> List[CardComp]:
+    def distribute_cards_to_player(room: RoomState, player_id: str, card_count: int) -> List[int]:
         """
         Distribui cartas para um jogador específico
         
         Args:
-            room: Estado da sala
-            deck: Baralho atual
+            room: Estado da sala (as cartas saem de room.deck)
             player_id: ID do jogador
             card_count: Número de cartas
             
         Returns:
-            Baralho restante após distribuição
+            Cartas compradas pelo jogador
         """
-        player = next((p for p in room.players if p.id == player_id), None)
+        player = GameStateManager.get_player_by_id(room, player_id)
         if not player:
-            return deck
-        
-        cards_to_draw = min(card_count, len(deck))
-        if cards_to_draw > 0:
-            drawn_cards = deck[:cards_to_draw]
-            remaining_deck = deck[cards_to_draw:]
-            player.hand.extend(drawn_cards)
-            return remaining_deck
+            return []
         
-        return deck
+        drawn_cards = room.deck.draw(card_count)
+        player.hand.extend(drawn_cards)
+        return drawn_cards
     
     @staticmethod
-    def find_card_in_hand(player: PlayerState, card_id: str) -> Optional[CardComp]:
-        """Encontra uma carta na mão do jogador pelo ID"""
-        return next((card for card in player.hand if card.id == card_id), None)
+    def find_card_in_hand(player: PlayerState, card_id: Union[str, int]) -> Optional[int]:
+        """Encontra uma carta (codificada) na mão do jogador pelo ID, em O(1)"""
+        uid = parse_card_id(card_id)
+        if uid is None:
+            return None
+        return player.hand.get(uid)
     
     @staticmethod
-    def remove_card_from_hand(player: PlayerState, card_id: str) -> Optional[CardComp]:
+    def remove_card_from_hand(player: PlayerState, card_id: Union[str, int]) -> Optional[int]:
         """
-        Remove uma carta da mão do jogador
+        Remove uma carta da mão do jogador (O(1))
         
         Returns:
             A carta removida ou None se não encontrada
         """
-        card = GameStateManager.find_card_in_hand(player, card_id)
-        if card:
-            player.hand.remove(card)
-        return card
+        uid = parse_card_id(card_id)
+        if uid is None:
+            return None
+        return player.hand.remove(uid)
     
     @staticmethod
     def get_player_by_id(room: RoomState, player_id: str) -> Optional[PlayerState]:
-        """Encontra um jogador pelo ID"""
-        return next((p for p in room.players if p.id == player_id), None)
+        """Encontra um jogador pelo ID (O(1) via índice da sala)"""
+        return GameStateManager.registry(room).by_id.get(player_id)
 
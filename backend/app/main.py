@@ -1,9 +1,14 @@
 from fastapi import FastAPI, WebSocket, WebSocketDisconnect, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response
 from .ws import manager
 from .services.room_manager import room_manager
+from .services.room_store import RoomStore
+from .services.wire import negotiate
+from .engine.replay import export_record
+from .engine.state import GameStateManager
 import uuid
+import os
 import logging
 
 # Configuração de logging
@@ -12,6 +17,9 @@ logger = logging.getLogger(__name__)
 
 app = FastAPI()
 
+# Arquivo SQLite com o log e os snapshots das salas (sem a variável, sem persistência)
+ROOM_STORE_PATH = os.environ.get("SOMO_ROOM_STORE", "")
+
 origins = [
     "http://localhost:3000",  # Para desenvolvimento local
     "https://somo-network.vercel.app/", # Substitua pela URL do seu frontend Vercel
@@ -32,6 +40,19 @@ async def startup_event():
     logger.info("Starting SOMO backend server...")
     room_manager.start_cleanup_task()
     logger.info("Room cleanup task started")
+    
+    # Pool de processos dos bots criado agora (forkserver), não sob demanda
+    manager.bot_executor.start()
+    
+    # Persistência das salas (opcional: só com SOMO_ROOM_STORE definido)
+    if ROOM_STORE_PATH:
+        store = RoomStore(ROOM_STORE_PATH)
+        recovered = room_manager.attach_store(store, manager.game_engine)
+        # Humanos das salas recuperadas voltam pelo token gravado (ou saem da sala)
+        manager.recover_sessions(store, recovered)
+        for room in recovered:
+            # Salas recuperadas na vez de um bot voltam a andar sozinhas
+            manager._ensure_turn_driver(room)
 
 @app.on_event("shutdown")
 async def shutdown_event():
@@ -39,6 +60,9 @@ async def shutdown_event():
     logger.info("Shutting down SOMO backend server...")
     if room_manager.cleanup_task:
         room_manager.cleanup_task.cancel()
+    if room_manager.store:
+        await room_manager.store.close()
+    manager.bot_executor.shutdown()
 
 @app.get("/")
 async def root():
@@ -55,7 +79,17 @@ async def health_check():
     return {
         "status": "healthy",
         "rooms_count": len(room_manager.get_all_rooms()),
-        "active_connections": len(manager.active_connections)
+        "active_connections": len(manager.active_connections),
+        "send_queues": manager.send_queue_stats(),
+        "held_seats": manager.sessions.held_count()
+    }
+
+@app.get("/bots/stats")
+async def bot_stats():
+    """Métricas de decisão dos bots por dificuldade e do cache de decisões (para debug/admin)"""
+    return {
+        "strategies": manager.bot_executor.stats(),
+        "decision_cache": manager.bot_manager.decision_cache.stats()
     }
 
 @app.get("/rooms")
@@ -77,45 +111,68 @@ async def list_rooms():
 
 @app.get("/rooms/{room_id}")
 async def get_room_info(room_id: str):
-    """Obtém informações públicas de uma sala específica"""
+    """
+    Obtém o estado público de uma sala específica
+    
+    Serve o mesmo JSON cacheado que vai no evento room_state (sem mãos).
+    """
     room = room_manager.get_room(room_id)
     if not room:
         raise HTTPException(status_code=404, detail="Room not found")
     
-    return {
-        "id": room.id,
-        "players": [
-            {
-                "nickname": player.nickname,
-                "tokens": player.tokens,
-                "is_bot": player.is_bot,
-                "is_eliminated": player.is_eliminated
-            }
-            for player in room.players
-        ],
-        "max_players": room.max_players,
-        "game_started": room.game_started,
-        "current_turn_nickname": next(
-            (p.nickname for p in room.players if p.id == room.current_turn), 
-            None
-        ) if room.current_turn else None,
-        "accumulated_sum": room.accumulated_sum,
-        "round_limit": room.round_limit
-    }
+    return Response(content=manager.public_room_json(room), media_type="application/json")
+
+@app.get("/rooms/{room_id}/replay")
+async def get_room_replay(room_id: str):
+    """
+    Registro da partida (semente + ações) para reprodução offline (debug/admin)
+    
+    Só fica disponível depois do fim do jogo: a semente revela o baralho.
+    """
+    room = room_manager.get_room(room_id)
+    if not room:
+        raise HTTPException(status_code=404, detail="Room not found")
+    
+    if not room.game_started or not GameStateManager.check_game_over(room):
+        raise HTTPException(status_code=409, detail="Game still in progress")
+    
+    try:
+        return export_record(room)
+    except ValueError as e:
+        raise HTTPException(status_code=409, detail=str(e))
 
 @app.websocket("/ws")
 async def websocket_endpoint(websocket: WebSocket):
-    """Endpoint WebSocket principal para comunicação em tempo real"""
-    player_id = str(uuid.uuid4())
+    """
+    Endpoint WebSocket principal para comunicação em tempo real
+    
+    ?resume=<token> retoma a sessão anterior (mesmo player_id e assento) e
+    ?version=N é a última versão da sala que o cliente recebeu.
+    """
+    resumed_id = manager.sessions.resume(websocket.query_params.get("resume"))
+    player_id = resumed_id or str(uuid.uuid4())
+    try:
+        version = int(websocket.query_params["version"])
+    except (KeyError, ValueError):
+        version = None
+    
+    # Codificação pelo subprotocolo (JSON se o cliente não pedir um suportado)
+    subprotocol = negotiate(websocket.scope.get("subprotocols", []))
     
     try:
-        await manager.connect(websocket, player_id)
-        logger.info(f"WebSocket connection established for player {player_id}")
+        await manager.connect(websocket, player_id, subprotocol)
+        logger.info(f"WebSocket connection established for player {player_id} ({subprotocol or 'json'})")
+        manager.start_session(player_id, resumed_id is not None, version)
         
         while True:
             try:
-                # Recebe mensagem do cliente
-                data = await websocket.receive_text()
+                # Recebe mensagem do cliente (frame de texto ou binário)
+                message = await websocket.receive()
+                if message["type"] == "websocket.disconnect":
+                    raise WebSocketDisconnect(message.get("code", 1000))
+                data = message.get("text")
+                if data is None:
+                    data = message.get("bytes")
                 logger.debug(f"Received message from {player_id}: {data}")
                 
                 # Processa a mensagem
@@ -126,7 +183,11 @@ async def websocket_endpoint(websocket: WebSocket):
                 break
             except Exception as e:
                 logger.error(f"Error processing message from {player_id}: {e}")
-                await websocket.send_text(f'{{"event": "error", "code": "PROCESSING_ERROR", "message": "Error processing message: {str(e)}"}}')
+                await manager.send_to_socket(websocket, {
+                    "event": "error",
+                    "code": "PROCESSING_ERROR",
+                    "message": f"Error processing message: {str(e)}"
+                })
     
     except Exception as e:
         logger.error(f"WebSocket connection error for player {player_id}: {e}")
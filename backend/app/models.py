@@ -1,7 +1,8 @@
-from pydantic import BaseModel, Field
-from typing import List, Optional, Dict, Any, Literal
+from pydantic import BaseModel, ConfigDict, Field, TypeAdapter, field_validator
+from typing import Annotated, List, Optional, Dict, Any, Literal, Union
 from enum import Enum
 import uuid
+from .cards import Deck, Hand, card_to_dict
 
 class CardKind(str, Enum):
     NUMBER = "number"
@@ -16,20 +17,35 @@ class CardComp(BaseModel):
     kind: CardKind
     value: Optional[int] = None  # Para cartas numéricas e joker quando jogado
 
+    @classmethod
+    def from_code(cls, card: int) -> "CardComp":
+        """Converte uma carta codificada da engine (ver cards.py) para o modelo do fio"""
+        return cls(**card_to_dict(card))
+
 class PendingEffect(BaseModel):
     multiplier: Optional[int] = None  # 2 para x2
     add: Optional[int] = None  # 2 para +2
     source_player_id: str
 
 class PlayerState(BaseModel):
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
     id: str
     nickname: str
     tokens: int = 3
-    hand: List[CardComp] = Field(default_factory=list)
+    hand: Hand = Field(default_factory=Hand)  # Cartas codificadas, indexadas por id e face (ver cards.py)
     is_bot: bool = False
     is_eliminated: bool = False
 
+    @field_validator("hand", mode="before")
+    @classmethod
+    def _build_hand(cls, value: Any) -> Hand:
+        # Aceita uma lista de cartas codificadas (ex.: PlayerState(hand=[]))
+        return value if isinstance(value, Hand) else Hand(value)
+
 class RoomState(BaseModel):
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
     id: str
     players: List[PlayerState] = Field(default_factory=list)
     max_players: int = 8
@@ -40,10 +56,35 @@ class RoomState(BaseModel):
     accumulated_sum: int = 0
     round_limit: int = 0
     pending_effect: Optional[PendingEffect] = None
-    deck: List[CardComp] = Field(default_factory=list)
-    discard_pile: List[CardComp] = Field(default_factory=list)
+    deck: Deck = Field(default_factory=Deck)  # Monte de compra + pilha de descarte
     turn_order: List[str] = Field(default_factory=list)
 
+    # Semente da sala: com ela e o action_log a partida é reproduzida exatamente
+    # (ver engine/replay.py)
+    seed: Optional[int] = None
+    action_log: List[Dict[str, Any]] = Field(default_factory=list, exclude=True, repr=False)
+    # Ações anteriores ao action_log (sala restaurada de um snapshot, ver services/room_store.py)
+    action_base: int = Field(default=0, exclude=True)
+    # Jogadores no início da partida, na ordem de room.players (quem sai no
+    # meio continua no registro; a saída vai para o log como ação "leave")
+    roster: List[Dict[str, Any]] = Field(default_factory=list, exclude=True, repr=False)
+
+    # Gerador da sala para baralho, ordem dos turnos e D20, criado a partir da
+    # semente (ver GameStateManager.rng)
+    rng: Any = Field(default=None, exclude=True, repr=False)
+
+    # Índice de jogadores (id -> jogador, contagem de ativos, anel de turnos),
+    # criado e mantido pela engine (ver engine/state.py: PlayerRegistry).
+    # Campo comum (e não PrivateAttr) para leitura direta no caminho quente.
+    registry: Any = Field(default=None, exclude=True, repr=False)
+
+    # Versão do estado público: incrementada a cada room_state transmitido.
+    # public_json guarda (versão, JSON do PublicRoomState, dict) para que o
+    # estado seja montado e serializado uma vez por versão e o patch da
+    # versão seguinte saia da comparação com ele (ver ws.py)
+    version: int = Field(default=0, exclude=True)
+    public_json: Any = Field(default=None, exclude=True, repr=False)
+
 # Ações do cliente para o servidor
 class CreateRoomAction(BaseModel):
     action: Literal["create_room"] = "create_room"
@@ -83,7 +124,30 @@ class ChatAction(BaseModel):
 class AddBotAction(BaseModel):
     action: Literal["add_bot"] = "add_bot"
     room_id: str
-    difficulty: Literal["LOW", "MID", "HIGH"] = "LOW"
+    difficulty: Literal["LOW", "MID", "HIGH", "EXPERT", "MASTER"] = "LOW"
+
+class ResyncAction(BaseModel):
+    action: Literal["resync"] = "resync"
+    room_id: str
+
+# Qualquer ação do cliente, escolhida pelo campo "action" (união discriminada).
+# O validador é compilado uma vez: client_action_adapter.validate_json faz
+# parse e validação numa passada só (ver ConnectionManager.handle_message)
+ClientAction = Annotated[
+    Union[
+        CreateRoomAction,
+        JoinRoomAction,
+        StartGameAction,
+        PlayCardAction,
+        PlaySpecialAction,
+        PassTurnAction,
+        ChatAction,
+        AddBotAction,
+        ResyncAction
+    ],
+    Field(discriminator="action")
+]
+client_action_adapter = TypeAdapter(ClientAction)
 
 class Event(BaseModel):
     room: RoomState
@@ -92,10 +156,20 @@ class Event(BaseModel):
 # Eventos do servidor para o cliente
 class RoomStateEvent(BaseModel):
     event: Literal["room_state"] = "room_state"
+    version: int = 0
     room: RoomState
     self_hand: Optional[List[CardComp]] = None  # Apenas a mão do próprio jogador
     self_id: Optional[str] = None 
 
+class RoomPatchEvent(BaseModel):
+    event: Literal["room_patch"] = "room_patch"
+    room_id: str
+    base: int  # Versão a que o patch se aplica
+    version: int
+    set: Dict[str, Any] = Field(default_factory=dict)  # Campos da sala que mudaram
+    players: Dict[str, Dict[str, Any]] = Field(default_factory=dict)  # player_id -> campos que mudaram
+    self_hand: Optional[List[CardComp]] = None  # Só se a mão do próprio jogador mudou
+
 class RoundStartedEvent(BaseModel):
     event: Literal["round_started"] = "round_started"
     limit: int
@@ -0,0 +1,192 @@
+import asyncio
+import logging
+import multiprocessing
+import time
+from collections import deque
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Deque, Dict, Optional, Sequence
+
+from ..models import RoomState, PlayerState
+from ..engine.bots import BotManager, SearchDecision
+
+logger = logging.getLogger(__name__)
+
+# Prazo máximo para uma decisão fora do loop (segundos); depois dele joga o fallback
+DECISION_DEADLINE = 2.0
+
+# Dificuldade cuja escolha é usada como fallback quando o prazo estoura (Greedy)
+FALLBACK_DIFFICULTY = "MID"
+
+# Latências guardadas por estratégia para os percentis
+LATENCY_WINDOW = 1000
+
+# Início dos processos do pool: o servidor já tem threads (gravação das salas,
+# pool de threads dos bots), e um fork herdaria locks presos por elas (ex.:
+# o do logging), travando o filho. forkserver onde existe, senão spawn
+PROCESS_START_METHOD = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+
+def percentile(values: Sequence[float], p: float) -> Optional[float]:
+    """Percentil `p` (0 a 1) de valores já ordenados (None se não há valores)"""
+    if not values:
+        return None
+    return values[min(int(p * len(values)), len(values) - 1)]
+
+def latency_ms(latencies: Sequence[float], p: float, digits: int = 3) -> Optional[float]:
+    """Percentil de latências ordenadas (segundos), em milissegundos"""
+    value = percentile(latencies, p)
+    return round(value * 1000, digits) if value is not None else None
+
+class StrategyStats:
+    """Métricas de decisão de uma estratégia"""
+
+    __slots__ = (
+        "decisions", "cache_hits", "timeouts", "errors", "queue_depth", "max_queue_depth", "latencies",
+        "searches", "search_iterations", "nodes_per_sec"
+    )
+
+    def __init__(self):
+        self.decisions = 0
+        self.cache_hits = 0
+        self.timeouts = 0
+        self.errors = 0
+        self.queue_depth = 0  # Decisões enviadas ao pool e ainda sem resposta
+        self.max_queue_depth = 0
+        self.latencies: Deque[float] = deque(maxlen=LATENCY_WINDOW)
+        # Métricas das buscas (SearchDecision), na mesma janela das latências
+        self.searches = 0
+        self.search_iterations: Deque[int] = deque(maxlen=LATENCY_WINDOW)
+        self.nodes_per_sec: Deque[float] = deque(maxlen=LATENCY_WINDOW)
+
+    def record_search(self, stats: Dict[str, float]):
+        self.searches += 1
+        self.search_iterations.append(stats["iterations"])
+        self.nodes_per_sec.append(stats["nodes_per_sec"])
+
+    def snapshot(self) -> Dict[str, Any]:
+        latencies = sorted(self.latencies)
+        return {
+            "decisions": self.decisions,
+            "cache_hits": self.cache_hits,
+            "timeouts": self.timeouts,
+            "errors": self.errors,
+            "queue_depth": self.queue_depth,
+            "max_queue_depth": self.max_queue_depth,
+            "latency_ms": {p: latency_ms(latencies, q) for p, q in (("p50", 0.5), ("p95", 0.95), ("p99", 0.99))},
+            "search": {
+                "searches": self.searches,
+                "avg_iterations": round(sum(self.search_iterations) / len(self.search_iterations), 1),
+                "avg_nodes_per_sec": round(sum(self.nodes_per_sec) / len(self.nodes_per_sec))
+            } if self.searches else None
+        }
+
+class BotExecutor:
+    """
+    Camada entre o websocket e o BotManager que decide onde cada bot pensa.
+
+    - Estratégias baratas (execution = "inline") decidem no event loop
+    - Estratégias caras vão para um pool de threads ou de processos, com
+      prazo rígido: se a decisão não volta a tempo, o bot joga a escolha do
+      Greedy e a decisão atrasada é descartada. O servidor cria o pool de
+      processos na inicialização (start); sem isso, os pools nascem sob demanda
+    - Profundidade da fila, latência de decisão e, para estratégias de
+      busca, iterações e nós/s ficam registradas por dificuldade (ver stats)
+    - Estratégias com decision_key consultam antes o cache de decisões do
+      processo (engine/decision_cache.py); só decisões da própria estratégia
+      entram no cache, nunca o fallback
+    """
+
+    def __init__(self, bot_manager: BotManager, deadline: float = DECISION_DEADLINE,
+                 thread_workers: int = 4, process_workers: Optional[int] = None):
+        self.bot_manager = bot_manager
+        self.deadline = deadline
+        self.thread_workers = thread_workers
+        self.process_workers = process_workers
+        self.pools: Dict[str, Executor] = {}
+        self.strategy_stats: Dict[str, StrategyStats] = {}
+
+    def start(self):
+        """Cria o pool de processos já na inicialização, antes das primeiras decisões"""
+        pool = self._pool("process")
+        pool.submit(int)  # Sobe um processo agora, e não na primeira jogada do EXPERT
+
+    def _pool(self, execution: str) -> Executor:
+        pool = self.pools.get(execution)
+        if pool is None:
+            if execution == "process":
+                pool = ProcessPoolExecutor(
+                    max_workers=self.process_workers,
+                    mp_context=multiprocessing.get_context(PROCESS_START_METHOD)
+                )
+            else:
+                pool = ThreadPoolExecutor(max_workers=self.thread_workers, thread_name_prefix="bot")
+            self.pools[execution] = pool
+        return pool
+
+    async def decide(self, room: RoomState, bot_player: PlayerState) -> Optional[Dict[str, Any]]:
+        """
+        Obtém a ação do bot da vez, sem bloquear o event loop com estratégias caras
+
+        A sala pode mudar enquanto a decisão está no pool: quem chama deve
+        revalidar o turno antes de aplicar a ação.
+        """
+        difficulty = self.bot_manager.get_difficulty(bot_player)
+        strategy = self.bot_manager.strategies[difficulty]
+        stats = self.strategy_stats.setdefault(difficulty, StrategyStats())
+        engine = self.bot_manager.game_engine
+        cache = self.bot_manager.decision_cache
+        start = time.perf_counter()
+
+        key = strategy.decision_key(room, bot_player)
+        action = cache.lookup(difficulty, key, bot_player, engine) if key is not None else None
+        if action is not None:
+            stats.cache_hits += 1
+        elif strategy.execution == "inline":
+            action = self._unpack(strategy.plan_action(room, bot_player, engine)(), stats)
+            if key is not None:
+                cache.store(difficulty, key, bot_player, action, engine)
+        else:
+            decide = strategy.plan_action(room, bot_player, engine)
+            stats.queue_depth += 1
+            stats.max_queue_depth = max(stats.max_queue_depth, stats.queue_depth)
+            try:
+                future = asyncio.get_running_loop().run_in_executor(self._pool(strategy.execution), decide)
+                action = self._unpack(await asyncio.wait_for(future, timeout=self.deadline), stats)
+                if key is not None:
+                    cache.store(difficulty, key, bot_player, action, engine)
+            except asyncio.TimeoutError:
+                stats.timeouts += 1
+                logger.warning(f"Bot {bot_player.id} ({difficulty}) missed the {self.deadline}s deadline; playing fallback")
+                action = self._fallback(room, bot_player)
+            except Exception as e:
+                stats.errors += 1
+                logger.error(f"Bot {bot_player.id} ({difficulty}) decision failed: {e}")
+                action = self._fallback(room, bot_player)
+            finally:
+                stats.queue_depth -= 1
+
+        stats.decisions += 1
+        stats.latencies.append(time.perf_counter() - start)
+        return action
+
+    @staticmethod
+    def _unpack(result: Any, stats: StrategyStats) -> Optional[Dict[str, Any]]:
+        """Ação de uma decisão; as métricas de um SearchDecision vão para as stats"""
+        if isinstance(result, SearchDecision):
+            stats.record_search(result.stats)
+            return result.action
+        return result
+
+    def _fallback(self, room: RoomState, bot_player: PlayerState) -> Optional[Dict[str, Any]]:
+        """Escolha do Greedy sobre o estado atual da sala (barata, no loop)"""
+        strategy = self.bot_manager.strategies[FALLBACK_DIFFICULTY]
+        return strategy.choose_action(room, bot_player, self.bot_manager.game_engine)
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Métricas por dificuldade (para debug/monitoramento)"""
+        return {difficulty: stats.snapshot() for difficulty, stats in self.strategy_stats.items()}
+
+    def shutdown(self):
+        """Encerra os pools (decisões em andamento são descartadas)"""
+        for pool in self.pools.values():
+            pool.shutdown(wait=False, cancel_futures=True)
+        self.pools.clear()
@@ -0,0 +1,104 @@
+import asyncio
+import logging
+from typing import Awaitable, Callable, Dict, Set
+
+logger = logging.getLogger(__name__)
+
+class BotTurnScheduler:
+    """
+    Agenda o tempo de "pensamento" dos bots como wakeups no event loop.
+
+    Cada sala tem no máximo um wakeup pendente. Enquanto um bot "pensa",
+    o loop continua livre para atender todas as outras salas e sockets.
+
+    Cada sala também tem no máximo um driver de turnos: uma task que é dona
+    da sala e avança os turnos de bot um após o outro, em loop (sem recursão).
+    """
+
+    def __init__(self):
+        self.wakeups: Dict[str, asyncio.TimerHandle] = {}  # room_id -> timer
+        self.waiters: Dict[str, Set[asyncio.Future]] = {}  # room_id -> futures aguardando
+        self.drivers: Dict[str, asyncio.Task] = {}  # room_id -> task do driver de turnos
+
+    def ensure_driver(self, room_id: str, step: Callable[[], Awaitable[bool]]):
+        """
+        Garante que a sala tem um driver de turnos rodando
+
+        Args:
+            room_id: ID da sala
+            step: Corrotina que processa um turno de bot e retorna True
+                  enquanto houver outro turno de bot a processar
+        """
+        task = self.drivers.get(room_id)
+        if task and not task.done():
+            return
+        self.drivers[room_id] = asyncio.create_task(self._drive(room_id, step))
+
+    async def _drive(self, room_id: str, step: Callable[[], Awaitable[bool]]):
+        """Loop do driver: avança turnos de bot até a vez voltar a um humano"""
+        try:
+            while await step():
+                pass
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Turn driver for room {room_id} failed: {e}")
+        finally:
+            if self.drivers.get(room_id) is asyncio.current_task():
+                del self.drivers[room_id]
+
+    async def wait(self, room_id: str, delay: float) -> bool:
+        """
+        Aguarda `delay` segundos sem bloquear o event loop
+
+        Returns:
+            True se o wakeup ocorreu, False se foi cancelado (ex.: sala removida)
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+
+        # Um novo agendamento substitui (e libera) o anterior da mesma sala
+        self.cancel(room_id)
+        self.wakeups[room_id] = loop.call_later(delay, self._wake, room_id, future)
+        self.waiters.setdefault(room_id, set()).add(future)
+
+        try:
+            return await future
+        finally:
+            waiters = self.waiters.get(room_id)
+            if waiters is not None:
+                waiters.discard(future)
+                if not waiters:
+                    del self.waiters[room_id]
+
+    def _wake(self, room_id: str, future: asyncio.Future):
+        """Callback do timer: acorda quem está aguardando"""
+        self.wakeups.pop(room_id, None)
+        if not future.done():
+            future.set_result(True)
+
+    def _cancel_timer(self, room_id: str):
+        handle = self.wakeups.pop(room_id, None)
+        if handle:
+            handle.cancel()
+
+    def cancel(self, room_id: str):
+        """Cancela qualquer wakeup pendente da sala"""
+        self._cancel_timer(room_id)
+        waiters = self.waiters.pop(room_id, set())
+        for future in waiters:
+            if not future.done():
+                future.set_result(False)
+        if waiters:
+            logger.debug(f"Bot wakeups cancelled for room {room_id}")
+
+    def stop(self, room_id: str):
+        """Cancela wakeups e o driver de turnos da sala (ex.: sala removida)"""
+        self.cancel(room_id)
+        task = self.drivers.pop(room_id, None)
+        if task and not task.done() and task is not asyncio.current_task():
+            task.cancel()
+
+    def pending_count(self) -> int:
+        """Número de salas com bots aguardando (para debug/monitoramento)"""
+        return len(self.wakeups)
@@ -0,0 +1,70 @@
+import asyncio
+import logging
+import os
+from typing import Callable, Dict
+
+logger = logging.getLogger(__name__)
+
+# Envios de estado por segundo, no máximo, por sala
+BROADCAST_RATE = float(os.environ.get("SOMO_BROADCAST_RATE", "30"))
+
+class BroadcastTicker:
+    """
+    Agenda os envios de estado das salas em ticks, no máximo `rate` por segundo.
+
+    Mudanças marcam a sala como suja; o flush da sala roda no próximo tick
+    e manda um único estado com tudo o que mudou desde o anterior. Uma sala
+    parada é enviada na hora (o primeiro flush não espera); numa rajada, as
+    mudanças seguintes se juntam até o tick seguinte. Assim o tráfego de
+    saída de cada sala fica limitado, por mais rápido que a engine avance.
+
+    Quem usa guarda os eventos discretos pendentes e os manda junto no
+    flush (ver ConnectionManager._flush_room): nada se perde, só se agrupa.
+    """
+
+    def __init__(self, flush: Callable[[str], None], rate: float = BROADCAST_RATE):
+        self.flush = flush
+        self.interval = 1.0 / rate
+        self.timers: Dict[str, asyncio.TimerHandle] = {}  # room_id -> flush agendado
+        self.last_flush: Dict[str, float] = {}  # room_id -> horário (loop.time) do último flush
+        self.flushes = 0
+
+    def mark_dirty(self, room_id: str):
+        """Agenda o flush da sala para o próximo tick (se ainda não agendado)"""
+        if room_id in self.timers:
+            return
+        loop = asyncio.get_running_loop()
+        delay = max(0.0, self.last_flush.get(room_id, float("-inf")) + self.interval - loop.time())
+        self.timers[room_id] = loop.call_later(delay, self._tick, room_id)
+
+    def _tick(self, room_id: str):
+        self.timers.pop(room_id, None)
+        self.last_flush[room_id] = asyncio.get_running_loop().time()
+        self.flushes += 1
+        try:
+            self.flush(room_id)
+        except Exception as e:
+            logger.error(f"Broadcast flush for room {room_id} failed: {e}")
+
+    def flush_now(self, room_id: str):
+        """Antecipa o flush agendado da sala (ex.: antes de um estado completo, ver ConnectionManager.send_full_state)"""
+        handle = self.timers.get(room_id)
+        if handle:
+            handle.cancel()
+            self._tick(room_id)
+
+    def flush_all(self):
+        """Antecipa todos os flushes agendados (testes e encerramento)"""
+        for room_id in list(self.timers):
+            self.flush_now(room_id)
+
+    def cancel(self, room_id: str):
+        """Descarta o flush pendente da sala (ex.: sala removida)"""
+        handle = self.timers.pop(room_id, None)
+        if handle:
+            handle.cancel()
+        self.last_flush.pop(room_id, None)
+
+    def pending_count(self) -> int:
+        """Número de salas com envio agendado (para debug/monitoramento)"""
+        return len(self.timers)
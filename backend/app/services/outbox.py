@@ -0,0 +1,170 @@
+import asyncio
+import logging
+from collections import deque
+from typing import Any, Deque, Dict, Optional, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+# Acima desta fila, mensagens descartáveis (chat) deixam de ser enfileiradas
+SEND_QUEUE_SOFT_LIMIT = 64
+
+# Acima desta fila o cliente é considerado travado e é desconectado
+SEND_QUEUE_HARD_LIMIT = 256
+
+# Tempo máximo de um único envio (segundos) antes de desconectar o cliente
+SEND_TIMEOUT = 10.0
+
+# Código de fechamento para clientes lentos demais ("try again later")
+SLOW_CLIENT_CLOSE_CODE = 1013
+
+# Tipo de mensagem -> tipos pendentes que ela torna obsoletos (o estado
+# completo substitui o estado e os patches ainda na fila)
+SUPERSEDES = {"room_state": ("room_state", "room_patch")}
+
+class ConnectionOutbox:
+    """
+    Fila de saída de uma conexão, esvaziada por uma task escritora própria.
+
+    Enviar é só enfileirar (não bloqueia quem chama), então um cliente lento
+    atrasa apenas as próprias mensagens, não a sala inteira nem o handler
+    que gerou o evento. Política quando a fila cresce:
+
+    - Mensagens que tornam outras obsoletas (room_state, ver SUPERSEDES):
+      as pendentes substituídas saem da fila e a nova vai para o fim
+    - Tipos descartáveis (chat): descartados acima do limite "soft"
+    - Acima do limite "hard", ou se um envio demora mais que send_timeout,
+      a conexão é fechada (o cliente reconecta e recebe o estado atual)
+
+    A task escritora é criada no loop de quem envia (e recriada se o loop
+    anterior acabou, ex.: testes com asyncio.run).
+    """
+
+    def __init__(self, websocket: Any, player_id: str,
+                 soft_limit: int = SEND_QUEUE_SOFT_LIMIT, hard_limit: int = SEND_QUEUE_HARD_LIMIT,
+                 send_timeout: float = SEND_TIMEOUT,
+                 supersedes: Optional[Dict[str, Tuple[str, ...]]] = None, drop_kinds: Tuple[str, ...] = ("chat",)):
+        self.websocket = websocket
+        self.player_id = player_id
+        self.soft_limit = soft_limit
+        self.hard_limit = hard_limit
+        self.send_timeout = send_timeout
+        self.supersedes = SUPERSEDES if supersedes is None else supersedes
+        self.drop_kinds = drop_kinds
+
+        self.queue: Deque[Tuple[Optional[str], Union[str, bytes]]] = deque()  # (tipo, mensagem codificada)
+        self.closed = False
+        self.inflight = False  # Mensagem retirada da fila e ainda sendo enviada
+        self.writer: Optional[asyncio.Task] = None
+        self.wakeup: Optional[asyncio.Future] = None
+
+        # Métricas
+        self.sent = 0
+        self.dropped = 0
+        self.coalesced = 0
+        self.max_depth = 0
+
+    def send(self, text: Union[str, bytes], kind: Optional[str] = None) -> bool:
+        """
+        Enfileira uma mensagem já serializada (sem esperar o envio; bytes
+        vão como frame binário)
+
+        Returns:
+            False se a mensagem foi descartada ou a conexão está fechada
+        """
+        if self.closed:
+            return False
+
+        obsolete = self.supersedes.get(kind)
+        if obsolete:
+            kept = deque(item for item in self.queue if item[0] not in obsolete)
+            self.coalesced += len(self.queue) - len(kept)
+            self.queue = kept
+        elif kind in self.drop_kinds and len(self.queue) >= self.soft_limit:
+            self.dropped += 1
+            return False
+
+        if len(self.queue) >= self.hard_limit:
+            logger.warning(f"Send queue of {self.player_id} exceeded {self.hard_limit} messages; disconnecting")
+            self.close()
+            return False
+
+        self.queue.append((kind, text))
+        self.max_depth = max(self.max_depth, len(self.queue))
+        self._ensure_writer()
+        if self.wakeup is not None and not self.wakeup.done():
+            self.wakeup.set_result(None)
+        return True
+
+    def _ensure_writer(self):
+        if self.writer is None or self.writer.done():
+            self.writer = asyncio.get_running_loop().create_task(self._write_loop())
+
+    async def _write_loop(self):
+        """Task escritora: envia a fila em ordem, uma mensagem por vez"""
+        loop = asyncio.get_running_loop()
+        try:
+            while not self.closed:
+                if not self.queue:
+                    self.wakeup = loop.create_future()
+                    await self.wakeup
+                    continue
+                _, text = self.queue.popleft()
+                self.inflight = True
+                send = self.websocket.send_bytes if isinstance(text, bytes) else self.websocket.send_text
+                await asyncio.wait_for(send(text), timeout=self.send_timeout)
+                self.inflight = False
+                self.sent += 1
+        except asyncio.TimeoutError:
+            logger.warning(f"Send to {self.player_id} took longer than {self.send_timeout}s; disconnecting")
+            self.close()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Error sending message to {self.player_id}: {e}")
+            self.close()
+        finally:
+            self.wakeup = None
+            self.inflight = False
+
+    async def drain(self):
+        """Espera a fila esvaziar (para testes e encerramento)"""
+        while (self.queue or self.inflight) and not self.closed:
+            self._ensure_writer()
+            await asyncio.sleep(0)
+
+    def stop(self):
+        """Descarta a fila e encerra a escritora (conexão já fechada pelo cliente)"""
+        self.closed = True
+        self.queue.clear()
+        if self.writer is not None and not self.writer.done() and self.writer is not asyncio.current_task():
+            self.writer.cancel()
+
+    def close(self, code: int = SLOW_CLIENT_CLOSE_CODE):
+        """
+        Fecha a conexão pelo lado do servidor (cliente lento)
+
+        O fechamento do websocket faz o loop de leitura sair, e a limpeza
+        normal (ConnectionManager.disconnect) acontece por lá.
+        """
+        if self.closed:
+            return
+        self.stop()
+        try:
+            asyncio.get_running_loop().create_task(self._close_socket(code))
+        except RuntimeError:
+            pass
+
+    async def _close_socket(self, code: int):
+        try:
+            await self.websocket.close(code=code)
+        except Exception:
+            pass  # Já fechado pelo outro lado
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "depth": len(self.queue),
+            "max_depth": self.max_depth,
+            "sent": self.sent,
+            "dropped": self.dropped,
+            "coalesced": self.coalesced
+        }
@@ -4,8 +4,10 @@ logger = logging.getLogger(__name__)
 
 import asyncio
 import time
-from typing import Dict, Optional, Set
+from typing import Any, Callable, Dict, List, Optional, Set
 from ..models import RoomState, PlayerState
+from ..engine.state import GameStateManager
+from .room_store import RoomStore
 import uuid
 import random
 import string
@@ -16,7 +18,44 @@ class RoomManager:
         self.player_to_room: Dict[str, str] = {}  # player_id -> room_id
         self.room_last_activity: Dict[str, float] = {}
         self.cleanup_task: Optional[asyncio.Task] = None
-        
+        self.store: Optional[RoomStore] = None  # Persistência (desligada até attach_store)
+        self.removal_listeners: List[Callable[[str], None]] = []  # Chamados com o room_id de cada sala removida
+    
+    def add_removal_listener(self, listener: Callable[[str], None]):
+        """Registra quem precisa liberar o que guarda por sala quando ela é removida"""
+        self.removal_listeners.append(listener)
+    
+    def attach_store(self, store: RoomStore, engine: Any) -> List[RoomState]:
+        """
+        Liga a persistência e recupera as salas gravadas
+        
+        Args:
+            store: RoomStore aberto
+            engine: GameEngine usada para reaplicar o log das salas
+            
+        Returns:
+            Salas recuperadas
+        """
+        self.store = store
+        rooms = store.load_rooms(engine)
+        now = time.time()
+        for room in rooms:
+            self.rooms[room.id] = room
+            self.room_last_activity[room.id] = now
+            for player in room.players:
+                self.player_to_room[player.id] = room.id
+        return rooms
+    
+    def persist(self, room: RoomState):
+        """Grava um snapshot da sala (mudanças que não passam pelo log de ações)"""
+        if self.store:
+            self.store.snapshot(room)
+    
+    def record_action(self, room: RoomState, events: List[dict]):
+        """Grava a última ação aplicada na sala e os eventos que ela gerou"""
+        if self.store and room.action_log:
+            self.store.append(room, room.action_log[-1], events)
+    
     def start_cleanup_task(self):
         """Inicia a tarefa de limpeza automática de salas inativas"""
         if self.cleanup_task is None:
@@ -73,10 +112,11 @@ class RoomManager:
         self.rooms[room_id] = room
         self.player_to_room[host_id] = room_id
         self.room_last_activity[room_id] = time.time()
+        self.persist(room)
         
         return room
     
-    def join_room(self, room_id: str, nickname: str) -> Optional[PlayerState]:
+    def join_room(self, room_id: str, nickname: str, player_id: Optional[str] = None) -> Optional[PlayerState]:
         """Adiciona um jogador a uma sala existente"""
         if room_id not in self.rooms:
             return None
@@ -95,7 +135,8 @@ class RoomManager:
         if any(player.nickname == nickname for player in room.players):
             return None
         
-        player_id = str(uuid.uuid4())
+        # Usa o player_id fornecido (conexão WebSocket) ou gera um novo
+        player_id = player_id if player_id else str(uuid.uuid4())
         player = PlayerState(
             id=player_id,
             nickname=nickname,
@@ -104,9 +145,10 @@ class RoomManager:
             is_bot=False
         )
         
-        room.players.append(player)
+        GameStateManager.add_player(room, player)
         self.player_to_room[player_id] = room_id
         self.room_last_activity[room_id] = time.time()
+        self.persist(room)
         
         return player
     
@@ -130,14 +172,12 @@ class RoomManager:
         room = self.rooms[room_id]
         
         # Remove o jogador da sala
-        room.players = [p for p in room.players if p.id != player_id]
+        GameStateManager.remove_player(room, player_id)
         del self.player_to_room[player_id]
         
         # Se a sala ficou vazia, remove ela
         if not room.players:
-            del self.rooms[room_id]
-            if room_id in self.room_last_activity:
-                del self.room_last_activity[room_id]
+            self._discard_room(room_id)
             return None
         
         # Se o host saiu, transfere para outro jogador
@@ -145,6 +185,7 @@ class RoomManager:
             room.host_id = room.players[0].id
         
         self.room_last_activity[room_id] = time.time()
+        self.persist(room)
         return room
     
     async def remove_room(self, room_id: str):
@@ -159,10 +200,17 @@ class RoomManager:
             if player.id in self.player_to_room:
                 del self.player_to_room[player.id]
         
-        # Remove a sala
+        self._discard_room(room_id)
+    
+    def _discard_room(self, room_id: str):
+        """Remove a sala (vazia, inativa ou encerrada) e avisa os listeners"""
         del self.rooms[room_id]
         if room_id in self.room_last_activity:
             del self.room_last_activity[room_id]
+        if self.store:
+            self.store.delete(room_id)
+        for listener in self.removal_listeners:
+            listener(room_id)
     
     def update_activity(self, room_id: str):
         """Atualiza o timestamp de atividade da sala"""
@@ -0,0 +1,258 @@
+import asyncio
+import base64
+import json
+import logging
+import random
+import sqlite3
+import struct
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+
+from ..cards import Deck
+from ..models import RoomState, PlayerState, PendingEffect
+from ..engine.state import GameStateManager
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS snapshots (
+    room_id TEXT PRIMARY KEY,
+    seq INTEGER NOT NULL,
+    data TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS actions (
+    room_id TEXT NOT NULL,
+    seq INTEGER NOT NULL,
+    action TEXT NOT NULL,
+    events TEXT NOT NULL,
+    PRIMARY KEY (room_id, seq)
+);
+CREATE TABLE IF NOT EXISTS sessions (
+    player_id TEXT PRIMARY KEY,
+    token TEXT NOT NULL
+);
+"""
+
+def _pack_rng(rng: Optional[random.Random]) -> Optional[Dict[str, Any]]:
+    """Estado do gerador em forma compacta (625 words do Mersenne Twister em base64)"""
+    if rng is None:
+        return None
+    version, key, gauss_next = rng.getstate()
+    packed = struct.pack(f"<{len(key)}I", *key)
+    return {"version": version, "key": base64.b64encode(packed).decode(), "gauss_next": gauss_next}
+
+def _unpack_rng(data: Optional[Dict[str, Any]]) -> Optional[random.Random]:
+    if data is None:
+        return None
+    packed = base64.b64decode(data["key"])
+    key = struct.unpack(f"<{len(packed) // 4}I", packed)
+    rng = random.Random()
+    rng.setstate((data["version"], key, data["gauss_next"]))
+    return rng
+
+def snapshot_room(room: RoomState) -> Dict[str, Any]:
+    """Snapshot compacto da sala (cartas como ints, gerador empacotado)"""
+    return {
+        "id": room.id,
+        "max_players": room.max_players,
+        "host_id": room.host_id,
+        "game_started": room.game_started,
+        "current_turn": room.current_turn,
+        "direction": room.direction,
+        "accumulated_sum": room.accumulated_sum,
+        "round_limit": room.round_limit,
+        "pending_effect": room.pending_effect.model_dump() if room.pending_effect else None,
+        "turn_order": room.turn_order,
+        "seed": room.seed,
+        "roster": room.roster,
+        "players": [
+            {
+                "id": p.id,
+                "nickname": p.nickname,
+                "tokens": p.tokens,
+                "hand": list(p.hand),  # Ordem de chegada preservada (Hand.first depende dela)
+                "is_bot": p.is_bot,
+                "is_eliminated": p.is_eliminated
+            }
+            for p in room.players
+        ],
+        "deck": list(room.deck),
+        "discard": room.deck.discard_pile,
+        "rng": _pack_rng(room.rng),
+        "seq": GameStateManager.action_count(room)
+    }
+
+def restore_room(data: Dict[str, Any]) -> RoomState:
+    """Reconstrói a sala a partir de um snapshot (o índice de jogadores é recriado sob demanda)"""
+    rng = _unpack_rng(data["rng"])
+    pending = data["pending_effect"]
+    return RoomState(
+        id=data["id"],
+        max_players=data["max_players"],
+        host_id=data["host_id"],
+        game_started=data["game_started"],
+        current_turn=data["current_turn"],
+        direction=data["direction"],
+        accumulated_sum=data["accumulated_sum"],
+        round_limit=data["round_limit"],
+        pending_effect=PendingEffect(**pending) if pending else None,
+        turn_order=data["turn_order"],
+        seed=data["seed"],
+        roster=data.get("roster", []),
+        players=[PlayerState(**player) for player in data["players"]],
+        deck=Deck(data["deck"], data["discard"], shuffle=rng.shuffle if rng else random.shuffle),
+        rng=rng,
+        action_base=data["seq"]
+    )
+
+class RoomStore:
+    """
+    Persistência das salas em SQLite: log de ações por sala + snapshots.
+
+    - Cada ação aplicada (com os eventos resultantes) vira uma linha em `actions`
+    - A cada `snapshot_every` ações, e em mudanças fora do log (entrada/saída
+      de jogadores, início do jogo), o snapshot da sala é regravado e as
+      ações que ele já cobre são apagadas na mesma transação
+    - Os tokens de retomada de sessão (player_id <-> token) também ficam
+      gravados, para que jogadores humanos recuperem o assento após um restart
+    - Na inicialização, cada sala volta do último snapshot + ações posteriores,
+      então o tempo de recuperação depende do número de salas, não do
+      tamanho das partidas
+
+    Group commit: append/snapshot só enfileiram as escritas em memória. Uma
+    task grava o lote acumulado em uma única transação (um fsync) numa
+    thread dedicada, então o caminho do turno nunca espera pelo disco.
+    """
+
+    def __init__(self, path: str, snapshot_every: int = 50, flush_interval: float = 0.05):
+        self.path = path
+        self.snapshot_every = snapshot_every
+        self.flush_interval = flush_interval  # Janela de agrupamento das escritas
+        self.pending: List[Tuple[str, tuple]] = []  # (sql, parâmetros) aguardando gravação
+        self.snapshot_seq: Dict[str, int] = {}  # room_id -> seq do último snapshot
+        self.flush_task: Optional[asyncio.Task] = None
+        self.commits = 0
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="room-store")
+
+        # Usada só pela thread de escrita (e na carga inicial, antes de qualquer escrita)
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=FULL")
+        self.conn.executescript(SCHEMA)
+
+    def append(self, room: RoomState, action: Dict[str, Any], events: List[Dict[str, Any]]):
+        """Enfileira uma ação aplicada (já registrada em room.action_log) e seus eventos"""
+        seq = GameStateManager.action_count(room)
+        self.pending.append((
+            "INSERT OR REPLACE INTO actions (room_id, seq, action, events) VALUES (?, ?, ?, ?)",
+            (room.id, seq, json.dumps(action), json.dumps(events))
+        ))
+        if seq - self.snapshot_seq.get(room.id, 0) >= self.snapshot_every:
+            self.snapshot(room)
+        else:
+            self._schedule_flush()
+
+    def snapshot(self, room: RoomState):
+        """Enfileira um snapshot da sala no estado atual"""
+        data = snapshot_room(room)
+        self.snapshot_seq[room.id] = data["seq"]
+        self.pending.append((
+            "INSERT OR REPLACE INTO snapshots (room_id, seq, data) VALUES (?, ?, ?)",
+            (room.id, data["seq"], json.dumps(data, separators=(",", ":")))
+        ))
+        # Mesmo lote (mesma transação): a recuperação nunca lê ações já no snapshot
+        self.pending.append(("DELETE FROM actions WHERE room_id = ? AND seq <= ?", (room.id, data["seq"])))
+        self._schedule_flush()
+
+    def delete(self, room_id: str):
+        """Enfileira a remoção de todos os dados da sala"""
+        self.snapshot_seq.pop(room_id, None)
+        self.pending.append(("DELETE FROM snapshots WHERE room_id = ?", (room_id,)))
+        self.pending.append(("DELETE FROM actions WHERE room_id = ?", (room_id,)))
+        self._schedule_flush()
+
+    def save_session(self, player_id: str, token: str):
+        """Enfileira o token de retomada de um jogador"""
+        self.pending.append(("INSERT OR REPLACE INTO sessions (player_id, token) VALUES (?, ?)", (player_id, token)))
+        self._schedule_flush()
+
+    def delete_session(self, player_id: str):
+        """Enfileira a remoção do token de um jogador"""
+        self.pending.append(("DELETE FROM sessions WHERE player_id = ?", (player_id,)))
+        self._schedule_flush()
+
+    def load_sessions(self) -> Dict[str, str]:
+        """Tokens gravados (player_id -> token), lidos na carga inicial"""
+        return dict(self.conn.execute("SELECT player_id, token FROM sessions").fetchall())
+
+    def _schedule_flush(self):
+        """Garante uma task de gravação (sem loop rodando, quem chama usa flush_sync)"""
+        if self.flush_task and not self.flush_task.done():
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        self.flush_task = loop.create_task(self._flush_loop())
+
+    async def _flush_loop(self):
+        """Grava lotes enquanto houver escritas pendentes"""
+        while self.pending:
+            await asyncio.sleep(self.flush_interval)
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.error(f"Room store flush failed: {e}")
+
+    async def flush(self):
+        """Grava as escritas pendentes em uma transação, fora do event loop"""
+        batch, self.pending = self.pending, []
+        if batch:
+            await asyncio.get_running_loop().run_in_executor(self.executor, self._write, batch)
+
+    def flush_sync(self):
+        """Grava as escritas pendentes e espera terminar (sem event loop: testes, scripts)"""
+        batch, self.pending = self.pending, []
+        if batch:
+            self.executor.submit(self._write, batch).result()
+
+    def _write(self, batch: List[Tuple[str, tuple]]):
+        with self.conn:
+            for sql, params in batch:
+                self.conn.execute(sql, params)
+        self.commits += 1
+
+    def load_rooms(self, engine: Any) -> List[RoomState]:
+        """
+        Reconstrói as salas persistidas: último snapshot + ações posteriores
+
+        Args:
+            engine: GameEngine usada para reaplicar as ações do log
+        """
+        rooms = []
+        snapshots = self.conn.execute("SELECT room_id, seq, data FROM snapshots").fetchall()
+        for room_id, seq, data in snapshots:
+            room = restore_room(json.loads(data))
+            tail = self.conn.execute(
+                "SELECT seq, action FROM actions WHERE room_id = ? AND seq > ? ORDER BY seq",
+                (room_id, seq)
+            ).fetchall()
+            for action_seq, action_data in tail:
+                action = json.loads(action_data)
+                result = engine.apply_action(room, action["player_id"], action)
+                if not result["success"]:
+                    logger.error(f"Room {room_id}: stored action {action_seq} rejected on recovery ({result['error']})")
+                    break
+            self.snapshot_seq[room_id] = seq
+            rooms.append(room)
+
+        logger.info(f"Recovered {len(rooms)} rooms from {self.path}")
+        return rooms
+
+    async def close(self):
+        """Grava o que falta e fecha o banco"""
+        if self.flush_task and not self.flush_task.done():
+            await self.flush_task
+        await self.flush()
+        self.executor.shutdown(wait=True)
+        self.conn.close()
@@ -0,0 +1,56 @@
+"""
+Patches do estado público da sala entre duas versões.
+
+O servidor manda o room_state completo só quando o cliente ainda não tem a
+versão anterior (entrada na sala, pedido de resync). Nas demais versões vai
+um room_patch com o que mudou:
+
+    {"event": "room_patch", "room_id": ..., "base": N - 1, "version": N,
+     "set": {campo: valor novo, ...},
+     "players": {player_id: {campo: valor novo, ...}, ...},
+     "self_hand": [...]}                  # só se a mão do jogador mudou
+
+Campos compostos (turn_order, pending_effect, discard_top) vão inteiros. Se
+a lista de jogadores mudou (entrada, saída, ordem), "players" vai inteira
+em "set". O cliente que recebe um patch com base diferente da sua versão
+pede {"action": "resync"} e recebe o estado completo.
+"""
+
+from typing import Any, Dict
+
+def diff_public_state(old: Dict[str, Any], new: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Diferença entre dois estados públicos (PublicRoomState em forma de dict)
+
+    Returns:
+        {"set": {...}, "players": {...}} só com as chaves que mudaram
+    """
+    changed: Dict[str, Any] = {}
+    for key, value in new.items():
+        if key != "players" and old.get(key) != value:
+            changed[key] = value
+
+    patch: Dict[str, Any] = {}
+    old_players, new_players = old.get("players", []), new.get("players", [])
+    if [p["id"] for p in old_players] != [p["id"] for p in new_players]:
+        changed["players"] = new_players
+    else:
+        players = {}
+        for before, after in zip(old_players, new_players):
+            fields = {key: value for key, value in after.items() if before.get(key) != value}
+            if fields:
+                players[after["id"]] = fields
+        if players:
+            patch["players"] = players
+
+    if changed:
+        patch["set"] = changed
+    return patch
+
+def apply_patch(state: Dict[str, Any], patch: Dict[str, Any]) -> Dict[str, Any]:
+    """Aplica um patch a um estado público (espelho do que o cliente faz)"""
+    result = {**state, **patch.get("set", {})}
+    players = patch.get("players")
+    if players:
+        result["players"] = [{**p, **players[p["id"]]} if p["id"] in players else p for p in result["players"]]
+    return result
@@ -0,0 +1,155 @@
+"""
+Retomada de sessão após queda da conexão.
+
+- Cada conexão recebe um token de retomada (evento "session"). Ao
+  reconectar com ?resume=<token>, o cliente volta com o mesmo player_id
+- Jogador que cai no meio de uma sala mantém o assento por RESUME_GRACE
+  segundos; se não voltar, sai da sala como antes
+- Com persistência (RoomStore), os tokens sobrevivem a um restart: humanos
+  das salas recuperadas têm a janela de retomada a partir da inicialização
+- Cada sala guarda as últimas versões enviadas (eventos + estado público) num
+  buffer circular. Quem volta informando a última versão que recebeu
+  (?version=N) recebe só os eventos perdidos e um room_patch desde N; se a
+  versão já saiu do buffer, recebe o room_state completo
+"""
+
+import asyncio
+import logging
+import os
+import secrets
+from collections import deque
+from typing import Any, Callable, Deque, Dict, List, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Segundos que o assento de um jogador desconectado fica reservado (0 desliga)
+RESUME_GRACE = float(os.environ.get("SOMO_RESUME_GRACE", "60"))
+
+# Versões recentes guardadas por sala para reenviar a quem reconecta
+REPLAY_BUFFER_SIZE = int(os.environ.get("SOMO_REPLAY_BUFFER", "64"))
+
+class SessionRegistry:
+    """
+    Tokens de retomada e assentos reservados de jogadores desconectados
+
+    `expire` é chamado com o player_id quando a janela de um jogador
+    desconectado acaba sem ele voltar.
+    """
+
+    def __init__(self, expire: Callable[[str], None], grace: float = RESUME_GRACE):
+        self.expire = expire
+        self.grace = grace
+        self.tokens: Dict[str, str] = {}  # token -> player_id
+        self.player_tokens: Dict[str, str] = {}  # player_id -> token
+        self.timers: Dict[str, asyncio.TimerHandle] = {}  # player_id -> fim da janela
+        self.store: Optional[Any] = None  # RoomStore (tokens gravados), se houver
+
+    def attach_store(self, store: Any, seated: Set[str]):
+        """
+        Liga a persistência dos tokens e recarrega os gravados
+
+        Args:
+            store: RoomStore aberto
+            seated: Jogadores humanos com assento nas salas recuperadas; os
+                    tokens dos demais não servem mais e são apagados
+        """
+        self.store = store
+        for player_id, token in store.load_sessions().items():
+            if player_id in seated:
+                self.tokens[token] = player_id
+                self.player_tokens[player_id] = token
+            else:
+                store.delete_session(player_id)
+
+    def issue(self, player_id: str) -> str:
+        """Token de retomada do jogador (o mesmo enquanto a sessão existir)"""
+        token = self.player_tokens.get(player_id)
+        if token is None:
+            token = secrets.token_urlsafe(24)
+            self.tokens[token] = player_id
+            self.player_tokens[player_id] = token
+            if self.store:
+                self.store.save_session(player_id, token)
+        return token
+
+    def resume(self, token: Optional[str]) -> Optional[str]:
+        """
+        Retoma a sessão de um token
+
+        Returns:
+            player_id da sessão, ou None se o token não existe (ou expirou)
+        """
+        player_id = self.tokens.get(token) if token else None
+        if player_id is not None:
+            handle = self.timers.pop(player_id, None)
+            if handle:
+                handle.cancel()
+        return player_id
+
+    def hold(self, player_id: str) -> bool:
+        """
+        Reserva o assento de um jogador que caiu pela janela de retomada
+
+        Returns:
+            False se a retomada está desligada (grace <= 0) ou o jogador não tem sessão
+        """
+        if self.grace <= 0 or player_id not in self.player_tokens:
+            return False
+        if player_id not in self.timers:
+            self.timers[player_id] = asyncio.get_running_loop().call_later(self.grace, self._expire, player_id)
+        return True
+
+    def _expire(self, player_id: str):
+        self.timers.pop(player_id, None)
+        self.drop(player_id)
+        try:
+            self.expire(player_id)
+        except Exception as e:
+            logger.error(f"Expiring session of {player_id} failed: {e}")
+
+    def drop(self, player_id: str):
+        """Encerra a sessão (o token deixa de valer)"""
+        handle = self.timers.pop(player_id, None)
+        if handle:
+            handle.cancel()
+        token = self.player_tokens.pop(player_id, None)
+        self.tokens.pop(token, None)
+        if token is not None and self.store:
+            self.store.delete_session(player_id)
+
+    def held_count(self) -> int:
+        """Número de assentos reservados (para debug/monitoramento)"""
+        return len(self.timers)
+
+class ReplayBuffer:
+    """Últimas versões de cada sala: (versão, eventos enviados com ela, estado público)"""
+
+    def __init__(self, size: int = REPLAY_BUFFER_SIZE):
+        self.size = size
+        self.rooms: Dict[str, Deque[Tuple[int, List[dict], Dict[str, Any]]]] = {}
+
+    def record(self, room_id: str, version: int, events: List[dict], public: Dict[str, Any]):
+        entries = self.rooms.get(room_id)
+        if entries is None:
+            entries = self.rooms[room_id] = deque(maxlen=self.size)
+        elif entries and entries[-1][0] != version - 1:
+            entries.clear()  # Buraco nas versões (ex.: sala recuperada do disco)
+        entries.append((version, events, public))
+
+    def since(self, room_id: str, version: int, current: int) -> Optional[Tuple[List[dict], Dict[str, Any], Dict[str, Any]]]:
+        """
+        O que um cliente na versão `version` perdeu até a versão `current`
+
+        Returns:
+            (eventos perdidos em ordem, estado público em `version`, estado
+            público em `current`), ou None se o buffer não cobre o intervalo
+        """
+        entries = self.rooms.get(room_id)
+        if not entries or entries[-1][0] != current or not entries[0][0] <= version <= current:
+            return None
+        start = version - entries[0][0]
+        events = [event for _, batch, _ in list(entries)[start + 1:] for event in batch]
+        return events, entries[start][2], entries[-1][2]
+
+    def discard(self, room_id: str):
+        self.rooms.pop(room_id, None)
@@ -0,0 +1,205 @@
+"""
+Codificações das mensagens do websocket, negociadas pelo subprotocolo.
+
+- "somo.json" (padrão, também quando o cliente não pede subprotocolo): JSON
+  com os nomes de sempre, como o frontend atual espera
+- "somo.msgpack.v1" (requer msgpack) e "somo.cbor.v1" (requer cbor2):
+  binário, com nomes de campos e de eventos/ações trocados por códigos
+  inteiros (FIELDS e NAMES: o índice é o código). As codificações binárias
+  só são oferecidas se a biblioteca estiver instalada (ambas estão em
+  requirements.txt).
+
+As tabelas fazem parte do protocolo: nomes novos vão sempre no fim, e
+mudar a ordem exige um novo subprotocolo (".v2"). Chaves e valores fora das
+tabelas (ex.: ids de jogadores como chaves de um patch) passam como texto.
+
+Além de encode/decode, cada codec junta mapas e listas de valores já
+codificados (join_map/join_array): a parte comum de uma mensagem é
+codificada uma vez e reaproveitada para cada destinatário (ver ws.py).
+"""
+
+import json
+import struct
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+
+try:
+    import msgpack
+except ImportError:  # Dependência opcional
+    msgpack = None
+
+try:
+    import cbor2
+except ImportError:  # Dependência opcional
+    cbor2 = None
+
+Payload = Union[str, bytes]
+
+# Nomes de campos (índice = código no fio binário; só acrescentar no fim)
+FIELDS = (
+    # Envelope e estado da sala
+    "event", "action", "version", "base", "room_id", "room", "self_hand", "self_id",
+    "set", "players", "events",
+    "id", "nickname", "tokens", "hand_count", "is_bot", "is_eliminated",
+    "max_players", "host_id", "game_started", "current_turn", "direction",
+    "accumulated_sum", "round_limit", "pending_effect", "deck_count", "discard_top", "turn_order",
+    "multiplier", "add", "source_player_id",
+    # Cartas e eventos
+    "kind", "value", "player_id", "card", "sum", "type", "by_player_id", "clockwise",
+    "tokens_left", "amount", "reason", "limit", "winner_id", "code", "message",
+    # Ações do cliente
+    "card_id", "as_value", "difficulty",
+    # Retomada de sessão
+    "resume_token", "resumed"
+)
+
+# Nomes de eventos e ações, valores de "event" e "action" (índice = código)
+NAMES = (
+    "room_state", "room_patch", "batch", "round_started", "card_played", "effect_set",
+    "sum_reset", "direction_changed", "penalty", "draw_cards", "round_reset",
+    "turn_changed", "game_over", "error", "chat",
+    "create_room", "join_room", "start_game", "play_card", "play_special",
+    "pass_turn", "add_bot", "resync", "session"
+)
+
+FIELD_CODES = {name: code for code, name in enumerate(FIELDS)}
+NAME_CODES = {name: code for code, name in enumerate(NAMES)}
+NAMED_FIELDS = ("event", "action")
+
+def compact(obj: Any) -> Any:
+    """Troca nomes de campos (e de eventos/ações) pelos códigos, recursivamente"""
+    if isinstance(obj, dict):
+        result = {}
+        for key, value in obj.items():
+            if key in NAMED_FIELDS and value in NAME_CODES:
+                value = NAME_CODES[value]
+            else:
+                value = compact(value)
+            result[FIELD_CODES.get(key, key)] = value
+        return result
+    if isinstance(obj, list):
+        return [compact(item) for item in obj]
+    return obj
+
+def expand(obj: Any) -> Any:
+    """Inverso de compact"""
+    if isinstance(obj, dict):
+        result = {}
+        for key, value in obj.items():
+            if isinstance(key, int) and 0 <= key < len(FIELDS):
+                key = FIELDS[key]
+            if key in NAMED_FIELDS and isinstance(value, int) and 0 <= value < len(NAMES):
+                value = NAMES[value]
+            else:
+                value = expand(value)
+            result[key] = value
+        return result
+    if isinstance(obj, list):
+        return [expand(item) for item in obj]
+    return obj
+
+class JsonCodec:
+    """JSON com nomes por extenso (frames de texto)"""
+
+    name = "somo.json"
+    binary = False
+
+    def encode(self, obj: Any) -> str:
+        return json.dumps(obj, separators=(",", ":"))
+
+    def decode(self, payload: Payload) -> Any:
+        return json.loads(payload)
+
+    def name_value(self, name: str) -> str:
+        """Valor já codificado para "event"/"action" """
+        return json.dumps(name)
+
+    def join_map(self, items: Sequence[Tuple[str, str]]) -> str:
+        return "{" + ",".join(f'"{key}":{value}' for key, value in items) + "}"
+
+    def join_array(self, items: Sequence[str]) -> str:
+        return "[" + ",".join(items) + "]"
+
+class BinaryCodec:
+    """
+    Codificação binária com códigos inteiros (frames binários)
+
+    Args:
+        pack/unpack: Serialização da biblioteca (msgpack, cbor2)
+        map_header/array_header: Cabeçalho de um mapa/lista com n itens, para
+                                 juntar itens já codificados
+    """
+
+    binary = True
+
+    def __init__(self, name: str, pack, unpack, map_header, array_header):
+        self.name = name
+        self.pack = pack
+        self.unpack = unpack
+        self.map_header = map_header
+        self.array_header = array_header
+        self.field_keys = {field: pack(code) for field, code in FIELD_CODES.items()}
+
+    def encode(self, obj: Any) -> bytes:
+        return self.pack(compact(obj))
+
+    def decode(self, payload: Payload) -> Any:
+        if isinstance(payload, str):
+            raise ValueError(f"{self.name} expects binary frames")
+        try:
+            return expand(self.unpack(payload))
+        except Exception as e:
+            raise ValueError(f"Invalid {self.name} message: {e}")
+
+    def name_value(self, name: str) -> bytes:
+        return self.pack(NAME_CODES[name])
+
+    def join_map(self, items: Sequence[Tuple[str, bytes]]) -> bytes:
+        return self.map_header(len(items)) + b"".join(self.field_keys[key] + value for key, value in items)
+
+    def join_array(self, items: Sequence[bytes]) -> bytes:
+        return self.array_header(len(items)) + b"".join(items)
+
+def _msgpack_header(small: int, large: int):
+    """Cabeçalho msgpack: fixmap/fixarray até 15 itens, map16/array16 acima"""
+    def header(n: int) -> bytes:
+        return bytes((small | n,)) if n < 16 else bytes((large,)) + struct.pack(">H", n)
+    return header
+
+def _cbor_header(major: int):
+    """Cabeçalho CBOR: tamanho no byte inicial até 23, depois uint8/uint16"""
+    def header(n: int) -> bytes:
+        if n < 24:
+            return bytes((major | n,))
+        if n < 256:
+            return bytes((major | 24, n))
+        return bytes((major | 25,)) + struct.pack(">H", n)
+    return header
+
+JSON_CODEC = JsonCodec()
+
+CODECS: Dict[str, Any] = {JSON_CODEC.name: JSON_CODEC}
+if msgpack is not None:
+    CODECS["somo.msgpack.v1"] = BinaryCodec(
+        "somo.msgpack.v1",
+        lambda obj: msgpack.packb(obj, use_bin_type=True),
+        lambda data: msgpack.unpackb(data, raw=False, strict_map_key=False),
+        _msgpack_header(0x80, 0xde),
+        _msgpack_header(0x90, 0xdc)
+    )
+if cbor2 is not None:
+    CODECS["somo.cbor.v1"] = BinaryCodec(
+        "somo.cbor.v1", cbor2.dumps, cbor2.loads, _cbor_header(0xa0), _cbor_header(0x80)
+    )
+
+def negotiate(requested: List[str]) -> Optional[str]:
+    """
+    Escolhe o subprotocolo: o primeiro pedido pelo cliente que o servidor suporta
+
+    Returns:
+        Nome do subprotocolo, ou None (JSON sem subprotocolo)
+    """
+    return next((name for name in requested if name in CODECS), None)
+
+def get_codec(subprotocol: Optional[str]):
+    """Codec de um subprotocolo negociado (JSON se nenhum)"""
+    return CODECS.get(subprotocol, JSON_CODEC) if subprotocol else JSON_CODEC
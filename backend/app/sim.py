@@ -0,0 +1,218 @@
+"""
+Simulador headless de partidas entre bots (sem servidor WebSocket).
+
+Roda partidas completas com GameEngine e as estratégias de bot, espalhadas
+por um ProcessPoolExecutor, e serve tanto como benchmark de throughput da
+engine quanto para checar o equilíbrio dos bots antes do deploy.
+
+Uso (a partir de backend/):
+    python -m app.sim --games 10000 --players LOW,MID,HIGH --workers 4 --seed 1
+
+Com --vectorized, as partidas rodam na engine em lote (engine/batch.py,
+requer numpy), ordens de grandeza mais rápida para milhões de partidas.
+"""
+
+import argparse
+import json
+import os
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional, Sequence
+
+from .models import RoomState, PlayerState
+from .engine.bots import BotManager, BotStrategy
+from .engine.rules import GameEngine
+from .engine.state import GameStateManager
+
+DEFAULT_MAX_TURNS = 5000
+DEFAULT_PLAYERS = ("LOW", "MID", "HIGH")
+
+# Uma instância por processo (cada worker importa o módulo)
+_engine = GameEngine()
+_strategies = BotManager().strategies
+
+def default_strategies() -> Dict[str, BotStrategy]:
+    """Estratégias de cada dificuldade no simulador (as do BotManager, com SOMO_BOT_PARAMS aplicado)"""
+    return dict(_strategies)
+
+def create_sim_room(difficulties: Sequence[str], room_id: str = "sim") -> RoomState:
+    """Cria uma sala só com bots, um por dificuldade (na ordem dada)"""
+    room = RoomState(id=room_id, max_players=max(len(difficulties), 2))
+    for index, difficulty in enumerate(difficulties):
+        GameStateManager.add_player(room, PlayerState(
+            id=f"p{index}",
+            nickname=f"Bot {difficulty} {index + 1}",
+            is_bot=True
+        ))
+    return room
+
+def play_game(seed: int, difficulties: Sequence[str], max_turns: int = DEFAULT_MAX_TURNS,
+              strategies: Optional[Dict[str, BotStrategy]] = None) -> Dict[str, Any]:
+    """
+    Joga uma partida completa entre bots
+
+    Args:
+        strategies: Estratégia de cada dificuldade (padrão: as do BotManager)
+
+    Returns:
+        {"seed", "winner" (índice do assento ou None), "turns", "penalties" (por assento)}
+    """
+    room = create_sim_room(difficulties, f"sim-{seed}")
+    seat_of = {player.id: index for index, player in enumerate(room.players)}
+    _engine.start_game(room, seed)
+
+    penalties = [0] * len(difficulties)
+    turns = 0
+    winner = None
+
+    while turns < max_turns:
+        winner = GameStateManager.check_game_over(room)
+        if winner:
+            break
+
+        player = GameStateManager.get_player_by_id(room, room.current_turn)
+        strategy = (strategies or _strategies)[difficulties[seat_of[player.id]]]
+        action = strategy.choose_action(room, player, _engine) or {"type": "pass_turn"}
+
+        result = _engine.apply_action(room, player.id, action)
+        if not result["success"]:
+            raise RuntimeError(f"Seed {seed}: bot action rejected ({result['error']}): {action}")
+
+        for event in result["events"]:
+            if event["event"] == "penalty":
+                penalties[seat_of[event["player_id"]]] += 1
+        turns += 1
+
+    return {
+        "seed": seed,
+        "winner": seat_of[winner] if winner else None,
+        "turns": turns,
+        "penalties": penalties
+    }
+
+def _play_batch(seeds: List[int], difficulties: Sequence[str], max_turns: int) -> List[Dict[str, Any]]:
+    """Worker do pool: joga um lote de partidas"""
+    return [play_game(seed, difficulties, max_turns) for seed in seeds]
+
+def summarize(results: List[Dict[str, Any]], difficulties: Sequence[str], elapsed: float) -> Dict[str, Any]:
+    """Agrega os resultados das partidas em um relatório"""
+    games = len(results)
+    seats_per_difficulty = Counter(difficulties)
+    wins = Counter()
+    seat_penalties = Counter()
+    penalties_per_game = Counter()
+
+    for result in results:
+        if result["winner"] is not None:
+            wins[difficulties[result["winner"]]] += 1
+        for seat, count in enumerate(result["penalties"]):
+            seat_penalties[difficulties[seat]] += count
+        penalties_per_game[sum(result["penalties"])] += 1
+
+    return {
+        "games": games,
+        "unfinished": sum(1 for r in results if r["winner"] is None),
+        "players": list(difficulties),
+        "elapsed_sec": round(elapsed, 3),
+        "games_per_sec": round(games / elapsed, 1) if elapsed > 0 else None,
+        "avg_turns": round(sum(r["turns"] for r in results) / games, 2) if games else 0,
+        # Taxa de vitória por assento (uma dificuldade pode ocupar vários assentos)
+        "win_rate": {
+            difficulty: round(wins[difficulty] / (games * seats), 4) if games else 0
+            for difficulty, seats in seats_per_difficulty.items()
+        },
+        "penalties": {
+            "avg_per_game": round(sum(k * v for k, v in penalties_per_game.items()) / games, 2) if games else 0,
+            "avg_per_seat": {
+                difficulty: round(seat_penalties[difficulty] / (games * seats), 2) if games else 0
+                for difficulty, seats in seats_per_difficulty.items()
+            },
+            "histogram": dict(sorted(penalties_per_game.items()))
+        }
+    }
+
+def run_simulation(games: int, difficulties: Sequence[str] = DEFAULT_PLAYERS, seed: int = 0,
+                   workers: Optional[int] = None, max_turns: int = DEFAULT_MAX_TURNS,
+                   batch_size: int = 200) -> Dict[str, Any]:
+    """
+    Roda `games` partidas (sementes seed, seed+1, ...) e retorna o relatório
+
+    Args:
+        workers: Número de processos (1 roda no processo atual; None = nº de CPUs)
+        batch_size: Partidas por tarefa enviada ao pool
+    """
+    difficulties = list(difficulties)
+    unknown = [d for d in difficulties if d not in _strategies]
+    if unknown:
+        raise ValueError(f"Unknown difficulties: {unknown}")
+    if len(difficulties) < 2:
+        raise ValueError("Need at least 2 players")
+
+    workers = workers or os.cpu_count() or 1
+    seeds = list(range(seed, seed + games))
+    batches = [seeds[i:i + batch_size] for i in range(0, len(seeds), batch_size)]
+
+    start = time.perf_counter()
+    results: List[Dict[str, Any]] = []
+    if workers == 1:
+        for batch in batches:
+            results.extend(_play_batch(batch, difficulties, max_turns))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(_play_batch, batch, difficulties, max_turns) for batch in batches]
+            for future in futures:
+                results.extend(future.result())
+    elapsed = time.perf_counter() - start
+
+    return summarize(results, difficulties, elapsed)
+
+def format_report(report: Dict[str, Any]) -> str:
+    """Relatório em texto para o terminal"""
+    lines = [
+        f"Games:        {report['games']} ({report['unfinished']} unfinished)",
+        f"Players:      {', '.join(report['players'])}",
+        f"Elapsed:      {report['elapsed_sec']}s ({report['games_per_sec']} games/sec)",
+        f"Avg turns:    {report['avg_turns']}",
+        "Win rate per seat:"
+    ]
+    for difficulty, rate in report["win_rate"].items():
+        penalties = report["penalties"]["avg_per_seat"][difficulty]
+        lines.append(f"  {difficulty:<6} {rate * 100:6.2f}%   avg penalties {penalties}")
+    lines.append(f"Penalties per game: avg {report['penalties']['avg_per_game']}")
+    for count, games in report["penalties"]["histogram"].items():
+        lines.append(f"  {count:>3}: {games}")
+    return "\n".join(lines)
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Headless SOMO bot self-play simulator")
+    parser.add_argument("--games", type=int, default=1000, help="number of games to play")
+    parser.add_argument("--players", default=",".join(DEFAULT_PLAYERS),
+                        help="comma-separated bot difficulties, one per seat (e.g. LOW,MID,HIGH)")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the first game (game i uses seed + i)")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: CPU count)")
+    parser.add_argument("--max-turns", type=int, default=DEFAULT_MAX_TURNS, help="turn cap per game")
+    parser.add_argument("--batch-size", type=int, default=200, help="games per pool task")
+    parser.add_argument("--vectorized", action="store_true",
+                        help="use the NumPy batch engine (requires numpy; --workers/--batch-size are ignored)")
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    args = parser.parse_args(argv)
+
+    difficulties = [d.strip().upper() for d in args.players.split(",") if d.strip()]
+    if args.vectorized:
+        # Import tardio: numpy é dependência opcional
+        from .engine.batch import run_batch_simulation
+        report = run_batch_simulation(args.games, difficulties, seed=args.seed, max_turns=args.max_turns)
+    else:
+        report = run_simulation(
+            args.games,
+            difficulties,
+            seed=args.seed,
+            workers=args.workers,
+            max_turns=args.max_turns,
+            batch_size=args.batch_size
+        )
+    print(json.dumps(report, indent=2) if args.json else format_report(report))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,387 @@
+"""
+Torneio entre estratégias de bot, com rating Elo e custo de decisão.
+
+Mesas de `table_size` bots jogam partidas completas com GameEngine,
+espalhadas por um ProcessPoolExecutor (como o simulador). Cada partida vira
+uma classificação (vencedor, depois quem foi eliminado mais tarde) e,
+dela, resultados par a par. O rating é o Elo de máxima verossimilhança
+(Bradley-Terry) sobre todos os pares, com intervalo de confiança por
+bootstrap sobre as partidas. A latência de cada decisão é medida no mesmo
+jogo, sem o cache de decisões: força e custo saem do mesmo relatório.
+
+Formatos:
+    round-robin  todas as combinações de `table_size` entre os inscritos
+    swiss        rodadas em que as mesas juntam inscritos de pontuação
+                 parecida (útil com muitos inscritos)
+
+Em cada mesa, os assentos giram de uma partida para a outra e as sementes
+se repetem entre mesas (números aleatórios comuns).
+
+Uso (a partir de backend/):
+    python -m app.tournament --entrants LOW,MID,HIGH,MASTER --games-per-table 300
+"""
+
+import argparse
+import json
+import math
+import os
+import random
+import time
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from itertools import combinations
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from .engine.bots import BotManager, BotStrategy, MCTSBotStrategy
+from .engine.rules import GameEngine
+from .engine.state import GameStateManager
+from .services.bot_executor import latency_ms
+from .sim import DEFAULT_MAX_TURNS, create_sim_room
+
+DEFAULT_ENTRANTS = ("LOW", "MID", "HIGH")
+
+# Escala Elo: média dos inscritos em 1500
+ELO_BASE = 1500
+ELO_SCALE = 400 / math.log(10)
+
+# Uma instância por processo (cada worker importa o módulo)
+_engine = GameEngine()
+_strategies = BotManager().strategies
+
+def match_strategies(expert_budget: Optional[float] = None) -> Dict[str, BotStrategy]:
+    """Estratégias de um torneio: as do processo, com o orçamento de busca do EXPERT dado (None = 1s por jogada)"""
+    strategies = dict(_strategies)
+    if expert_budget is not None:
+        strategies["EXPERT"] = MCTSBotStrategy(time_budget=expert_budget)
+    return strategies
+
+def play_match(seed: int, seats: Sequence[str], max_turns: int = DEFAULT_MAX_TURNS,
+               strategies: Optional[Dict[str, BotStrategy]] = None) -> Dict[str, Any]:
+    """
+    Joga uma partida e mede cada decisão
+
+    Args:
+        strategies: Estratégia de cada inscrito (padrão: as do BotManager)
+
+    Returns:
+        {"seed", "seats", "ranks" (por assento, 0 = melhor; empates têm o
+        mesmo valor), "turns", "finished", "latencies" (segundos, por estratégia)}
+    """
+    room = create_sim_room(seats, f"tournament-{seed}")
+    seat_of = {player.id: index for index, player in enumerate(room.players)}
+    _engine.start_game(room, seed)
+
+    eliminated_at = [None] * len(seats)  # Turno da eliminação de cada assento
+    latencies: Dict[str, List[float]] = defaultdict(list)
+    strategies = strategies or _strategies
+    turns = 0
+    winner = None
+
+    while turns < max_turns:
+        winner = GameStateManager.check_game_over(room)
+        if winner:
+            break
+
+        player = GameStateManager.get_player_by_id(room, room.current_turn)
+        entrant = seats[seat_of[player.id]]
+        start = time.perf_counter()
+        action = strategies[entrant].choose_action(room, player, _engine) or {"type": "pass_turn"}
+        latencies[entrant].append(time.perf_counter() - start)
+
+        result = _engine.apply_action(room, player.id, action)
+        if not result["success"]:
+            raise RuntimeError(f"Seed {seed}: bot action rejected ({result['error']}): {action}")
+
+        for event in result["events"]:
+            if event["event"] == "penalty" and event["tokens_left"] <= 0:
+                eliminated_at[seat_of[event["player_id"]]] = turns
+        turns += 1
+
+    # Quem continua no jogo fica à frente; entre eliminados, quem saiu mais tarde
+    ranks = [
+        0 if at is None else 1 + sum(1 for other in eliminated_at if other is None or other > at)
+        for at in eliminated_at
+    ]
+    return {
+        "seed": seed,
+        "seats": list(seats),
+        "ranks": ranks,
+        "turns": turns,
+        "finished": winner is not None,
+        "latencies": dict(latencies)
+    }
+
+def _play_tasks(tasks: List[Tuple[int, Tuple[str, ...]]], max_turns: int,
+                expert_budget: Optional[float]) -> List[Dict[str, Any]]:
+    """Worker do pool: joga um lote de partidas (semente, assentos)"""
+    strategies = match_strategies(expert_budget)
+    return [play_match(seed, seats, max_turns, strategies) for seed, seats in tasks]
+
+def table_tasks(table: Sequence[str], games: int, seed: int) -> List[Tuple[int, Tuple[str, ...]]]:
+    """Partidas de uma mesa: assentos girando, sementes seed, seed+1, ..."""
+    size = len(table)
+    return [
+        (seed + game, tuple(table[(seat + game) % size] for seat in range(size)))
+        for game in range(games)
+    ]
+
+def swiss_tables(entrants: Sequence[str], standings: Dict[str, float], table_size: int) -> List[Tuple[str, ...]]:
+    """
+    Mesas de uma rodada suíça: inscritos em ordem de pontuação, em grupos
+    consecutivos; a última mesa, se incompleta, é completada com os
+    inscritos logo acima dela
+    """
+    ordered = sorted(entrants, key=lambda entrant: -standings.get(entrant, 0.0))
+    tables = []
+    for start in range(0, len(ordered), table_size):
+        table = ordered[start:start + table_size]
+        if len(table) < table_size:
+            table = ordered[-table_size:]
+        tables.append(tuple(table))
+    return tables
+
+def pairwise_results(results: List[Dict[str, Any]]) -> List[Tuple[str, str, float]]:
+    """(a, b, pontos de a) para cada par de assentos de cada partida (empate = 0.5)"""
+    pairs = []
+    for result in results:
+        seats, ranks = result["seats"], result["ranks"]
+        for i, j in combinations(range(len(seats)), 2):
+            if seats[i] == seats[j]:
+                continue
+            score = 1.0 if ranks[i] < ranks[j] else 0.0 if ranks[i] > ranks[j] else 0.5
+            pairs.append((seats[i], seats[j], score))
+    return pairs
+
+def fit_elo(pairs: List[Tuple[str, str, float]], entrants: Sequence[str], iterations: int = 500) -> Dict[str, float]:
+    """
+    Elo de máxima verossimilhança (modelo de Bradley-Terry, algoritmo MM)
+
+    Cada par que se enfrentou recebe um empate virtual, para que um
+    inscrito que nunca pontuou tenha rating finito.
+    """
+    points: Dict[str, float] = defaultdict(float)
+    meetings: Dict[Tuple[str, str], float] = defaultdict(float)
+    for a, b, score in pairs:
+        points[a] += score
+        points[b] += 1.0 - score
+        meetings[a, b] += 1
+        meetings[b, a] += 1
+
+    for a, b in list(meetings):
+        if a < b:
+            meetings[a, b] += 1
+            meetings[b, a] += 1
+            points[a] += 0.5
+            points[b] += 0.5
+
+    opponents = defaultdict(list)
+    for (a, b), count in meetings.items():
+        opponents[a].append((b, count))
+
+    strength = {entrant: 1.0 for entrant in entrants}
+    for _ in range(iterations):
+        updated = {}
+        for entrant in entrants:
+            denominator = sum(count / (strength[entrant] + strength[other]) for other, count in opponents[entrant])
+            updated[entrant] = points[entrant] / denominator if denominator else strength[entrant]
+        # Normaliza pela média geométrica (rating médio = ELO_BASE)
+        mean_log = sum(math.log(value) for value in updated.values()) / len(updated)
+        converged = all(abs(math.log(updated[e] / strength[e]) - mean_log) < 1e-9 for e in entrants)
+        strength = {entrant: value / math.exp(mean_log) for entrant, value in updated.items()}
+        if converged:
+            break
+
+    return {entrant: ELO_BASE + ELO_SCALE * math.log(value) for entrant, value in strength.items()}
+
+def elo_confidence(results: List[Dict[str, Any]], entrants: Sequence[str], samples: int = 200,
+                   confidence: float = 0.95, seed: int = 0) -> Dict[str, Tuple[float, float]]:
+    """Intervalo de confiança do Elo por bootstrap (partidas reamostradas com reposição)"""
+    rng = random.Random(seed)
+    per_game = [pairwise_results([result]) for result in results]
+    ratings = defaultdict(list)
+    for _ in range(samples):
+        resampled = [pair for _ in per_game for pair in rng.choice(per_game)]
+        for entrant, rating in fit_elo(resampled, entrants, iterations=200).items():
+            ratings[entrant].append(rating)
+
+    tail = (1 - confidence) / 2
+    intervals = {}
+    for entrant, values in ratings.items():
+        values.sort()
+        intervals[entrant] = (values[int(tail * (len(values) - 1))], values[int((1 - tail) * (len(values) - 1))])
+    return intervals
+
+def _latency_summary(latencies: List[float]) -> Dict[str, Any]:
+    latencies = sorted(latencies)
+    return {
+        "decisions": len(latencies),
+        "mean_ms": round(sum(latencies) / len(latencies) * 1000, 4) if latencies else None,
+        "p50_ms": latency_ms(latencies, 0.5, 4),
+        "p95_ms": latency_ms(latencies, 0.95, 4),
+        "p99_ms": latency_ms(latencies, 0.99, 4)
+    }
+
+def summarize(results: List[Dict[str, Any]], entrants: Sequence[str], elapsed: float,
+              bootstrap: int = 200, seed: int = 0) -> Dict[str, Any]:
+    """Agrega as partidas no relatório do torneio (ordenado por Elo)"""
+    pairs = pairwise_results(results)
+    elo = fit_elo(pairs, entrants)
+    intervals = elo_confidence(results, entrants, bootstrap, seed=seed) if bootstrap else {}
+
+    games = defaultdict(int)
+    first_places = defaultdict(int)
+    latencies = defaultdict(list)
+    for result in results:
+        for entrant, rank in zip(result["seats"], result["ranks"]):
+            games[entrant] += 1
+            if rank == 0 and result["finished"]:
+                first_places[entrant] += 1
+        for entrant, values in result["latencies"].items():
+            latencies[entrant].extend(values)
+
+    # Pontuação par a par (linha contra coluna)
+    head_to_head: Dict[str, Dict[str, List[float]]] = defaultdict(lambda: defaultdict(lambda: [0.0, 0]))
+    for a, b, score in pairs:
+        head_to_head[a][b][0] += score
+        head_to_head[a][b][1] += 1
+        head_to_head[b][a][0] += 1.0 - score
+        head_to_head[b][a][1] += 1
+
+    standings = []
+    for entrant in sorted(entrants, key=lambda e: -elo[e]):
+        low, high = intervals.get(entrant, (None, None))
+        standings.append({
+            "entrant": entrant,
+            "elo": round(elo[entrant], 1),
+            "elo_ci": [round(low, 1), round(high, 1)] if low is not None else None,
+            "games": games[entrant],
+            "win_rate": round(first_places[entrant] / games[entrant], 4) if games[entrant] else 0,
+            "score_vs": {
+                other: round(points / count, 4)
+                for other, (points, count) in sorted(head_to_head[entrant].items())
+            },
+            "latency": _latency_summary(latencies[entrant])
+        })
+
+    return {
+        "games": len(results),
+        "unfinished": sum(1 for result in results if not result["finished"]),
+        "elapsed_sec": round(elapsed, 3),
+        "standings": standings
+    }
+
+def run_tournament(entrants: Sequence[str] = DEFAULT_ENTRANTS, fmt: str = "round-robin",
+                   table_size: int = 3, games_per_table: int = 100, rounds: int = 5,
+                   seed: int = 0, workers: Optional[int] = None, max_turns: int = DEFAULT_MAX_TURNS,
+                   batch_size: int = 25, bootstrap: int = 200,
+                   expert_budget: Optional[float] = None) -> Dict[str, Any]:
+    """
+    Roda o torneio e retorna o relatório
+
+    Args:
+        fmt: "round-robin" ou "swiss"
+        table_size: Bots por mesa (2 a nº de inscritos)
+        games_per_table: Partidas por mesa (por rodada, no suíço)
+        rounds: Rodadas do suíço
+        workers: Número de processos (1 roda no processo atual; None = nº de CPUs)
+        batch_size: Partidas por tarefa enviada ao pool
+        bootstrap: Reamostragens do intervalo de confiança (0 = sem intervalo)
+        expert_budget: Tempo de busca por jogada do EXPERT (None = o padrão)
+    """
+    entrants = list(dict.fromkeys(entrants))
+    unknown = [e for e in entrants if e not in _strategies]
+    if unknown:
+        raise ValueError(f"Unknown entrants: {unknown}")
+    if not 2 <= table_size <= len(entrants):
+        raise ValueError(f"Table size must be between 2 and {len(entrants)}")
+    if fmt not in ("round-robin", "swiss"):
+        raise ValueError(f"Unknown format: {fmt}")
+
+    workers = workers or os.cpu_count() or 1
+    pool = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+
+    def play(tasks: List[Tuple[int, Tuple[str, ...]]]) -> List[Dict[str, Any]]:
+        batches = [tasks[i:i + batch_size] for i in range(0, len(tasks), batch_size)]
+        if pool is None:
+            return [result for batch in batches for result in _play_tasks(batch, max_turns, expert_budget)]
+        futures = [pool.submit(_play_tasks, batch, max_turns, expert_budget) for batch in batches]
+        return [result for future in futures for result in future.result()]
+
+    start = time.perf_counter()
+    results: List[Dict[str, Any]] = []
+    try:
+        if fmt == "round-robin":
+            tasks = []
+            for table in combinations(entrants, table_size):
+                tasks.extend(table_tasks(table, games_per_table, seed))
+            results = play(tasks)
+        else:
+            standings: Dict[str, float] = {}
+            for round_number in range(rounds):
+                tasks = []
+                for table in swiss_tables(entrants, standings, table_size):
+                    tasks.extend(table_tasks(table, games_per_table, seed + round_number * games_per_table))
+                results.extend(play(tasks))
+                standings = fit_elo(pairwise_results(results), entrants)
+    finally:
+        if pool is not None:
+            pool.shutdown()
+    elapsed = time.perf_counter() - start
+
+    report = summarize(results, entrants, elapsed, bootstrap, seed)
+    report["format"] = fmt
+    report["table_size"] = table_size
+    return report
+
+def format_report(report: Dict[str, Any]) -> str:
+    """Relatório em texto para o terminal"""
+    lines = [
+        f"Format:       {report['format']} (tables of {report['table_size']})",
+        f"Games:        {report['games']} ({report['unfinished']} unfinished)",
+        f"Elapsed:      {report['elapsed_sec']}s",
+        f"{'Entrant':<8} {'Elo':>7}  {'95% CI':<15} {'Games':>6} {'Wins':>7}  {'p50 ms':>8} {'p99 ms':>8}"
+    ]
+    for row in report["standings"]:
+        ci = f"[{row['elo_ci'][0]:.0f}, {row['elo_ci'][1]:.0f}]" if row["elo_ci"] else "-"
+        latency = row["latency"]
+        lines.append(
+            f"{row['entrant']:<8} {row['elo']:>7.1f}  {ci:<15} {row['games']:>6} {row['win_rate'] * 100:>6.2f}%"
+            f"  {latency['p50_ms'] or 0:>8.3f} {latency['p99_ms'] or 0:>8.3f}"
+        )
+    return "\n".join(lines)
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="SOMO bot tournament with Elo ratings")
+    parser.add_argument("--entrants", default=",".join(DEFAULT_ENTRANTS),
+                        help="comma-separated bot difficulties (e.g. LOW,MID,HIGH,MASTER)")
+    parser.add_argument("--format", choices=("round-robin", "swiss"), default="round-robin")
+    parser.add_argument("--table-size", type=int, default=3, help="bots per table")
+    parser.add_argument("--games-per-table", type=int, default=100, help="games per table (per round for swiss)")
+    parser.add_argument("--rounds", type=int, default=5, help="swiss rounds")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: CPU count)")
+    parser.add_argument("--max-turns", type=int, default=DEFAULT_MAX_TURNS, help="turn cap per game")
+    parser.add_argument("--batch-size", type=int, default=25, help="games per pool task")
+    parser.add_argument("--bootstrap", type=int, default=200, help="bootstrap samples for the Elo interval (0 = none)")
+    parser.add_argument("--expert-budget", type=float, default=None, help="EXPERT search time per move (seconds)")
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    args = parser.parse_args(argv)
+
+    entrants = [e.strip().upper() for e in args.entrants.split(",") if e.strip()]
+    report = run_tournament(
+        entrants,
+        fmt=args.format,
+        table_size=args.table_size,
+        games_per_table=args.games_per_table,
+        rounds=args.rounds,
+        seed=args.seed,
+        workers=args.workers,
+        max_turns=args.max_turns,
+        batch_size=args.batch_size,
+        bootstrap=args.bootstrap,
+        expert_budget=args.expert_budget
+    )
+    print(json.dumps(report, indent=2) if args.json else format_report(report))
+
+if __name__ == "__main__":
+    main()
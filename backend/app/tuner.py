@@ -0,0 +1,284 @@
+"""
+Ajuste dos limiares das estratégias heurísticas por self-play.
+
+Avalia vetores de parâmetros de uma estratégia ajustável (ver
+TUNABLE_STRATEGIES em engine/bots.py) jogando partidas contra uma mesa de
+adversários fixos, espalhadas por um ProcessPoolExecutor. Todos os
+candidatos de uma mesma etapa jogam com as mesmas sementes (números
+aleatórios comuns), então as diferenças entre eles não vêm da sorte das
+cartas. A busca é em grade ou evolutiva (mutação gaussiana sobre os
+melhores); no fim, os melhores candidatos e os parâmetros padrão são
+comparados num bloco novo de sementes (validação).
+
+O resultado vai para um arquivo JSON que o servidor carrega na
+inicialização (SOMO_BOT_PARAMS, ver load_bot_params).
+
+Uso (a partir de backend/):
+    python -m app.tuner --target MID --opponents LOW,HIGH --out bot_params.json
+"""
+
+import argparse
+import itertools
+import json
+import math
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional, Sequence
+
+from .engine.bots import TUNABLE_STRATEGIES
+from .sim import DEFAULT_MAX_TURNS, default_strategies, play_game
+
+# Intervalo de busca de cada parâmetro (frações do limite da rodada)
+PARAM_SPACE = {
+    "MID": {"reset_threshold": (0.0, 1.0), "danger_threshold": (0.0, 1.0)}
+}
+
+# Nome do assento do candidato na mesa (os adversários podem incluir a própria dificuldade)
+TUNED_SEAT = "TUNED"
+
+# Blocos de sementes: cada etapa usa o seu, a validação usa um separado
+SEED_BLOCK = 1_000_000
+
+def default_params(target: str) -> Dict[str, float]:
+    """Parâmetros atuais da estratégia (os do construtor)"""
+    strategy = TUNABLE_STRATEGIES[target]()
+    return {name: getattr(strategy, name) for name in PARAM_SPACE[target]}
+
+def _play_batch(target: str, params: Dict[str, float], table: Sequence[str],
+                seeds: List[int], max_turns: int) -> List[int]:
+    """
+    Worker do pool: 1 por vitória do candidato, 0 por derrota, semente a semente
+
+    O candidato troca de assento conforme a semente (a mesma rotação para
+    todos os candidatos).
+    """
+    strategies = default_strategies()
+    strategies[TUNED_SEAT] = TUNABLE_STRATEGIES[target](**params)
+    wins = []
+    for seed in seeds:
+        shift = seed % len(table)
+        seats = list(table[shift:]) + list(table[:shift])
+        result = play_game(seed, seats, max_turns, strategies)
+        wins.append(1 if result["winner"] is not None and seats[result["winner"]] == TUNED_SEAT else 0)
+    return wins
+
+class Tuner:
+    """
+    Busca de parâmetros para uma dificuldade
+
+    Args:
+        target: Dificuldade ajustada ("MID")
+        opponents: Dificuldades dos outros assentos da mesa
+        workers: Número de processos (1 roda no processo atual; None = nº de CPUs)
+        batch_size: Partidas por tarefa enviada ao pool
+    """
+
+    def __init__(self, target: str, opponents: Sequence[str], seed: int = 0,
+                 workers: Optional[int] = None, max_turns: int = DEFAULT_MAX_TURNS, batch_size: int = 100):
+        if target not in PARAM_SPACE:
+            raise ValueError(f"No tunable parameters for {target!r}")
+        unknown = [o for o in opponents if o not in default_strategies()]
+        if unknown:
+            raise ValueError(f"Unknown opponents: {unknown}")
+        if not opponents:
+            raise ValueError("Need at least 1 opponent")
+
+        self.target = target
+        self.space = PARAM_SPACE[target]
+        self.table = [TUNED_SEAT, *opponents]
+        self.seed = seed
+        self.workers = workers or os.cpu_count() or 1
+        self.max_turns = max_turns
+        self.batch_size = batch_size
+        self.rng = random.Random(seed)
+        self.stage = 0  # Bloco de sementes da próxima avaliação
+
+    def evaluate(self, candidates: List[Dict[str, float]], games: int,
+                 pool: Optional[ProcessPoolExecutor] = None) -> List[List[int]]:
+        """Vitórias por semente de cada candidato, todos com as mesmas sementes"""
+        start = self.seed + self.stage * SEED_BLOCK
+        self.stage += 1
+        seeds = list(range(start, start + games))
+        batches = [seeds[i:i + self.batch_size] for i in range(0, games, self.batch_size)]
+
+        if pool is None:
+            return [
+                [win for batch in batches for win in _play_batch(self.target, params, self.table, batch, self.max_turns)]
+                for params in candidates
+            ]
+        futures = [
+            [pool.submit(_play_batch, self.target, params, self.table, batch, self.max_turns) for batch in batches]
+            for params in candidates
+        ]
+        return [[win for future in row for win in future.result()] for row in futures]
+
+    def grid(self, steps: int) -> List[Dict[str, float]]:
+        """Todos os pontos de uma grade com `steps` valores por parâmetro"""
+        axes = [
+            [round(low + (high - low) * i / max(steps - 1, 1), 4) for i in range(steps)]
+            for low, high in self.space.values()
+        ]
+        return [dict(zip(self.space, values)) for values in itertools.product(*axes)]
+
+    def mutate(self, params: Dict[str, float], sigma: float) -> Dict[str, float]:
+        """Filho de um candidato: ruído gaussiano em cada parâmetro, dentro do intervalo"""
+        return {
+            name: round(min(max(params[name] + self.rng.gauss(0, sigma * (high - low)), low), high), 4)
+            for name, (low, high) in self.space.items()
+        }
+
+    def run(self, method: str = "evolve", games: int = 400, validation_games: int = 2000,
+            steps: int = 6, population: int = 12, generations: int = 6, sigma: float = 0.15,
+            finalists: int = 3) -> Dict[str, Any]:
+        """
+        Roda a busca e valida os finalistas
+
+        Returns:
+            Relatório com os melhores parâmetros, a taxa de vitória deles e a
+            dos parâmetros padrão nas mesmas sementes de validação
+        """
+        start = time.perf_counter()
+        baseline = default_params(self.target)
+        pool = ProcessPoolExecutor(max_workers=self.workers) if self.workers > 1 else None
+        history = []
+        try:
+            if method == "grid":
+                candidates = self.grid(steps)
+                scores = [sum(wins) / games for wins in self.evaluate(candidates, games, pool)]
+                ranked = sorted(zip(scores, range(len(candidates))), reverse=True)
+                top = [candidates[index] for _, index in ranked[:finalists]]
+                history.append({"stage": "grid", "candidates": len(candidates), "best_win_rate": ranked[0][0]})
+            elif method == "evolve":
+                elite_count = max(population // 4, 1)
+                candidates = [baseline] + [
+                    {name: round(self.rng.uniform(low, high), 4) for name, (low, high) in self.space.items()}
+                    for _ in range(population - 1)
+                ]
+                for generation in range(generations):
+                    scores = [sum(wins) / games for wins in self.evaluate(candidates, games, pool)]
+                    ranked = sorted(zip(scores, range(len(candidates))), reverse=True)
+                    elites = [candidates[index] for _, index in ranked[:elite_count]]
+                    history.append({"stage": f"generation {generation}", "best_win_rate": ranked[0][0],
+                                    "best": elites[0]})
+                    # Os melhores seguem (e são reavaliados com sementes novas); o resto são filhos deles
+                    candidates = elites + [
+                        self.mutate(elites[i % elite_count], sigma) for i in range(population - elite_count)
+                    ]
+                top = elites[:finalists]
+            else:
+                raise ValueError(f"Unknown method: {method}")
+
+            # Validação: finalistas e padrão nas mesmas sementes novas
+            finalists_params = [baseline] + [params for params in top if params != baseline]
+            validation = self.evaluate(finalists_params, validation_games, pool)
+        finally:
+            if pool is not None:
+                pool.shutdown()
+
+        base_wins = validation[0]
+        results = []
+        for params, wins in zip(finalists_params, validation):
+            diffs = [a - b for a, b in zip(wins, base_wins)]
+            mean = sum(diffs) / len(diffs)
+            variance = sum((d - mean) ** 2 for d in diffs) / max(len(diffs) - 1, 1)
+            results.append({
+                "params": params,
+                "win_rate": round(sum(wins) / validation_games, 4),
+                "vs_default": round(mean, 4),
+                "stderr": round(math.sqrt(variance / len(diffs)), 4)
+            })
+        best = max(results, key=lambda result: result["win_rate"])
+
+        return {
+            "target": self.target,
+            "table": self.table,
+            "method": method,
+            "games_per_candidate": games,
+            "validation_games": validation_games,
+            "seed": self.seed,
+            "elapsed_sec": round(time.perf_counter() - start, 1),
+            "default": results[0],
+            "best": best,
+            "finalists": results,
+            "history": history
+        }
+
+def save_params(path: str, report: Dict[str, Any]):
+    """
+    Grava os melhores parâmetros no arquivo de parâmetros (mantendo as outras
+    dificuldades); o resumo da busca fica em "_tuning"
+    """
+    data: Dict[str, Any] = {}
+    if os.path.exists(path):
+        with open(path) as f:
+            data = json.load(f)
+
+    target = report["target"]
+    data[target] = report["best"]["params"]
+    data.setdefault("_tuning", {})[target] = {
+        "table": report["table"],
+        "method": report["method"],
+        "validation_games": report["validation_games"],
+        "win_rate": report["best"]["win_rate"],
+        "default_win_rate": report["default"]["win_rate"],
+        "stderr": report["best"]["stderr"],
+        "seed": report["seed"]
+    }
+    with open(path, "w") as f:
+        json.dump(data, f, indent=2)
+
+def format_report(report: Dict[str, Any]) -> str:
+    """Relatório em texto para o terminal"""
+    lines = [
+        f"Target:       {report['target']} (table: {', '.join(report['table'])})",
+        f"Method:       {report['method']} ({report['games_per_candidate']} games per candidate)",
+        f"Elapsed:      {report['elapsed_sec']}s",
+    ]
+    for entry in report["history"]:
+        lines.append(f"  {entry['stage']:<14} best win rate {entry['best_win_rate'] * 100:6.2f}%")
+    lines.append(f"Validation ({report['validation_games']} games, same seeds for all):")
+    for result in report["finalists"]:
+        marker = "*" if result is report["best"] else " "
+        lines.append(
+            f" {marker} {json.dumps(result['params'])}  {result['win_rate'] * 100:6.2f}%"
+            f"  ({result['vs_default'] * 100:+.2f} ± {result['stderr'] * 100:.2f} vs default)"
+        )
+    return "\n".join(lines)
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Tune heuristic bot thresholds by self-play")
+    parser.add_argument("--target", choices=sorted(PARAM_SPACE), default="MID", help="difficulty to tune")
+    parser.add_argument("--opponents", default="LOW,HIGH", help="comma-separated difficulties of the other seats")
+    parser.add_argument("--method", choices=("evolve", "grid"), default="evolve")
+    parser.add_argument("--games", type=int, default=400, help="games per candidate per stage")
+    parser.add_argument("--validation-games", type=int, default=2000)
+    parser.add_argument("--steps", type=int, default=6, help="grid values per parameter")
+    parser.add_argument("--population", type=int, default=12)
+    parser.add_argument("--generations", type=int, default=6)
+    parser.add_argument("--sigma", type=float, default=0.15, help="mutation size (fraction of each range)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: CPU count)")
+    parser.add_argument("--max-turns", type=int, default=DEFAULT_MAX_TURNS)
+    parser.add_argument("--out", default=None, help="parameters file to update (loaded via SOMO_BOT_PARAMS)")
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    args = parser.parse_args(argv)
+
+    opponents = [o.strip().upper() for o in args.opponents.split(",") if o.strip()]
+    tuner = Tuner(args.target, opponents, seed=args.seed, workers=args.workers, max_turns=args.max_turns)
+    report = tuner.run(
+        args.method,
+        games=args.games,
+        validation_games=args.validation_games,
+        steps=args.steps,
+        population=args.population,
+        generations=args.generations,
+        sigma=args.sigma
+    )
+    if args.out:
+        save_params(args.out, report)
+    print(json.dumps(report, indent=2) if args.json else format_report(report))
+
+if __name__ == "__main__":
+    main()
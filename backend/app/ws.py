@@ -1,79 +1,407 @@
 import json
 import asyncio
-from typing import Dict, Set, Optional
+from typing import Any, Awaitable, Callable, Dict, List, Set, Optional, Tuple
 from fastapi import WebSocket, WebSocketDisconnect
+from pydantic import ValidationError
 from .models import *
+from .cards import card_to_dict
 from .services.room_manager import room_manager
+from .services.bot_scheduler import BotTurnScheduler
+from .services.bot_executor import BotExecutor
+from .services.outbox import ConnectionOutbox
+from .services.room_sync import diff_public_state
+from .services.broadcast_ticker import BroadcastTicker, BROADCAST_RATE
+from .services.wire import JSON_CODEC, Payload, get_codec
+from .services.sessions import ReplayBuffer, SessionRegistry, RESUME_GRACE
 from .engine.rules import GameEngine
+from .engine.state import GameStateManager
 from .engine.bots import BotManager
 import logging
 
 logger = logging.getLogger(__name__)
 
 class ConnectionManager:
-    def __init__(self):
+    def __init__(self, broadcast_rate: float = BROADCAST_RATE, resume_grace: float = RESUME_GRACE):
         self.active_connections: Dict[str, WebSocket] = {}  # player_id -> websocket
         self.player_connections: Dict[WebSocket, str] = {}  # websocket -> player_id
+        self.outboxes: Dict[str, ConnectionOutbox] = {}  # player_id -> fila de saída
+        self.synced: Dict[str, tuple] = {}  # player_id -> (room_id, versão, JSON da mão) do último envio
+        self.codecs: Dict[str, Any] = {}  # player_id -> codec negociado (ausente = JSON)
         self.game_engine = GameEngine()
         self.bot_manager = BotManager()
+        self.bot_scheduler = BotTurnScheduler()
+        self.bot_executor = BotExecutor(self.bot_manager)
+        # Envio do estado das salas em ticks; eventos aguardam o flush na ordem em que ocorreram
+        self.broadcast_ticker = BroadcastTicker(self._flush_room, broadcast_rate)
+        self.pending_events: Dict[str, List[dict]] = {}  # room_id -> eventos ainda não enviados
+        # Retomada de sessão: assento reservado após a queda e versões recentes para reenviar
+        self.sessions = SessionRegistry(self._remove_player, resume_grace)
+        self.replay_buffer = ReplayBuffer()
+        # Toda remoção de sala (vazia, inativa, remove_room) libera o que é guardado por sala
+        room_manager.add_removal_listener(self._room_removed)
+        
+        # Tabela de despacho: action -> (handler, código de erro do handler)
+        self.handlers: Dict[str, Tuple[Callable[[str, Any], Awaitable[None]], str]] = {
+            "create_room": (self._handle_create_room, "CREATE_ROOM_ERROR"),
+            "join_room": (self._handle_join_room, "JOIN_ROOM_ERROR"),
+            "start_game": (self._handle_start_game, "START_GAME_ERROR"),
+            "play_card": (self._handle_play_card, "PLAY_CARD_ERROR"),
+            "play_special": (self._handle_play_special, "PLAY_SPECIAL_ERROR"),
+            "pass_turn": (self._handle_pass_turn, "PASS_TURN_ERROR"),
+            "chat": (self._handle_chat, "CHAT_ERROR"),
+            "add_bot": (self._handle_add_bot, "ADD_BOT_ERROR"),
+            "resync": (self._handle_resync, "RESYNC_ERROR")
+        }
     
-    async def connect(self, websocket: WebSocket, player_id: str):
-        """Conecta um jogador"""
-        await websocket.accept()
+    async def connect(self, websocket: WebSocket, player_id: str, subprotocol: Optional[str] = None):
+        """Conecta um jogador (com o subprotocolo negociado, ver services/wire.py)"""
+        await websocket.accept(subprotocol=subprotocol)
+        previous = self.active_connections.get(player_id)
+        if previous is not None:
+            # Sessão retomada com a conexão antiga ainda aberta (meia-aberta): a nova assume
+            self._detach(previous)
+            asyncio.create_task(self._close_replaced(previous))
         self.active_connections[player_id] = websocket
         self.player_connections[websocket] = player_id
+        if subprotocol:
+            self.codecs[player_id] = get_codec(subprotocol)
+        self.outboxes[player_id] = ConnectionOutbox(websocket, player_id)
         logger.info(f"Player {player_id} connected")
     
-    def disconnect(self, websocket: WebSocket):
-        """Desconecta um jogador"""
-        if websocket in self.player_connections:
-            player_id = self.player_connections[websocket]
+    async def _close_replaced(self, websocket: WebSocket):
+        try:
+            await websocket.close(code=1000)
+        except Exception:
+            pass  # Já fechado pelo outro lado
+    
+    def _detach(self, websocket: WebSocket) -> Optional[str]:
+        """Esquece uma conexão (sem mexer na sala do jogador)"""
+        player_id = self.player_connections.pop(websocket, None)
+        if player_id is None:
+            return None
+        if self.active_connections.get(player_id) is websocket:
             del self.active_connections[player_id]
-            del self.player_connections[websocket]
-            
-            # Remove o jogador da sala
-            room = room_manager.remove_player(player_id)
-            if room:
-                asyncio.create_task(self.broadcast_room_state(room.id))
-            
-            logger.info(f"Player {player_id} disconnected")
+        self.synced.pop(player_id, None)
+        self.codecs.pop(player_id, None)
+        outbox = self.outboxes.pop(player_id, None)
+        if outbox:
+            outbox.stop()
+        return player_id
+    
+    def disconnect(self, websocket: WebSocket):
+        """
+        Desconecta um jogador
+        
+        Quem estava numa sala mantém o assento pela janela de retomada (ver
+        services/sessions.py) e só sai da sala se não voltar a tempo.
+        """
+        player_id = self._detach(websocket)
+        if player_id is None:
+            return
+        
+        if room_manager.player_to_room.get(player_id) and self.sessions.hold(player_id):
+            logger.info(f"Player {player_id} disconnected; seat held for {self.sessions.grace}s")
+            return
+        
+        self.sessions.drop(player_id)
+        self._remove_player(player_id)
+        logger.info(f"Player {player_id} disconnected")
+    
+    def _remove_player(self, player_id: str):
+        """Tira o jogador da sala (desconexão sem retomada, ou janela expirada)"""
+        room = room_manager.remove_player(player_id)
+        if room:
+            asyncio.create_task(self.broadcast_room_state(room.id))
+            # Se a vez passou para um bot, o driver da sala assume
+            self._ensure_turn_driver(room)
+        # Se a sala ficou vazia, _room_removed já liberou o que era dela
+    
+    def _room_removed(self, room_id: str):
+        """Sala removida: encerra o driver de turnos de bot, os envios pendentes e o buffer de retomada"""
+        self.bot_scheduler.stop(room_id)
+        self.broadcast_ticker.cancel(room_id)
+        self.pending_events.pop(room_id, None)
+        self.replay_buffer.discard(room_id)
+    
+    def recover_sessions(self, store: Any, rooms: List[RoomState]):
+        """
+        Retomada após um restart: recarrega os tokens gravados e reserva o
+        assento dos humanos das salas recuperadas pela janela de retomada
+        
+        Quem não tem token (ou com a retomada desligada) não tem como voltar
+        e sai da sala na hora, para a partida não travar na vez dele.
+        """
+        seated = {p.id for room in rooms for p in room.players if not p.is_bot}
+        self.sessions.attach_store(store, seated)
+        for player_id in seated:
+            if not self.sessions.hold(player_id):
+                self._remove_player(player_id)
+    
+    def start_session(self, player_id: str, resumed: bool = False, version: Optional[int] = None):
+        """
+        Envia o token de retomada da conexão e, numa sessão retomada, o que
+        o jogador perdeu desde a versão `version` da sala
+        
+        "resumed" só vale se o jogador ainda tem assento numa sala; senão o
+        cliente descarta o estado que tinha.
+        """
+        room = room_manager.get_player_room(player_id) if resumed else None
+        self.send_encoded(player_id, self._codec(player_id).encode({
+            "event": "session",
+            "player_id": player_id,
+            "resume_token": self.sessions.issue(player_id),
+            "resumed": room is not None
+        }), "session")
+        if room:
+            self._replay_missed(room, player_id, version)
+    
+    def _replay_missed(self, room: RoomState, player_id: str, version: Optional[int]):
+        """
+        Eventos perdidos e um room_patch desde `version`, num frame "batch"
+        
+        Sem a versão no buffer, vai o room_state completo (depois do tick
+        pendente da sala, ver send_full_state). Com o patch, os eventos ainda
+        no tick da sala seguem depois, como para os demais jogadores.
+        """
+        missed = self.replay_buffer.since(room.id, version, room.version) if version is not None else None
+        if missed is None:
+            self.send_full_state(room, player_id)
+            return
+        
+        player = GameStateManager.get_player_by_id(room, player_id)
+        events, before, after = missed
+        hand = self._hand(player)
+        self.synced[player_id] = (room.id, room.version, JSON_CODEC.encode(hand))
+        if version == room.version:
+            return  # Nada perdido
+        
+        patch = {
+            "event": "room_patch",
+            "room_id": room.id,
+            "base": version,
+            "version": room.version,
+            **diff_public_state(before, after),
+            "self_hand": hand
+        }
+        self.send_encoded(player_id, self._codec(player_id).encode({"event": "batch", "events": events + [patch]}), "batch")
     
     async def send_personal_message(self, player_id: str, message: dict):
         """Envia mensagem para um jogador específico"""
         if player_id in self.active_connections:
-            try:
-                await self.active_connections[player_id].send_text(json.dumps(message))
-            except Exception as e:
-                logger.error(f"Error sending message to {player_id}: {e}")
+            self.send_encoded(player_id, self._codec(player_id).encode(message), message.get("event"))
+    
+    def send_encoded(self, player_id: str, payload: Payload, kind: Optional[str] = None):
+        """
+        Enfileira uma mensagem já codificada (no codec do jogador) na fila de saída
+        
+        Não espera o envio: a task escritora da conexão cuida dele (ver
+        services/outbox.py para a política de fila cheia).
+        """
+        websocket = self.active_connections.get(player_id)
+        if websocket is None:
+            return
+        outbox = self.outboxes.get(player_id)
+        if outbox is None or outbox.websocket is not websocket:
+            outbox = self.outboxes[player_id] = ConnectionOutbox(websocket, player_id)
+        outbox.send(payload, kind)
+    
+    def _codec(self, player_id: Optional[str]):
+        """Codec negociado pela conexão do jogador (JSON por padrão)"""
+        return self.codecs.get(player_id, JSON_CODEC)
+    
+    async def send_to_socket(self, websocket: WebSocket, message: dict):
+        """Responde a um websocket (pela fila de saída, se já registrado)"""
+        player_id = self.player_connections.get(websocket)
+        if player_id:
+            await self.send_personal_message(player_id, message)
+        else:
+            await websocket.send_text(json.dumps(message))
+    
+    async def drain(self):
+        """Envia os ticks pendentes e espera as filas de saída esvaziarem (para testes e encerramento)"""
+        self.broadcast_ticker.flush_all()
+        await asyncio.gather(*(outbox.drain() for outbox in list(self.outboxes.values())))
+    
+    def send_queue_stats(self) -> dict:
+        """Resumo das filas de saída (para debug/monitoramento)"""
+        outboxes = list(self.outboxes.values())
+        return {
+            "connections": len(outboxes),
+            "queued": sum(len(o.queue) for o in outboxes),
+            "max_depth": max((o.max_depth for o in outboxes), default=0),
+            "dropped": sum(o.dropped for o in outboxes),
+            "coalesced": sum(o.coalesced for o in outboxes)
+        }
     
     async def broadcast_to_room(self, room_id: str, message: dict, exclude_player: Optional[str] = None):
-        """Envia mensagem para todos os jogadores de uma sala"""
+        """Envia mensagem para todos os jogadores de uma sala (codificada uma vez por codec)"""
         room = room_manager.get_room(room_id)
         if not room:
             return
         
+        encoded: Dict[str, Payload] = {}
+        kind = message.get("event")
         for player in room.players:
             if exclude_player and player.id == exclude_player:
                 continue
-            await self.send_personal_message(player.id, message)
+            codec = self._codec(player.id)
+            if codec.name not in encoded:
+                encoded[codec.name] = codec.encode(message)
+            self.send_encoded(player.id, encoded[codec.name], kind)
     
     async def broadcast_room_state(self, room_id: str):
-        """Envia o estado da sala para todos os jogadores"""
+        """Marca a sala como alterada: o estado vai para todos no próximo tick"""
+        if room_manager.get_room(room_id):
+            self.broadcast_ticker.mark_dirty(room_id)
+    
+    def _flush_room(self, room_id: str):
+        """
+        Tick da sala: um frame por jogador com os eventos acumulados desde o
+        último tick (em ordem) e o estado atual (patch ou completo)
+        """
+        events = self.pending_events.pop(room_id, [])
         room = room_manager.get_room(room_id)
-        if not room:
-            return
+        if room:
+            self._broadcast_batch(room, events)
+    
+    def _room_state_messages(self, room: RoomState, events: List[dict]) -> List[Tuple[str, Any, Payload, str]]:
+        """
+        Cria uma nova versão da sala e a mensagem de estado de cada jogador
+        
+        Quem já tem a versão anterior recebe só um room_patch com os campos
+        que mudaram (ver services/room_sync.py); os demais recebem o
+        room_state completo. A parte pública é montada, comparada e
+        codificada uma vez por versão (e por codec); por jogador só muda o
+        trecho com a própria mão.
+        
+        A versão nova entra no buffer de retomada junto com os `events` que
+        a acompanham (ver services/sessions.py).
+        
+        Returns:
+            [(player_id, codec, mensagem codificada, tipo)] dos jogadores conectados
+        """
+        previous = room.public_json
+        room.version += 1
+        self.public_room_json(room)
+        self.replay_buffer.record(room.id, room.version, events, room.public_json[2])
         
+        patch = None
+        if previous is not None and previous[0] == room.version - 1:
+            patch = diff_public_state(previous[2], room.public_json[2])
+        patch_items: Dict[str, list] = {}  # codec -> itens comuns do patch, já codificados
+        public: Dict[str, Payload] = {}  # codec -> estado público codificado
+        
+        messages = []
         for player in room.players:
-            # Cria uma versão pública da sala (sem revelar mãos dos outros)            
-            public_room = self._create_public_room_state(room)
-
-            await self.send_personal_message(player.id, {
-            "event": "room_state",
-            "room": public_room.model_dump(),
-            "self_hand": [c.model_dump() for c in player.hand] if not player.is_bot else [],
-            "self_id": player.id  # Novo campo
-            })
-            
+            if player.id not in self.active_connections:
+                continue
+            codec = self._codec(player.id)
+            hand = self._hand(player)
+            hand_key = JSON_CODEC.encode(hand)  # Também serve para saber se a mão mudou
+            hand_value = hand_key if codec is JSON_CODEC else codec.encode(hand)
+            synced = self.synced.get(player.id)
+            
+            if patch is not None and synced is not None and synced[:2] == (room.id, room.version - 1):
+                if codec.name not in patch_items:
+                    patch_items[codec.name] = [
+                        ("event", codec.name_value("room_patch")),
+                        ("room_id", codec.encode(room.id)),
+                        ("base", codec.encode(room.version - 1)),
+                        ("version", codec.encode(room.version))
+                    ] + [(key, codec.encode(value)) for key, value in patch.items()]
+                items = patch_items[codec.name]
+                if hand_key != synced[2]:
+                    items = items + [("self_hand", hand_value)]
+                messages.append((player.id, codec, codec.join_map(items), "room_patch"))
+            else:
+                if codec.name not in public:
+                    public[codec.name] = self._public_room_encoded(room, codec)
+                message = self._room_state_message(codec, room, public[codec.name], player.id, hand_value)
+                messages.append((player.id, codec, message, "room_state"))
+            self.synced[player.id] = (room.id, room.version, hand_key)
+        return messages
+    
+    def _broadcast_batch(self, room: RoomState, events: List[dict]):
+        """
+        Envia eventos e o estado resultante num único frame por jogador
+        
+        O envelope leva os eventos (codificados uma vez por codec) seguidos
+        do estado atual da sala (patch ou completo, por jogador). Sem
+        eventos, vai só o estado, fora do envelope.
+        """
+        if not events:
+            for player_id, _, payload, kind in self._room_state_messages(room, events):
+                self.send_encoded(player_id, payload, kind)
+            return
+        
+        encoded_events: Dict[str, list] = {}
+        for player_id, codec, state, _ in self._room_state_messages(room, events):
+            if codec.name not in encoded_events:
+                encoded_events[codec.name] = [codec.encode(event) for event in events]
+            payload = codec.join_map([
+                ("event", codec.name_value("batch")),
+                ("events", codec.join_array(encoded_events[codec.name] + [state]))
+            ])
+            self.send_encoded(player_id, payload, "batch")
+    
+    def _queue_events(self, room: RoomState, events: List[dict]):
+        """Guarda os eventos de uma ação para o próximo tick da sala (que leva o novo estado)"""
+        self.pending_events.setdefault(room.id, []).extend(events)
+        self.broadcast_ticker.mark_dirty(room.id)
+    
+    def _hand(self, player: PlayerState) -> List[dict]:
+        return [card_to_dict(c) for c in player.hand] if not player.is_bot else []
+    
+    def _room_state_message(self, codec, room: RoomState, public: Payload, player_id: str, hand: Payload) -> Payload:
+        """room_state completo (versão atual) para um jogador"""
+        return codec.join_map([
+            ("event", codec.name_value("room_state")),
+            ("version", codec.encode(room.version)),
+            ("room", public),
+            ("self_hand", hand),
+            ("self_id", codec.encode(player_id))
+        ])
+    
+    def send_full_state(self, room: RoomState, player_id: str):
+        """
+        Envia o room_state completo a um jogador (entrada na sala, resync)
+        
+        O tick pendente da sala sai antes: os eventos dele já estão refletidos
+        no estado completo e não podem chegar depois dele.
+        """
+        player = GameStateManager.get_player_by_id(room, player_id)
+        if not player:
+            return
+        self.broadcast_ticker.flush_now(room.id)
+        codec = self._codec(player_id)
+        hand = self._hand(player)
+        hand_key = JSON_CODEC.encode(hand)
+        message = self._room_state_message(
+            codec, room, self._public_room_encoded(room, codec), player_id,
+            hand_key if codec is JSON_CODEC else codec.encode(hand)
+        )
+        self.send_encoded(player_id, message, "room_state")
+        self.synced[player_id] = (room.id, room.version, hand_key)
+    
+    def _public_room_encoded(self, room: RoomState, codec) -> Payload:
+        """Estado público da versão atual no codec dado (o JSON fica cacheado na sala)"""
+        encoded = self.public_room_json(room)
+        return encoded if codec is JSON_CODEC else codec.encode(room.public_json[2])
+    
+    def public_room_json(self, room: RoomState) -> str:
+        """
+        JSON do estado público da sala na versão atual (cacheado na própria sala)
+        
+        Também é a resposta do GET /rooms/{room_id}.
+        """
+        cached = room.public_json
+        if cached is not None and cached[0] == room.version:
+            return cached[1]
+        
+        state = self._create_public_room_state(room).model_dump(mode="json")
+        encoded = JSON_CODEC.encode(state)
+        room.public_json = (room.version, encoded, state)
+        return encoded
     
     def _create_public_room_state(self, room: RoomState ) -> PublicRoomState:
         """Cria uma versão pública da sala sem revelar informações privadas"""
@@ -89,6 +417,7 @@ class ConnectionManager:
             )
             public_players.append(public_player)
         
+        discard_top = room.deck.top_discard()
         return PublicRoomState(
             id=room.id,
             players=public_players,
@@ -101,67 +430,68 @@ class ConnectionManager:
             round_limit=room.round_limit,
             pending_effect=room.pending_effect,
             deck_count=len(room.deck),
-            discard_top=room.discard_pile[-1] if room.discard_pile else None,
+            discard_top=CardComp.from_code(discard_top) if discard_top is not None else None,
             turn_order=room.turn_order
         )
     
-    async def handle_message(self, websocket: WebSocket, message: str):
-        """Processa mensagens recebidas dos clientes"""
+    async def handle_message(self, websocket: WebSocket, message: Payload):
+        """
+        Processa mensagens recebidas dos clientes (no codec negociado pela conexão)
+        
+        A mensagem é lida e validada de uma vez pela união discriminada das
+        ações (models.client_action_adapter) e vai para o handler da tabela
+        de despacho.
+        """
+        codec = self._codec(self.player_connections.get(websocket))
         try:
-            data = json.loads(message)
-            action = data.get("action")
+            if codec is JSON_CODEC:
+                action = client_action_adapter.validate_json(message)
+            else:
+                action = client_action_adapter.validate_python(codec.decode(message))
             
             if websocket not in self.player_connections:
-                await websocket.send_text(json.dumps({
+                await self.send_to_socket(websocket, {
                     "event": "error",
                     "code": "NOT_CONNECTED",
                     "message": "Player not connected"
-                }))
+                })
                 return
             
-            player_id = self.player_connections[websocket]
-            
-            if action == "create_room":
-                await self._handle_create_room(player_id, data)
-            elif action == "join_room":
-                await self._handle_join_room(player_id, data)
-            elif action == "start_game":
-                await self._handle_start_game(player_id, data)
-            elif action == "play_card":
-                await self._handle_play_card(player_id, data)
-            elif action == "play_special":
-                await self._handle_play_special(player_id, data)
-            elif action == "pass_turn":
-                await self._handle_pass_turn(player_id, data)
-            elif action == "chat":
-                await self._handle_chat(player_id, data)
-            elif action == "add_bot":
-                await self._handle_add_bot(player_id, data)
-            else:
-                await self.send_personal_message(player_id, {
-                    "event": "error",
-                    "code": "UNKNOWN_ACTION",
-                    "message": f"Unknown action: {action}"
-                })
+            handler, _ = self.handlers[action.action]
+            await handler(self.player_connections[websocket], action)
         
-        except json.JSONDecodeError:
-            await websocket.send_text(json.dumps({
+        except ValidationError as e:
+            await self.send_to_socket(websocket, self._validation_error(e))
+        except ValueError:  # Mensagem binária inválida
+            await self.send_to_socket(websocket, {
                 "event": "error",
-                "code": "INVALID_JSON",
-                "message": "Invalid JSON format"
-            }))
+                "code": "INVALID_MESSAGE",
+                "message": "Invalid message format"
+            })
         except Exception as e:
             logger.error(f"Error handling message: {e}")
-            await websocket.send_text(json.dumps({
+            await self.send_to_socket(websocket, {
                 "event": "error",
                 "code": "INTERNAL_ERROR",
                 "message": "Internal server error"
-            }))
+            })
     
-    async def _handle_create_room(self, player_id: str, data: dict):
+    def _validation_error(self, error: ValidationError) -> dict:
+        """Evento de erro para uma mensagem que não passou na validação"""
+        first = error.errors()[0]
+        if first["type"] == "json_invalid":
+            return {"event": "error", "code": "INVALID_JSON", "message": "Invalid JSON format"}
+        if first["type"] in ("union_tag_invalid", "union_tag_not_found"):
+            return {"event": "error", "code": "UNKNOWN_ACTION", "message": f"Unknown action: {first['input'].get('action')}"}
+        if not first["loc"]:  # Não é um objeto (ex.: lista ou texto)
+            return {"event": "error", "code": "INVALID_MESSAGE", "message": "Invalid message format"}
+        # Campos inválidos de uma ação conhecida: o primeiro item do loc é a ação
+        _, error_code = self.handlers[first["loc"][0]]
+        return {"event": "error", "code": error_code, "message": str(error)}
+    
+    async def _handle_create_room(self, player_id: str, action: CreateRoomAction):
         """Cria uma nova sala"""
         try:
-            action = CreateRoomAction(**data)
             # O room_manager.create_room já deve lidar com a criação do host_id e player_id
             # e associá-los corretamente. Não precisamos reatribuir aqui.
             room = room_manager.create_room(action.nickname, action.max_players, player_id) # Passa o player_id do WebSocket
@@ -176,11 +506,10 @@ class ConnectionManager:
             })
 
     
-    async def _handle_join_room(self, player_id: str, data: dict):
+    async def _handle_join_room(self, player_id: str, action: JoinRoomAction):
         """Entra em uma sala existente"""
         try:
-            action = JoinRoomAction(**data)
-            player = room_manager.join_room(action.room_id, action.nickname)
+            player = room_manager.join_room(action.room_id, action.nickname, player_id)
             
             if not player:
                 await self.send_personal_message(player_id, {
@@ -190,10 +519,6 @@ class ConnectionManager:
                 })
                 return
             
-            # Atualiza o player_id
-            player.id = player_id
-            room_manager.player_to_room[player_id] = action.room_id
-            
             await self.broadcast_room_state(action.room_id)
             
         except Exception as e:
@@ -203,10 +528,9 @@ class ConnectionManager:
                 "message": str(e)
             })
     
-    async def _handle_start_game(self, player_id: str, data: dict):
+    async def _handle_start_game(self, player_id: str, action: StartGameAction):
         """Inicia o jogo"""
         try:
-            action = StartGameAction(**data)
             room = room_manager.get_room(action.room_id)
             
             if not room:
@@ -235,19 +559,16 @@ class ConnectionManager:
             
             # Inicia o jogo
             self.game_engine.start_game(room)
-            await self.broadcast_room_state(room.id)
+            room_manager.persist(room)
             
-            # Envia evento de início de rodada
-            await self.broadcast_to_room(room.id, {
-                "event": "round_started",
-                "limit": room.round_limit
-            })
+            # Início da rodada, vez do primeiro jogador e estado num só frame
+            self._queue_events(room, [
+                {"event": "round_started", "limit": room.round_limit},
+                {"event": "turn_changed", "player_id": room.current_turn}
+            ])
             
-            # Envia evento de mudança de turno
-            await self.broadcast_to_room(room.id, {
-                "event": "turn_changed",
-                "player_id": room.current_turn
-            })
+            # O primeiro jogador pode ser um bot
+            self._ensure_turn_driver(room)
             
         except Exception as e:
             await self.send_personal_message(player_id, {
@@ -256,10 +577,9 @@ class ConnectionManager:
                 "message": str(e)
             })
     
-    async def _handle_play_card(self, player_id: str, data: dict):
+    async def _handle_play_card(self, player_id: str, action: PlayCardAction):
         """Joga uma carta"""
         try:
-            action = PlayCardAction(**data)
             room = room_manager.get_room(action.room_id)
             
             if not room:
@@ -288,10 +608,9 @@ class ConnectionManager:
                 "message": str(e)
             })
     
-    async def _handle_play_special(self, player_id: str, data: dict):
+    async def _handle_play_special(self, player_id: str, action: PlaySpecialAction):
         """Joga uma carta especial"""
         try:
-            action = PlaySpecialAction(**data)
             room = room_manager.get_room(action.room_id)
             
             if not room:
@@ -320,10 +639,9 @@ class ConnectionManager:
                 "message": str(e)
             })
     
-    async def _handle_pass_turn(self, player_id: str, data: dict):
+    async def _handle_pass_turn(self, player_id: str, action: PassTurnAction):
         """Passa o turno (força punição)"""
         try:
-            action = PassTurnAction(**data)
             room = room_manager.get_room(action.room_id)
             
             if not room:
@@ -352,10 +670,9 @@ class ConnectionManager:
                 "message": str(e)
             })
     
-    async def _handle_chat(self, player_id: str, data: dict):
+    async def _handle_chat(self, player_id: str, action: ChatAction):
         """Envia mensagem de chat"""
         try:
-            action = ChatAction(**data)
             room = room_manager.get_room(action.room_id)
             
             if not room:
@@ -366,7 +683,7 @@ class ConnectionManager:
                 })
                 return
             
-            player = next((p for p in room.players if p.id == player_id), None)
+            player = GameStateManager.get_player_by_id(room, player_id)
             if not player:
                 return
             
@@ -384,10 +701,9 @@ class ConnectionManager:
                 "message": str(e)
             })
     
-    async def _handle_add_bot(self, player_id: str, data: dict):
+    async def _handle_add_bot(self, player_id: str, action: AddBotAction):
         """Adiciona um bot à sala"""
         try:
-            action = AddBotAction(**data)
             room = room_manager.get_room(action.room_id)
             
             if not room:
@@ -408,6 +724,7 @@ class ConnectionManager:
             
             bot = self.bot_manager.add_bot_to_room(room, action.difficulty)
             if bot:
+                room_manager.persist(room)
                 await self.broadcast_room_state(room.id)
             else:
                 await self.send_personal_message(player_id, {
@@ -423,39 +740,91 @@ class ConnectionManager:
                 "message": str(e)
             })
     
+    async def _handle_resync(self, player_id: str, action: ResyncAction):
+        """Reenvia o estado completo (o cliente detectou um buraco nas versões)"""
+        try:
+            room = room_manager.get_room(action.room_id)
+            
+            if not room or room_manager.player_to_room.get(player_id) != room.id:
+                await self.send_personal_message(player_id, {
+                    "event": "error",
+                    "code": "ROOM_NOT_FOUND",
+                    "message": "Room not found"
+                })
+                return
+            
+            self.send_full_state(room, player_id)
+            
+        except Exception as e:
+            await self.send_personal_message(player_id, {
+                "event": "error",
+                "code": "RESYNC_ERROR",
+                "message": str(e)
+            })
+    
     async def _handle_game_events(self, room: RoomState , events: list):
         """Processa eventos do jogo e os envia para os clientes"""
-        for event in events:
-            await self.broadcast_to_room(room.id, event)
-        
-        # Sempre envia o estado atualizado da sala
-        await self.broadcast_room_state(room.id)
-        
-        # Processa turnos de bots
-        if room.current_turn and room.game_started:
-            current_player = next((p for p in room.players if p.id == room.current_turn), None)
-            if current_player and current_player.is_bot:
-                await self._process_bot_turn(room, current_player)
-    
-    async def _process_bot_turn(self, room: RoomState , bot_player: PlayerState):
-        """Processa o turno de um bot"""
-        await asyncio.sleep(1)  # Pequeno delay para simular "pensamento"
-        
-        action = self.bot_manager.get_bot_action(room, bot_player)
-        if action:
-            if action["type"] == "play_card":
-                result = self.game_engine.play_card(
-                    room, bot_player.id, action["card_id"], action.get("as_value")
-                )
-            elif action["type"] == "play_special":
-                result = self.game_engine.play_special(
-                    room, bot_player.id, action["card_id"], action["special_type"]
-                )
-            elif action["type"] == "pass_turn":
-                result = self.game_engine.force_penalty(room, bot_player.id)
-            
-            if result["success"]:
-                await self._handle_game_events(room, result["events"])
+        # Grava a ação no log da sala (group commit: não espera o disco)
+        room_manager.record_action(room, events)
+        
+        # Eventos e novo estado saem no próximo tick da sala (um frame por jogador)
+        self._queue_events(room, events)
+        
+        # Turnos de bots ficam com o driver da sala; o handler retorna já
+        self._ensure_turn_driver(room)
+    
+    def _ensure_turn_driver(self, room: RoomState):
+        """Inicia o driver de turnos da sala se a vez for de um bot"""
+        if self._current_bot(room):
+            self.bot_scheduler.ensure_driver(room.id, lambda: self._process_bot_turn(room.id))
+    
+    def _current_bot(self, room: RoomState) -> Optional[PlayerState]:
+        """Retorna o bot da vez, ou None se a vez é de um humano (ou o jogo acabou)"""
+        if not room.game_started or not room.current_turn:
+            return None
+        if GameStateManager.check_game_over(room):
+            return None
+        current_player = GameStateManager.get_player_by_id(room, room.current_turn)
+        if current_player and current_player.is_bot:
+            return current_player
+        return None
+    
+    async def _process_bot_turn(self, room_id: str) -> bool:
+        """
+        Processa um turno de bot (um passo do driver de turnos da sala)
+        
+        Returns:
+            True se, após a jogada, a vez for de outro bot
+        """
+        room = room_manager.get_room(room_id)
+        bot_player = self._current_bot(room) if room else None
+        if not bot_player:
+            return False
+        
+        # "Pensamento" do bot: wakeup agendado no loop, sem bloquear outras salas
+        delay = self.bot_manager.get_think_delay(bot_player)
+        if not await self.bot_scheduler.wait(room.id, delay):
+            return False
+        
+        # O estado pode ter mudado enquanto o bot "pensava"
+        if room_manager.get_room(room.id) is not room or room.current_turn != bot_player.id:
+            return self._current_bot(room) is not None
+        
+        # Estratégias caras decidem num pool, com prazo: o loop segue atendendo as outras salas
+        action = await self.bot_executor.decide(room, bot_player)
+        if room_manager.get_room(room.id) is not room or room.current_turn != bot_player.id:
+            return self._current_bot(room) is not None
+        if not action:
+            return False
+        
+        result = self.game_engine.apply_action(room, bot_player.id, action)
+        
+        if not result["success"]:
+            logger.warning(f"Bot {bot_player.id} action rejected: {result['error']}")
+            return False
+        
+        await self._handle_game_events(room, result["events"])
+        return self._current_bot(room) is not None
 
 # Instância global do gerenciador de conexões
 manager = ConnectionManager()
@@ -0,0 +1,107 @@
+import sys
+import os
+
+import pytest
+
+# Adiciona o diretório pai ao path para importar os módulos
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+np = pytest.importorskip("numpy")
+
+from app.cards import FACE_COUNT, card_face
+from app.engine.batch import (
+    ACTION_PASS, DIFFICULTY_POLICIES, PEND_ADD, PEND_MUL, PEND_NONE,
+    BatchEngine, BatchState, run_batch_simulation, strategy_params
+)
+from app.engine.bots import BotManager
+from app.engine.rules import GameEngine
+from app.engine.state import GameStateManager
+from app.sim import create_sim_room
+
+def action_face(player, action) -> int:
+    """Ação de um bot no formato do BatchEngine (face jogada ou ACTION_PASS)"""
+    if action["type"] == "pass_turn":
+        return ACTION_PASS
+    return card_face(player.hand.get(int(action["card_id"])))
+
+class TestBatchEngine:
+    """Testes para a engine vetorizada"""
+
+    @pytest.mark.parametrize("params", [{}, {"MID": {"reset_threshold": 0.4, "danger_threshold": 0.5}}])
+    def test_matches_game_engine_step_by_step(self, params):
+        """Greedy/Defensive vetorizados reproduzem GameEngine turno a turno (também com limiares ajustados)"""
+        difficulties = ["MID", "HIGH", "MID", "HIGH"]
+        engine = GameEngine()
+        strategies = BotManager(params).strategies
+
+        rooms = []
+        for index in range(16):
+            room = create_sim_room(difficulties, f"diff-{index}")
+            engine.start_game(room, seed=index)
+            # Sem embaralhar o descarte: o monte fica determinístico nos dois lados
+            room.deck.shuffle = lambda cards: None
+            rooms.append(room)
+
+        state = BatchState.from_rooms(rooms)
+        batch = BatchEngine([DIFFICULTY_POLICIES[d] for d in difficulties], shuffle_refill=False,
+                            params=[strategy_params(strategies[d]) for d in difficulties])
+
+        for _ in range(2000):
+            if state.done.all():
+                break
+
+            expected = np.full(len(rooms), -1)
+            for g, room in enumerate(rooms):
+                if GameStateManager.check_game_over(room):
+                    continue
+                player = GameStateManager.get_player_by_id(room, room.current_turn)
+                seat = room.players.index(player)
+                action = strategies[difficulties[seat]].choose_action(room, player, engine)
+                expected[g] = action_face(player, action)
+                assert engine.apply_action(room, player.id, action)["success"]
+
+            # A rolagem do D20 vem do GameEngine (usada onde a rodada reiniciou)
+            rolls = np.array([room.round_limit for room in rooms])
+            applied = batch.step(state, rolls)
+
+            assert applied.tolist() == expected.tolist()
+            for g, room in enumerate(rooms):
+                seat_of = {p.id: seat for seat, p in enumerate(room.players)}
+                pending = room.pending_effect
+                kind = PEND_NONE if not pending else (PEND_MUL if pending.multiplier else PEND_ADD)
+
+                assert state.total[g] == room.accumulated_sum
+                assert state.limit[g] == room.round_limit
+                assert state.pend_kind[g] == kind
+                assert state.clockwise[g] == room.direction
+                assert state.done[g] == (GameStateManager.check_game_over(room) is not None)
+                if not state.done[g]:
+                    assert state.cur[g] == seat_of[room.current_turn]
+                assert state.deck_len[g] - state.cursor[g] == len(room.deck)
+                assert state.discard[g, state.discard_len[g] - 1] == card_face(room.deck.top_discard())
+                for seat, player in enumerate(room.players):
+                    assert state.tokens[g, seat] == max(player.tokens, 0)
+                    assert state.active[g, seat] == (not player.is_eliminated)
+                    assert state.hands[g, seat].tolist() == [player.hand.count(f) for f in range(FACE_COUNT)]
+
+        assert state.done.all()
+
+    def test_new_games_deal(self):
+        """Cada partida começa com 7 cartas por assento e o monte restante"""
+        state = BatchState.new_games(50, 3, np.random.default_rng(0))
+
+        assert (state.hands.sum(axis=2) == 7).all()
+        assert (state.deck_len - state.cursor == 90 - 21).all()
+        assert ((state.limit >= 1) & (state.limit <= 20)).all()
+        assert (np.sort(state.order, axis=1) == np.arange(3)).all()
+
+    def test_run_batch_simulation_report(self):
+        """O relatório tem o mesmo formato do simulador sequencial"""
+        report = run_batch_simulation(300, ["LOW", "MID", "HIGH"], seed=2, chunk_size=128)
+
+        assert report["games"] == 300
+        assert report["unfinished"] == 0
+        assert abs(sum(report["win_rate"].values()) - 1) < 1e-3
+        assert sum(report["penalties"]["histogram"].values()) == 300
+        assert report == {**run_batch_simulation(300, ["LOW", "MID", "HIGH"], seed=2, chunk_size=128),
+                          "elapsed_sec": report["elapsed_sec"], "games_per_sec": report["games_per_sec"]}
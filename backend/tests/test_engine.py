@@ -1,15 +1,27 @@
 import pytest
+import random
 import sys
 import os
 
 # Adiciona o diretório pai ao path para importar os módulos
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 
+from app.cards import (
+    Deck, Hand, FACE_JOKER, FACE_PLUS2, FACE_RESET0, FACE_REVERSE, FULL_DECK,
+    card_to_dict, card_uid, card_value, encode_card, with_joker_value
+)
 from app.models import RoomState, PlayerState, CardComp, CardKind, PendingEffect
 from app.engine.deck import DeckManager
 from app.engine.state import GameStateManager
-from app.engine.rules import GameEngine
-from app.engine.bots import BotManager
+from app.engine.rules import GameEngine, Move, PASS_MOVE, MoveUndo
+from app.engine.bots import BotManager, MCTSBotStrategy, PolicyBotStrategy, GreedyBotStrategy
+from app.engine.decision_cache import DecisionCache
+from app.engine.mcts import Observation
+from app.engine.policy import (
+    ACTION_PASS, HAND_STATES, ROUND_STATES, PolicyTable, abstract_hand, hand_index, round_index, write_table
+)
+from app.engine.replay import ReplayError, export_record, replay, state_digest
+from app.sim import create_sim_room
 
 class TestDeckManager:
     """Testes para o gerenciador de baralho"""
@@ -49,24 +61,66 @@ class TestDeckManager:
         
         # Cartas diferentes (muito provável com 90 cartas)
         # Verifica se pelo menos algumas posições mudaram
-        different_positions = sum(1 for i in range(len(deck1)) if deck1[i].id != deck2[i].id)
+        different_positions = sum(1 for i in range(len(deck1)) if deck1[i] != deck2[i])
         assert different_positions > 10  # Pelo menos 10 posições diferentes
     
     def test_draw_cards(self):
         """Testa a retirada de cartas do baralho"""
-        deck = DeckManager.create_deck()
+        deck = DeckManager.create_and_shuffle_deck()
         original_size = len(deck)
+        top_cards = list(deck)[:7]
         
         # Retira 7 cartas
-        drawn, remaining = DeckManager.draw_cards(deck, 7)
+        drawn = DeckManager.draw_cards(deck, 7)
+        
+        assert drawn == top_cards
+        assert len(deck) == original_size - 7
+        
+        # Testa retirada de mais cartas do que disponível (descarte vazio)
+        remaining = len(deck)
+        drawn_all = DeckManager.draw_cards(deck, 100)
+        assert len(drawn_all) == remaining
+        assert len(deck) == 0
+    
+    def test_draw_reshuffles_discard_except_top(self):
+        """Quando o monte acaba, o descarte (menos o topo) volta ao monte"""
+        cards = DeckManager.create_deck()
+        deck = Deck(cards[:5], discard_pile=cards[5:15])
+        top = deck.top_discard()
+        
+        drawn = deck.draw(8)
+        
+        # 5 cartas do monte primeiro, depois 3 do descarte reembaralhado
+        assert drawn[:5] == cards[:5]
+        assert all(card in cards[5:14] for card in drawn[5:])
+        assert len(deck) == 6
+        assert deck.discard_pile == [top]
+    
+    def test_deal_to_players(self):
+        """Distribui a mesma quantidade para cada mão"""
+        deck = DeckManager.create_and_shuffle_deck()
+        hands = [[], [], []]
         
-        assert len(drawn) == 7
-        assert len(remaining) == original_size - 7
+        deck.deal(hands, 7)
         
-        # Testa retirada de mais cartas do que disponível
-        drawn_all, remaining_empty = DeckManager.draw_cards(remaining, 100)
-        assert len(drawn_all) == len(remaining)
-        assert len(remaining_empty) == 0
+        assert [len(hand) for hand in hands] == [7, 7, 7]
+        assert len(deck) == 90 - 21
+        assert len({card_uid(card) for hand in hands for card in hand}) == 21
+    
+    def test_card_encoding(self):
+        """Cartas são ints compactos com id sequencial, face e valor do Joker"""
+        assert sorted(card_uid(card) for card in FULL_DECK) == list(range(1, 91))
+        
+        seven = encode_card(12, 7)
+        assert card_value(seven) == 7
+        assert card_to_dict(seven) == {"id": "12", "kind": "number", "value": 7}
+        
+        joker = encode_card(88, FACE_JOKER)
+        assert card_value(joker) is None
+        played = with_joker_value(joker, 0)
+        assert card_value(played) == 0
+        assert card_uid(played) == 88
+        assert CardComp.from_code(played) == CardComp(id="88", kind=CardKind.JOKER, value=0)
 
 class TestGameStateManager:
     """Testes para o gerenciador de estado do jogo"""
@@ -163,6 +217,56 @@ class TestGameStateManager:
         assert eliminated
         assert player.is_eliminated
 
+    def test_turn_ring_follows_direction(self):
+        """O anel de turnos avança nos dois sentidos e pula eliminados"""
+        room = self.create_test_room()
+        GameStateManager.initialize_turn_order(room)
+        room.turn_order = ["player1", "player2", "player3"]
+        GameStateManager.registry(room).build_ring(room.turn_order)
+        room.current_turn = "player1"
+        
+        assert GameStateManager.advance_turn(room) == "player2"
+        room.direction = False
+        assert GameStateManager.advance_turn(room) == "player1"
+        assert GameStateManager.advance_turn(room) == "player3"
+        
+        GameStateManager.eliminate_player(room, "player2")
+        assert GameStateManager.advance_turn(room) == "player1"
+        assert GameStateManager.advance_turn(room) == "player3"
+    
+    def test_eliminating_current_player_passes_turn(self):
+        """Eliminar o jogador da vez passa a vez adiante e atualiza a contagem"""
+        room = self.create_test_room()
+        GameStateManager.initialize_turn_order(room)
+        current = room.current_turn
+        expected_next = GameStateManager.get_next_player_id(room)
+        
+        player = GameStateManager.get_player_by_id(room, current)
+        player.tokens = 1
+        assert GameStateManager.apply_penalty(room, current)
+        
+        assert room.current_turn == expected_next
+        assert current not in room.turn_order
+        assert GameStateManager.get_active_count(room) == 2
+        assert GameStateManager.check_game_over(room) is None
+        
+        GameStateManager.eliminate_player(room, room.current_turn)
+        assert GameStateManager.check_game_over(room) == room.current_turn
+    
+    def test_add_and_remove_player_keep_index(self):
+        """Entradas e saídas de jogadores mantêm o índice por ID"""
+        room = self.create_test_room()
+        GameStateManager.add_player(room, PlayerState(id="player4", nickname="Dave"))
+        
+        assert GameStateManager.get_player_by_id(room, "player4").nickname == "Dave"
+        assert GameStateManager.get_active_count(room) == 4
+        
+        GameStateManager.remove_player(room, "player2")
+        
+        assert GameStateManager.get_player_by_id(room, "player2") is None
+        assert [p.id for p in room.players] == ["player1", "player3", "player4"]
+        assert GameStateManager.get_active_count(room) == 3
+
 class TestGameEngine:
     """Testes para o engine principal do jogo"""
     
@@ -250,11 +354,11 @@ class TestGameEngine:
         
         # Adiciona uma carta de valor 5 na mão do jogador atual
         current_player = next(p for p in room.players if p.id == room.current_turn)
-        test_card = CardComp(kind=CardKind.NUMBER, value=5)
+        test_card = encode_card(99, 5)
         current_player.hand.append(test_card)
         
         # Joga a carta
-        result = engine.play_card(room, room.current_turn, test_card.id)
+        result = engine.play_card(room, room.current_turn, str(card_uid(test_card)))
         
         # Verifica se foi bem-sucedido
         assert result["success"]
@@ -295,6 +399,385 @@ class TestGameEngine:
         assert "round_reset" in event_types
         assert "round_started" in event_types
 
+class TestHand:
+    """Testes para a mão indexada por id e por face"""
+    
+    def test_index_and_counters(self):
+        """Busca, remoção e contagens por face em O(1)"""
+        hand = Hand([encode_card(1, 7), encode_card(2, 3), encode_card(3, 7), encode_card(4, FACE_RESET0)])
+        
+        assert len(hand) == 4
+        assert hand.count(7) == 2
+        assert hand.has(FACE_RESET0)
+        assert hand.lowest_number() == 3
+        assert hand.lowest_number(2) is None
+        assert hand.highest_number(6) == 3
+        assert hand.first(7) == encode_card(3, 7)
+        
+        assert hand.remove(1) == encode_card(1, 7)
+        assert hand.remove(1) is None
+        assert hand.count(7) == 1
+        assert hand.first(7) == encode_card(3, 7)
+        assert list(hand) == [encode_card(2, 3), encode_card(3, 7), encode_card(4, FACE_RESET0)]
+        
+        # Tirar o topo e devolver com append volta ao mesmo estado
+        top = hand.first(7)
+        hand.remove(3)
+        hand.append(top)
+        assert hand.first(7) == top and hand.count(7) == 1
+    
+    def test_legal_moves_one_per_face(self):
+        """Jogadas válidas são agrupadas por face e respeitam o limite"""
+        players = [PlayerState(id="player1", nickname="Alice"), PlayerState(id="player2", nickname="Bob")]
+        room = RoomState(id="test_room", players=players, host_id="player1")
+        engine = GameEngine()
+        engine.start_game(room)
+        
+        player = GameStateManager.get_player_by_id(room, room.current_turn)
+        player.hand = Hand([
+            encode_card(1, 2), encode_card(2, 2), encode_card(3, 8),
+            encode_card(4, FACE_JOKER), encode_card(5, FACE_PLUS2)
+        ])
+        room.round_limit = 10
+        room.accumulated_sum = 5
+        
+        moves = engine.legal_moves(room, player.id)
+        
+        assert moves == [
+            Move("play_card", 2, 2),
+            Move("play_card", FACE_JOKER, 0),
+            Move("play_special", FACE_PLUS2)
+        ]
+        assert engine.lowest_playable_number(room, player.hand) == 2
+        assert engine.has_legal_play(room, player.hand)
+        
+        plays = engine.get_valid_plays(room, player.id)
+        assert plays[0] == {"type": "play_card", "card_id": 2, "card_kind": "number", "card_value": 2}
+        assert plays[1]["as_value"] == 0
+        
+        # Sem cartas jogáveis, só resta passar o turno
+        player.hand = Hand([encode_card(3, 8)])
+        assert not engine.has_legal_play(room, player.hand)
+        assert engine.legal_moves(room, player.id) == [PASS_MOVE]
+
+class TestReplay:
+    """Testes para a semente por sala e o replay determinístico"""
+    
+    def play_bots(self, seed: int, turns: int = 40) -> RoomState:
+        """Joga alguns turnos de uma sala só com bots"""
+        engine = GameEngine()
+        strategies = BotManager().strategies
+        room = create_sim_room(["LOW", "MID", "HIGH"], "replay_room")
+        engine.start_game(room, seed)
+        
+        for _ in range(turns):
+            if GameStateManager.check_game_over(room):
+                break
+            player = GameStateManager.get_player_by_id(room, room.current_turn)
+            difficulty = player.nickname.split()[1]
+            action = strategies[difficulty].choose_action(room, player, engine)
+            assert engine.apply_action(room, player.id, action)["success"]
+        return room
+    
+    def test_same_seed_same_game(self):
+        """A mesma semente produz a mesma partida, independente do random global"""
+        random.seed(1)
+        first = self.play_bots(42)
+        random.seed(2)
+        second = self.play_bots(42)
+        
+        assert first.seed == 42
+        assert first.action_log == second.action_log
+        assert state_digest(first) == state_digest(second)
+        assert state_digest(self.play_bots(43)) != state_digest(first)
+    
+    def test_replay_reproduces_state(self):
+        """Semente + log de ações reconstroem a sala bit a bit"""
+        room = self.play_bots(7)
+        record = export_record(room)
+        
+        assert len(record["actions"]) == 40
+        assert state_digest(replay(record)) == state_digest(room)
+        
+        # Replay parcial: os primeiros turnos batem com uma partida mais curta
+        assert state_digest(replay(record, until=10)) == state_digest(self.play_bots(7, turns=10))
+    
+    def test_replay_with_mid_game_leaver(self):
+        """Quem sai no meio da partida fica no registro e a saída é reproduzida"""
+        engine = GameEngine()
+        strategies = BotManager().strategies
+        room = create_sim_room(["MID"] * 4, "leaver_room")
+        engine.start_game(room, 11)
+        
+        for turn in range(30):
+            if GameStateManager.check_game_over(room):
+                break
+            if turn == 6:
+                GameStateManager.remove_player(room, room.players[1].id)
+            player = GameStateManager.get_player_by_id(room, room.current_turn)
+            action = strategies["MID"].choose_action(room, player, engine)
+            assert engine.apply_action(room, player.id, action)["success"]
+        
+        record = export_record(room)
+        
+        assert len(record["players"]) == 4 and len(room.players) == 3
+        assert record["actions"][6]["type"] == "leave"
+        assert state_digest(replay(record)) == state_digest(room)
+    
+    def test_replay_rejects_mismatched_log(self):
+        """Um log que não corresponde à semente é detectado"""
+        record = export_record(self.play_bots(7))
+        record["seed"] = 8
+        
+        with pytest.raises(ReplayError):
+            replay(record)
+
+class TestMakeUnmake:
+    """Testes para as jogadas hipotéticas com desfazer (make_move/unmake_move)"""
+    
+    def test_make_matches_apply_and_unmake_restores(self):
+        """make_move segue as regras de apply_action e unmake_move volta ao estado anterior"""
+        engine = GameEngine()
+        chooser = random.Random(3)
+        live = create_sim_room(["LOW", "MID", "HIGH", "LOW"], "search")
+        mirror = create_sim_room(["LOW", "MID", "HIGH", "LOW"], "search")
+        engine.start_game(live, 21)
+        engine.start_game(mirror, 21)
+        
+        turns = 0
+        while not GameStateManager.check_game_over(live) and turns < 400:
+            player_id = live.current_turn
+            moves = engine.legal_moves(live, player_id)
+            before = state_digest(live)
+            rng_before = live.rng.getstate()
+            
+            # Todas as jogadas possíveis são aplicadas e desfeitas
+            for move in moves:
+                undo = engine.make_move(live, player_id, move)
+                assert isinstance(undo, MoveUndo)
+                engine.unmake_move(live, undo)
+                assert state_digest(live) == before
+                assert live.rng.getstate() == rng_before
+            
+            # A jogada escolhida fica, e bate com a versão com eventos (com o
+            # gerador da sala como acaso, o D20 e os reembaralhamentos coincidem)
+            move = chooser.choice(moves)
+            player = GameStateManager.get_player_by_id(mirror, player_id)
+            assert engine.apply_action(mirror, player_id, engine.move_to_action(player, move))["success"]
+            engine.make_move(live, player_id, move, live.rng)
+            assert state_digest(live) == state_digest(mirror)
+            turns += 1
+        
+        assert GameStateManager.check_game_over(live)
+    
+    def test_unmake_sequence(self):
+        """Várias jogadas encadeadas são desfeitas na ordem inversa"""
+        engine = GameEngine()
+        room = create_sim_room(["LOW", "MID", "HIGH"], "search")
+        engine.start_game(room, 4)
+        before = state_digest(room)
+        
+        undos = []
+        for _ in range(30):
+            if GameStateManager.check_game_over(room):
+                break
+            moves = engine.legal_moves(room, room.current_turn)
+            undos.append(engine.make_move(room, room.current_turn, moves[-1]))
+        for undo in reversed(undos):
+            engine.unmake_move(room, undo)
+        
+        assert state_digest(room) == before
+        assert GameStateManager.get_active_count(room) == 3
+
+class TestMCTSBot:
+    """Testes para o bot EXPERT (MCTS com mãos adversárias sorteadas)"""
+    
+    def test_expert_chooses_legal_move_without_touching_room(self):
+        """A busca devolve uma ação válida, reporta nós/s e não altera a sala"""
+        engine = GameEngine()
+        strategy = MCTSBotStrategy(time_budget=5, max_iterations=300)
+        room = create_sim_room(["EXPERT", "MID", "HIGH"], "mcts")
+        engine.start_game(room, 9)
+        
+        for _ in range(10):
+            if GameStateManager.check_game_over(room):
+                break
+            player = GameStateManager.get_player_by_id(room, room.current_turn)
+            before = state_digest(room)
+            action = strategy.choose_action(room, player, engine)
+            assert state_digest(room) == before
+            assert engine.apply_action(room, player.id, action)["success"]
+        
+        # Estatísticas vêm no resultado da busca (nada fica guardado na estratégia)
+        observation = Observation(room, GameStateManager.get_player_by_id(room, room.current_turn))
+        stats = strategy.search.search(observation, random.Random(1))
+        assert stats["iterations"] == 300
+        assert stats["nodes_per_sec"] > 0
+    
+    def test_plan_reads_room_only_once(self):
+        """A decisão planejada não depende da sala depois de plan_action"""
+        engine = GameEngine()
+        strategy = MCTSBotStrategy(time_budget=5, max_iterations=50)
+        room = create_sim_room(["EXPERT", "MID"], "mcts")
+        engine.start_game(room, 2)
+        player = GameStateManager.get_player_by_id(room, room.current_turn)
+        player.hand = Hand([encode_card(1, 2), encode_card(2, 5), encode_card(3, FACE_RESET0)])
+        room.accumulated_sum = 0
+        room.round_limit = 20
+        
+        decide = strategy.plan_action(room, player, engine)
+        room.deck.discard_pile.clear()
+        player.hand = Hand()
+        
+        decision = decide()
+        assert decision.action["card_id"] in (1, 2, 3)
+        assert decision.stats["iterations"] == 50
+    
+    def test_bot_manager_knows_expert(self):
+        """EXPERT é uma dificuldade reconhecida pelo nickname"""
+        bot_manager = BotManager()
+        room = RoomState(id="test_room", players=[PlayerState(id="player1", nickname="Alice")], host_id="player1")
+        bot = bot_manager.add_bot_to_room(room, "EXPERT")
+        
+        assert isinstance(bot_manager.get_strategy(bot), MCTSBotStrategy)
+        assert bot_manager.get_bot_count_by_difficulty(room)["EXPERT"] == 1
+
+class TestPolicyBot:
+    """Testes para o bot MASTER (tabela de política resolvida offline)"""
+    
+    def test_table_roundtrip(self, tmp_path):
+        """Os códigos gravados (dois por byte) voltam pela consulta mapeada em memória"""
+        path = str(tmp_path / "policy.bin")
+        codes = [(index * 7) % 12 for index in range(ROUND_STATES * HAND_STATES)]
+        write_table(path, codes, opponents=2)
+        
+        table = PolicyTable(path)
+        for room_left, limit, hand in ((1, 1, 0), (3, 20, 17), (20, 20, HAND_STATES - 1), (7, 12, 4096)):
+            assert table.lookup(room_left, limit, hand) == codes[round_index(room_left, limit) * HAND_STATES + hand]
+        assert table.opponents == 2
+        table.close()
+    
+    def test_abstract_hand(self):
+        """A mão real vira presença de números, pulos (0, Joker, +2, x2, Reverse) e =0"""
+        hand = Hand([
+            encode_card(1, 3), encode_card(2, 3), encode_card(3, 9), encode_card(4, 0),
+            encode_card(5, FACE_JOKER), encode_card(6, FACE_REVERSE), encode_card(7, FACE_PLUS2),
+            encode_card(8, FACE_RESET0)
+        ])
+        assert abstract_hand(hand) == hand_index((1 << 2) | (1 << 8), 3, 1)
+    
+    def test_master_plays_full_game(self):
+        """Com a tabela do repositório, o MASTER joga uma partida inteira só com ações válidas"""
+        engine = GameEngine()
+        strategies = BotManager().strategies
+        assert strategies["MASTER"].table.available()
+        room = create_sim_room(["MASTER", "MID", "HIGH"], "policy")
+        engine.start_game(room, 11)
+        
+        for _ in range(2000):
+            if GameStateManager.check_game_over(room):
+                break
+            player = GameStateManager.get_player_by_id(room, room.current_turn)
+            difficulty = player.nickname.split()[1]
+            action = strategies[difficulty].choose_action(room, player, engine)
+            assert engine.apply_action(room, player.id, action)["success"]
+        
+        assert GameStateManager.check_game_over(room)
+    
+    def test_missing_table_plays_as_greedy(self, tmp_path):
+        """Sem o arquivo da tabela, o MASTER decide como o Greedy"""
+        engine = GameEngine()
+        strategy = PolicyBotStrategy(PolicyTable(str(tmp_path / "missing.bin")))
+        room = create_sim_room(["MASTER", "MID"], "policy")
+        engine.start_game(room, 4)
+        player = GameStateManager.get_player_by_id(room, room.current_turn)
+        
+        expected = GreedyBotStrategy().choose_action(room, player, engine)
+        assert strategy.choose_action(room, player, engine) == expected
+    
+    def test_solver_policy_is_legal(self, tmp_path):
+        """Toda jogada da tabela resolvida é legal no estado abstrato"""
+        np = pytest.importorskip("numpy")
+        from app.engine.policy_solver import PolicySolver, estimate_opponent_model
+        
+        solver = PolicySolver(estimate_opponent_model(games=5), opponents=2)
+        policy = solver.solve(max_sweeps=3)["policy"]
+        assert policy.shape == (ROUND_STATES, HAND_STATES)
+        
+        room_left = solver.room_left[:, None]
+        for v in range(1, 10):
+            chosen = policy == v
+            assert np.all(solver.has_number[v][None, :] | ~chosen)
+            assert np.all((v <= room_left) | ~chosen)
+        
+        # Sem número que caiba, sem pulos e sem =0: só resta passar
+        stuck = hand_index(1 << 8, 0, 0)  # Só um 9
+        assert policy[round_index(3, 10), stuck] == ACTION_PASS
+        
+        path = str(tmp_path / "policy.bin")
+        write_table(path, policy.tobytes(), opponents=2)
+        assert PolicyTable(path).lookup(3, 10, stuck) == ACTION_PASS
+
+class TestDecisionCache:
+    """Testes para o cache de decisões dos bots"""
+    
+    def play(self, bot_manager, difficulties, seed):
+        engine = bot_manager.game_engine
+        room = create_sim_room(difficulties, f"cache-{seed}")
+        engine.start_game(room, seed)
+        for _ in range(5000):
+            if GameStateManager.check_game_over(room):
+                break
+            player = GameStateManager.get_player_by_id(room, room.current_turn)
+            assert engine.apply_action(room, player.id, bot_manager.get_bot_action(room, player))["success"]
+        return state_digest(room)
+    
+    def test_cached_games_match_uncached(self):
+        """Com o cache, as heurísticas jogam exatamente as mesmas partidas"""
+        cached = BotManager()
+        cached.decision_cache = DecisionCache()
+        uncached = BotManager()
+        uncached.decision_cache = DecisionCache(max_entries=0)
+        
+        for seed in range(5):
+            assert self.play(cached, ["MID", "HIGH", "MID"], seed) == self.play(uncached, ["MID", "HIGH", "MID"], seed)
+        
+        stats = cached.decision_cache.stats()
+        assert stats["hit_rate"] > 0.1
+        assert set(stats["by_difficulty"]) == {"MID", "HIGH"}
+        assert uncached.decision_cache.stats()["hits"] == 0
+    
+    def test_lru_and_ttl(self):
+        """Entradas saem pela menos usada e pela idade"""
+        engine = GameEngine()
+        bot = PlayerState(id="bot", nickname="Bot MID 1", hand=[encode_card(1, 3)], is_bot=True)
+        cache = DecisionCache(max_entries=2)
+        for key in ("a", "b", "c"):
+            cache.store("MID", key, bot, {"type": "play_card", "card_id": 1}, engine)
+        
+        assert cache.lookup("MID", "a", bot, engine) is None
+        assert cache.lookup("MID", "c", bot, engine) == {"type": "play_card", "card_id": 1}
+        assert cache.stats()["evictions"] == 1
+        
+        cache.ttl = -1
+        assert cache.lookup("MID", "c", bot, engine) is None
+        assert cache.stats()["expirations"] == 1
+    
+    def test_random_strategies_are_not_cached(self):
+        """LOW (sorteio) e MASTER (já O(1)) não usam o cache; EXPERT usa a informação inteira"""
+        strategies = BotManager().strategies
+        engine = GameEngine()
+        room = create_sim_room(["LOW", "EXPERT", "MASTER"], "cache")
+        engine.start_game(room, 1)
+        player = room.players[1]
+        
+        assert strategies["LOW"].decision_key(room, player) is None
+        assert strategies["MASTER"].decision_key(room, player) is None
+        key = strategies["EXPERT"].decision_key(room, player)
+        assert key == strategies["EXPERT"].decision_key(room, player)
+        room.deck.discard(room.deck.draw(1)[0])
+        assert strategies["EXPERT"].decision_key(room, player) != key
+
 class TestBotManager:
     """Testes para o gerenciador de bots"""
     
@@ -0,0 +1,834 @@
+import asyncio
+import json
+import time
+from concurrent.futures import ProcessPoolExecutor
+import sys
+import os
+
+import pytest
+
+# Adiciona o diretório pai ao path para importar os módulos
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from app.cards import FACE_PLUS2, encode_card
+from app.models import RoomState, PlayerState, PlaySpecialAction, ChatAction
+from app.engine.rules import GameEngine
+from app.engine.bots import BotManager, BotStrategy, MCTSBotStrategy
+from app.engine.decision_cache import DecisionCache
+from app.engine.state import GameStateManager
+from app.services.bot_scheduler import BotTurnScheduler
+from app.services.bot_executor import BotExecutor
+from app.services.room_manager import room_manager
+from app.services.room_store import RoomStore
+from app.services.outbox import ConnectionOutbox
+from app.services.room_sync import apply_patch
+from app.services.broadcast_ticker import BroadcastTicker
+from app.services.wire import CODECS, FIELD_CODES, JSON_CODEC, compact, expand, get_codec, negotiate
+from app.bench_wire import compare_codecs, record_traffic
+from app.bench_dispatch import compare_dispatch, make_messages
+from app.engine.replay import state_digest
+from app.sim import create_sim_room
+from app.ws import ConnectionManager
+
+class FakeWebSocket:
+    """WebSocket falso que apenas guarda as mensagens enviadas"""
+
+    def __init__(self):
+        self.sent = []
+
+    async def accept(self, subprotocol: str = None):
+        pass
+
+    async def send_text(self, message: str):
+        self.sent.append(message)
+
+    async def send_bytes(self, message: bytes):
+        self.sent.append(message)
+
+    async def close(self, code: int = 1000):
+        self.close_code = code
+
+class SlowWebSocket(FakeWebSocket):
+    """WebSocket de um cliente lento: cada envio demora `delay` segundos"""
+
+    def __init__(self, delay: float):
+        super().__init__()
+        self.delay = delay
+        self.close_code = None
+
+    async def send_text(self, message: str):
+        await asyncio.sleep(self.delay)
+        self.sent.append(message)
+
+def received_events(websocket: FakeWebSocket) -> list:
+    """Eventos recebidos pelo cliente, com os envelopes "batch" desempacotados"""
+    events = []
+    for message in map(json.loads, websocket.sent):
+        events.extend(message["events"] if message["event"] == "batch" else [message])
+    return events
+
+def create_connected_room(manager: ConnectionManager, bot_count: int = 3):
+    """Cria uma sala com um humano conectado e alguns bots"""
+    room = room_manager.create_room("Alice", 8, "human1")
+    for _ in range(bot_count):
+        manager.bot_manager.add_bot_to_room(room, "MID")
+
+    websocket = FakeWebSocket()
+    manager.active_connections["human1"] = websocket
+    manager.player_connections[websocket] = "human1"
+    return room, websocket
+
+class TestBotTurnScheduler:
+    """Testes para o agendador de turnos de bots"""
+
+    def test_get_bot_action_does_not_block(self):
+        """A decisão do bot deve ser imediata (sem time.sleep)"""
+        bot_manager = BotManager()
+        room = RoomState(id="test_room", players=[PlayerState(id="player1", nickname="Alice")], host_id="player1")
+        bot = bot_manager.add_bot_to_room(room, "MID")
+        GameEngine().start_game(room)
+        room.current_turn = bot.id
+
+        start = time.perf_counter()
+        action = bot_manager.get_bot_action(room, bot)
+
+        assert action is not None
+        assert time.perf_counter() - start < 0.5
+        assert 5 <= bot_manager.get_think_delay(bot) <= 10
+
+    def test_rooms_wait_side_by_side(self):
+        """Wakeups de salas diferentes correm em paralelo no mesmo loop"""
+        scheduler = BotTurnScheduler()
+
+        async def scenario():
+            start = time.perf_counter()
+            results = await asyncio.gather(*(scheduler.wait(f"room{i}", 0.1) for i in range(20)))
+            return results, time.perf_counter() - start
+
+        results, elapsed = asyncio.run(scenario())
+
+        assert all(results)
+        assert elapsed < 0.5  # 20 salas x 0.1s em série levariam 2s
+        assert scheduler.pending_count() == 0
+
+    def test_cancel_room(self):
+        """Cancelar uma sala libera o bot sem afetar as demais"""
+        scheduler = BotTurnScheduler()
+
+        async def scenario():
+            waiting = asyncio.ensure_future(scheduler.wait("room1", 10))
+            other = asyncio.ensure_future(scheduler.wait("room2", 0.01))
+            await asyncio.sleep(0)
+            scheduler.cancel("room1")
+            return await waiting, await other
+
+        assert asyncio.run(scenario()) == (False, True)
+
+class TestTurnDriver:
+    """Testes para o driver de turnos por sala"""
+
+    def test_human_handler_returns_before_bot_turns(self):
+        """O handler humano retorna logo; os bots jogam no driver da sala"""
+        manager = ConnectionManager()
+        manager.bot_manager.get_think_delay = lambda bot_player: 0
+        room, _ = create_connected_room(manager)
+        manager.game_engine.start_game(room)
+        room.current_turn = "human1"
+
+        human = next(p for p in room.players if p.id == "human1")
+        human.hand.append(encode_card(99, FACE_PLUS2))
+
+        async def scenario():
+            await manager._handle_play_special("human1", PlaySpecialAction(
+                room_id=room.id, card_id="99", type="plus2"
+            ))
+            # Nenhum bot jogou ainda: o driver roda em sua própria task
+            bot_turn = room.current_turn
+            driver = manager.bot_scheduler.drivers[room.id]
+            await asyncio.wait_for(driver, timeout=5)
+            return bot_turn
+
+        bot_turn = asyncio.run(scenario())
+
+        assert bot_turn != "human1"
+        assert room.id not in manager.bot_scheduler.drivers
+        assert room.current_turn == "human1" or manager._current_bot(room) is None
+        asyncio.run(room_manager.remove_room(room.id))
+
+def play_bot_turns(room: RoomState, engine: GameEngine, turns: int, store: RoomStore = None):
+    """Joga alguns turnos de uma sala só com bots, gravando as ações no store"""
+    strategies = BotManager().strategies
+    for _ in range(turns):
+        if GameStateManager.check_game_over(room):
+            return
+        player = GameStateManager.get_player_by_id(room, room.current_turn)
+        action = strategies[player.nickname.split()[1]].choose_action(room, player, engine)
+        result = engine.apply_action(room, player.id, action)
+        assert result["success"]
+        if store:
+            store.append(room, room.action_log[-1], result["events"])
+
+class TestRoomStore:
+    """Testes para o log de ações com snapshots"""
+
+    def test_recover_from_snapshot_and_tail(self, tmp_path):
+        """A sala volta do último snapshot + ações posteriores e segue idêntica"""
+        engine = GameEngine()
+        path = str(tmp_path / "rooms.db")
+        store = RoomStore(path, snapshot_every=10)
+
+        room = create_sim_room(["LOW", "MID", "HIGH"], "stored")
+        engine.start_game(room, seed=5)
+        store.snapshot(room)
+        play_bot_turns(room, engine, 25, store)
+        store.flush_sync()
+
+        recovered_store = RoomStore(path)
+        [recovered] = recovered_store.load_rooms(engine)
+
+        assert recovered_store.snapshot_seq["stored"] == 20
+        assert recovered.action_base == 20 and len(recovered.action_log) == 5
+        assert state_digest(recovered) == state_digest(room)
+
+        # Geradores restaurados: a partida continua igual nas duas cópias
+        play_bot_turns(room, engine, 30)
+        play_bot_turns(recovered, engine, 30)
+        assert state_digest(recovered) == state_digest(room)
+
+    def test_group_commit(self, tmp_path):
+        """Várias ações enfileiradas no mesmo turno do loop viram um só commit"""
+        store = RoomStore(str(tmp_path / "rooms.db"), flush_interval=0.01)
+        engine = GameEngine()
+        room = create_sim_room(["MID", "HIGH"], "grouped")
+        engine.start_game(room, seed=1)
+
+        async def scenario():
+            store.snapshot(room)
+            play_bot_turns(room, engine, 20, store)
+            # Nada foi gravado ainda: append não espera o disco
+            assert store.commits == 0
+            await store.close()
+
+        asyncio.run(scenario())
+
+        assert store.commits == 1
+        [recovered] = RoomStore(str(tmp_path / "rooms.db")).load_rooms(engine)
+        assert state_digest(recovered) == state_digest(room)
+
+    def test_snapshot_prunes_covered_actions(self, tmp_path):
+        """O snapshot apaga, na mesma transação, as ações que ele já cobre"""
+        engine = GameEngine()
+        store = RoomStore(str(tmp_path / "rooms.db"), snapshot_every=10)
+        room = create_sim_room(["LOW", "MID"], "pruned")
+        engine.start_game(room, seed=2)
+        store.snapshot(room)
+        play_bot_turns(room, engine, 25, store)
+        store.flush_sync()
+
+        seqs = [seq for (seq,) in store.conn.execute("SELECT seq FROM actions WHERE room_id = 'pruned'")]
+        assert seqs and min(seqs) > store.snapshot_seq["pruned"]
+
+    def test_sessions_survive_restart(self, tmp_path):
+        """Humanos das salas recuperadas voltam pelo token gravado; sem token, saem da sala"""
+        path = str(tmp_path / "rooms.db")
+        engine = GameEngine()
+        store = RoomStore(path)
+        room = create_sim_room(["MID", "MID"], "restarted")
+        for player_id in ("human1", "human2"):
+            GameStateManager.add_player(room, PlayerState(id=player_id, nickname=player_id, tokens=3, hand=[]))
+        engine.start_game(room, seed=4)
+        store.snapshot(room)
+        manager = ConnectionManager()
+        manager.sessions.store = store
+        token = manager.sessions.issue("human1")
+        store.flush_sync()
+
+        async def restart():
+            recovered_store = RoomStore(path)
+            recovered = room_manager.attach_store(recovered_store, engine)
+            restarted = ConnectionManager()
+            restarted.recover_sessions(recovered_store, recovered)
+            resumed = restarted.sessions.resume(token)
+            await room_manager.remove_room("restarted")
+            room_manager.store = None
+            return resumed, [p.id for p in recovered[0].players]
+
+        resumed, seated = asyncio.run(restart())
+
+        assert resumed == "human1"
+        assert "human1" in seated and "human2" not in seated
+
+class SlowStrategy(BotStrategy):
+    """Estratégia de teste que demora para decidir (numa thread)"""
+
+    execution = "thread"
+
+    def __init__(self, delay: float):
+        self.delay = delay
+
+    def plan_action(self, room, bot_player, game_engine):
+        def decide():
+            time.sleep(self.delay)
+            return {"type": "pass_turn"}
+        return decide
+
+def create_bot_game(difficulties, seed: int = 3):
+    """Sala só com bots, já iniciada, e o bot da vez"""
+    room = create_sim_room(difficulties, "executor")
+    GameEngine().start_game(room, seed)
+    return room, GameStateManager.get_player_by_id(room, room.current_turn)
+
+class TestBotExecutor:
+    """Testes para o executor de decisões de bots"""
+
+    def test_inline_strategy_records_latency(self):
+        """Estratégias baratas decidem no loop e entram nas métricas"""
+        executor = BotExecutor(BotManager())
+        room, bot = create_bot_game(["MID", "MID"])
+
+        action = asyncio.run(executor.decide(room, bot))
+
+        assert GameEngine().apply_action(room, bot.id, action)["success"]
+        stats = executor.stats()["MID"]
+        assert stats["decisions"] == 1
+        assert stats["queue_depth"] == 0
+        assert stats["latency_ms"]["p50"] is not None
+
+    def test_repeated_state_hits_decision_cache(self):
+        """A mesma situação decide pelo cache, sem consultar a estratégia"""
+        bot_manager = BotManager()
+        bot_manager.decision_cache = DecisionCache()
+        executor = BotExecutor(bot_manager)
+        room, bot = create_bot_game(["MID", "MID"])
+
+        first = asyncio.run(executor.decide(room, bot))
+        bot_manager.strategies["MID"] = SlowStrategy(1.0)  # Não pode ser chamada
+        bot_manager.strategies["MID"].decision_key = BotManager().strategies["MID"].decision_key
+        second = asyncio.run(executor.decide(room, bot))
+
+        assert first == second
+        assert executor.stats()["MID"]["cache_hits"] == 1
+        assert bot_manager.decision_cache.stats()["hit_rate"] == 0.5
+
+    def test_deadline_falls_back_to_greedy(self):
+        """Depois do prazo, o bot joga a escolha do Greedy"""
+        bot_manager = BotManager()
+        bot_manager.strategies["HIGH"] = SlowStrategy(1.0)
+        executor = BotExecutor(bot_manager, deadline=0.1)
+        room, bot = create_bot_game(["HIGH", "HIGH"])
+
+        async def scenario():
+            start = time.perf_counter()
+            action = await executor.decide(room, bot)
+            return action, time.perf_counter() - start
+
+        action, elapsed = asyncio.run(scenario())
+        executor.shutdown()
+
+        greedy = bot_manager.strategies["MID"].choose_action(room, bot, bot_manager.game_engine)
+        assert action == greedy
+        assert elapsed < 0.5
+        assert executor.stats()["HIGH"]["timeouts"] == 1
+
+    def test_process_pool_decision(self):
+        """A busca do EXPERT roda num processo separado"""
+        bot_manager = BotManager()
+        bot_manager.strategies["EXPERT"] = MCTSBotStrategy(time_budget=5, max_iterations=50)
+        bot_manager.decision_cache.clear()  # A busca precisa rodar (sem acerto de cache)
+        executor = BotExecutor(bot_manager, deadline=30, process_workers=1)
+        executor.start()
+        room, bot = create_bot_game(["EXPERT", "EXPERT"])
+
+        action = asyncio.run(executor.decide(room, bot))
+        pool = executor.pools["process"]
+        assert isinstance(pool, ProcessPoolExecutor)
+        # Processos sem fork: o servidor já tem threads quando o pool sobe
+        assert pool._mp_context.get_start_method() != "fork"
+        executor.shutdown()
+
+        assert GameEngine().apply_action(room, bot.id, action)["success"]
+        stats = executor.stats()["EXPERT"]
+        assert stats["timeouts"] == 0
+        # As métricas da busca voltam do processo junto com a ação
+        assert stats["search"]["searches"] == 1
+        assert stats["search"]["avg_iterations"] == 50
+        assert stats["search"]["avg_nodes_per_sec"] > 0
+
+class TestRoomStateBroadcast:
+    """Testes para o envio do estado da sala"""
+
+    def test_public_state_built_once_per_version(self):
+        """A parte pública é montada uma vez; só a mão e o id mudam por jogador"""
+        manager = ConnectionManager()
+        room, alice = create_connected_room(manager, bot_count=1)
+        room_manager.join_room(room.id, "Bob", "human2")
+        bob = FakeWebSocket()
+        manager.active_connections["human2"] = bob
+        manager.player_connections[bob] = "human2"
+        manager.game_engine.start_game(room)
+
+        builds = []
+        build = manager._create_public_room_state
+        manager._create_public_room_state = lambda r: builds.append(r.id) or build(r)
+
+        async def broadcast():
+            await manager.broadcast_room_state(room.id)
+            await manager.drain()
+
+        asyncio.run(broadcast())
+        first, second = json.loads(alice.sent[-1]), json.loads(bob.sent[-1])
+        cached = manager.public_room_json(room)  # O que o GET /rooms/{room_id} devolve
+
+        assert len(builds) == 1
+        assert first["room"] == second["room"] == json.loads(cached)
+        assert first["self_id"] == "human1" and second["self_id"] == "human2"
+        assert len(first["self_hand"]) == len(room.players[0].hand)
+        assert first["self_hand"] != second["self_hand"]
+
+        asyncio.run(broadcast())
+        assert len(builds) == 2  # Nova versão, novo estado
+        assert room.version == 2
+        asyncio.run(room_manager.remove_room(room.id))
+
+    def test_patches_follow_full_state(self):
+        """Depois do estado completo vão só patches; aplicados, reproduzem o estado"""
+        manager = ConnectionManager()
+        manager.bot_manager.get_think_delay = lambda bot_player: 0
+        room, websocket = create_connected_room(manager, bot_count=2)
+        manager.game_engine.start_game(room, 11)
+        human = next(p for p in room.players if p.id == "human1")
+
+        async def scenario():
+            await manager.broadcast_room_state(room.id)
+            await manager.drain()
+            for _ in range(6):
+                if room.current_turn == "human1":
+                    action = manager.bot_manager.strategies["MID"].choose_action(room, human, manager.game_engine)
+                    result = manager.game_engine.apply_action(room, "human1", action)
+                else:
+                    bot = GameStateManager.get_player_by_id(room, room.current_turn)
+                    result = manager.game_engine.apply_action(room, bot.id, manager.bot_manager.get_bot_action(room, bot))
+                await manager._handle_game_events(room, result["events"])
+                manager.bot_scheduler.stop(room.id)
+                await manager.drain()
+
+        asyncio.run(scenario())
+        messages = [e for e in received_events(websocket) if e["event"] in ("room_state", "room_patch")]
+
+        assert messages[0]["event"] == "room_state"
+        assert all(m["event"] == "room_patch" for m in messages[1:])
+        state, version, hand = messages[0]["room"], messages[0]["version"], messages[0]["self_hand"]
+        for patch in messages[1:]:
+            assert patch["base"] == version
+            state, version = apply_patch(state, patch), patch["version"]
+            hand = patch.get("self_hand", hand)
+
+        assert version == room.version
+        assert state == json.loads(manager.public_room_json(room))
+        assert len(hand) == len(human.hand)
+        # Um frame por ação: eventos da ação + patch
+        assert len(websocket.sent) == 7
+        assert all(json.loads(m)["events"][-1]["event"] == "room_patch" for m in websocket.sent[1:])
+        assert sum(map(len, websocket.sent[1:])) < len(websocket.sent[0]) * (len(websocket.sent) - 1)
+        asyncio.run(room_manager.remove_room(room.id))
+
+    def test_resync_sends_full_state(self):
+        """Um cliente fora de sincronia pede e recebe o estado completo"""
+        manager = ConnectionManager()
+        room, websocket = create_connected_room(manager, bot_count=1)
+
+        async def scenario():
+            for _ in range(2):
+                await manager.broadcast_room_state(room.id)
+                await manager.drain()
+            await manager.handle_message(websocket, json.dumps({"action": "resync", "room_id": room.id}))
+            await manager.drain()
+            # Estado completo na fila torna obsoletos os patches ainda não enviados
+            await manager.broadcast_room_state(room.id)
+            manager.broadcast_ticker.flush_all()
+            manager.send_full_state(room, "human1")
+            await manager.drain()
+
+        asyncio.run(scenario())
+        events = [json.loads(m) for m in websocket.sent]
+
+        assert [e["event"] for e in events] == ["room_state", "room_patch", "room_state", "room_state"]
+        assert events[1] == {"event": "room_patch", "room_id": room.id, "base": 1, "version": 2}
+        assert events[2]["version"] == 2
+        assert events[3]["version"] == 3
+        assert manager.outboxes["human1"].coalesced == 1
+        asyncio.run(room_manager.remove_room(room.id))
+
+    def test_full_state_flushes_pending_tick_first(self):
+        """Eventos ainda no tick da sala saem antes do estado completo que já os reflete"""
+        manager = ConnectionManager()
+        room, websocket = create_connected_room(manager, bot_count=1)
+
+        async def scenario():
+            await manager.broadcast_room_state(room.id)
+            await manager.drain()
+            manager._queue_events(room, [{"event": "turn_changed", "player_id": "human1"}])
+            pending = room.id in manager.broadcast_ticker.timers
+            await manager.handle_message(websocket, json.dumps({"action": "resync", "room_id": room.id}))
+            await manager.drain()
+            return pending
+
+        assert asyncio.run(scenario())
+        events = [json.loads(m) for m in websocket.sent]
+
+        assert room.id not in manager.broadcast_ticker.timers
+        assert [e["event"] for e in events] == ["room_state", "batch", "room_state"]
+        assert events[1]["events"][0] == {"event": "turn_changed", "player_id": "human1"}
+        assert events[2]["version"] == room.version
+        asyncio.run(room_manager.remove_room(room.id))
+
+    def test_rapid_actions_coalesce_per_tick(self):
+        """Ações dentro de um tick saem num frame só, com todos os eventos em ordem"""
+        manager = ConnectionManager(broadcast_rate=20)
+        room, websocket = create_connected_room(manager, bot_count=3)
+        manager.game_engine.start_game(room, 4)
+        expected = []
+
+        async def scenario():
+            await manager.broadcast_room_state(room.id)
+            await manager.drain()
+            for _ in range(4):
+                bot = GameStateManager.get_player_by_id(room, room.current_turn)
+                if not bot.is_bot:
+                    break
+                result = manager.game_engine.apply_action(room, bot.id, manager.bot_manager.get_bot_action(room, bot))
+                expected.extend(result["events"])
+                await manager._handle_game_events(room, result["events"])
+                manager.bot_scheduler.stop(room.id)
+            await asyncio.sleep(0.1)  # Próximo tick
+            await manager.drain()
+
+        asyncio.run(scenario())
+        frame = json.loads(websocket.sent[-1])
+
+        assert len(websocket.sent) == 2
+        assert frame["events"][:-1] == expected
+        assert frame["events"][-1]["version"] == room.version == 2
+        asyncio.run(room_manager.remove_room(room.id))
+
+    def test_ticker_bounds_flush_rate(self):
+        """Mudanças contínuas geram no máximo `rate` envios por segundo"""
+        flushed = []
+        ticker = BroadcastTicker(flushed.append, rate=20)
+
+        async def scenario():
+            for _ in range(50):
+                ticker.mark_dirty("room1")
+                await asyncio.sleep(0.005)
+            await asyncio.sleep(0.06)
+
+        asyncio.run(scenario())
+
+        assert 3 <= len(flushed) <= 7  # ~0.3s a 20 Hz, sendo o primeiro imediato
+        assert ticker.pending_count() == 0
+
+class TestConnectionOutbox:
+    """Testes para as filas de saída por conexão"""
+
+    def test_slow_client_does_not_block_room(self):
+        """O broadcast só enfileira: o cliente rápido recebe sem esperar o lento"""
+        manager = ConnectionManager()
+        room, fast = create_connected_room(manager, bot_count=0)
+        room_manager.join_room(room.id, "Bob", "human2")
+        slow = SlowWebSocket(0.5)
+        manager.active_connections["human2"] = slow
+        manager.player_connections[slow] = "human2"
+
+        async def scenario():
+            start = time.perf_counter()
+            await manager.broadcast_to_room(room.id, {"event": "chat", "message": "oi"})
+            await manager.outboxes["human1"].drain()
+            return time.perf_counter() - start
+
+        elapsed = asyncio.run(scenario())
+
+        assert elapsed < 0.2
+        assert len(fast.sent) == 1 and slow.sent == []
+        asyncio.run(room_manager.remove_room(room.id))
+
+    def test_overflow_policies(self):
+        """room_state é coalescido, chat é descartado e a fila cheia desconecta"""
+        websocket = SlowWebSocket(10)
+
+        async def scenario():
+            outbox = ConnectionOutbox(websocket, "p1", soft_limit=3, hard_limit=5)
+            outbox.send("state 1", "room_state")
+            await asyncio.sleep(0)  # A escritora pega "state 1" e trava no envio
+            for i in range(3):
+                outbox.send(f"event {i}", "card_played")
+            outbox.send("state 2", "room_state")
+            outbox.send("state 3", "room_state")
+            chat_sent = outbox.send("hello", "chat")
+            queued = [text for _, text in outbox.queue]
+            outbox.send("event 3", "card_played")
+            overflow = outbox.send("event 4", "card_played")
+            await asyncio.sleep(0)
+            return outbox, queued, chat_sent, overflow
+
+        outbox, queued, chat_sent, overflow = asyncio.run(scenario())
+
+        assert queued == ["event 0", "event 1", "event 2", "state 3"]
+        assert not chat_sent
+        assert not overflow
+        assert outbox.closed
+        assert websocket.close_code == 1013
+        assert outbox.stats()["coalesced"] == 1 and outbox.stats()["dropped"] == 1
+
+    def test_send_timeout_disconnects(self):
+        """Um envio travado além do prazo fecha a conexão"""
+        websocket = SlowWebSocket(10)
+
+        async def scenario():
+            outbox = ConnectionOutbox(websocket, "p1", send_timeout=0.05)
+            outbox.send("state", "room_state")
+            await asyncio.sleep(0.2)
+            return outbox
+
+        outbox = asyncio.run(scenario())
+
+        assert outbox.closed
+        assert websocket.close_code == 1013
+
+class TestWireCodecs:
+    """Testes para as codificações do websocket"""
+
+    def test_negotiation_defaults_to_json(self):
+        """Sem subprotocolo suportado, a conexão fica no JSON de sempre"""
+        assert negotiate([]) is None
+        assert negotiate(["unknown", "somo.json"]) == "somo.json"
+        assert get_codec(None) is JSON_CODEC
+        assert get_codec("unknown") is JSON_CODEC
+
+    def test_compact_codes_round_trip(self):
+        """Nomes de campos e eventos viram códigos; ids desconhecidos passam como texto"""
+        message = {"event": "room_patch", "base": 1, "players": {"p-1": {"hand_count": 3}}}
+        compacted = compact(message)
+
+        assert all(isinstance(key, int) for key in compacted)
+        assert "p-1" in compacted[FIELD_CODES["players"]]
+        assert expand(compacted) == message
+
+    def test_binary_connection_gets_same_state(self):
+        """Um cliente msgpack recebe o mesmo conteúdo que um cliente JSON"""
+        pytest.importorskip("msgpack")
+        codec = CODECS["somo.msgpack.v1"]
+        manager = ConnectionManager()
+        room, json_socket = create_connected_room(manager, bot_count=1)
+        room_manager.join_room(room.id, "Bob", "human2")
+        binary_socket = FakeWebSocket()
+        manager.active_connections["human2"] = binary_socket
+        manager.player_connections[binary_socket] = "human2"
+        manager.codecs["human2"] = codec
+        manager.game_engine.start_game(room, 2)
+
+        async def scenario():
+            await manager.broadcast_room_state(room.id)
+            await manager.drain()
+            bot = next(p for p in room.players if p.is_bot)
+            room.current_turn = bot.id
+            result = manager.game_engine.apply_action(room, bot.id, manager.bot_manager.get_bot_action(room, bot))
+            await manager._handle_game_events(room, result["events"])
+            manager.bot_scheduler.stop(room.id)
+            await manager.drain()
+            await manager.handle_message(binary_socket, codec.encode({"action": "resync", "room_id": room.id}))
+            await manager.drain()
+
+        asyncio.run(scenario())
+        json_frames = [json.loads(m) for m in json_socket.sent]
+        binary_frames = [codec.decode(m) for m in binary_socket.sent]
+
+        assert all(isinstance(m, bytes) for m in binary_socket.sent)
+        assert json_frames[0]["room"] == binary_frames[0]["room"]
+        assert json_frames[1]["events"][:-1] == binary_frames[1]["events"][:-1]
+        assert binary_frames[2]["event"] == "room_state" and binary_frames[2]["version"] == room.version
+        assert len(binary_socket.sent[1]) < len(json_socket.sent[1])
+        asyncio.run(room_manager.remove_room(room.id))
+
+    @pytest.mark.parametrize("name", ["somo.json", "somo.msgpack.v1", "somo.cbor.v1"])
+    def test_joined_frames_decode(self, name):
+        """Mapas e listas montados com join_map/join_array decodificam, inclusive acima de 15/23 itens"""
+        if name not in CODECS:
+            pytest.skip(f"{name} not installed")
+        codec = CODECS[name]
+
+        # 5: cabeçalho curto; 20: map16/array16 do msgpack; 30: uint8 do CBOR; 300: uint16 do CBOR
+        for count in (5, 20, 30, 300):
+            items = list(range(count))
+            assert codec.decode(codec.join_array([codec.encode(item) for item in items])) == items
+
+        for count in (5, 20, 30):
+            fields = {field: index for index, field in enumerate(FIELD_CODES) if field not in ("event", "action")}
+            message = dict(list(fields.items())[:count])
+            assert codec.decode(codec.join_map([(key, codec.encode(value)) for key, value in message.items()])) == message
+
+    def test_benchmark_round_trips(self):
+        """O benchmark grava tráfego real e todos os codecs o reproduzem"""
+        messages = record_traffic(1, players=3, seed=1)
+        report = compare_codecs(messages, repeats=1)
+
+        assert report["frames"] == len(messages) > 2
+        assert report["codecs"]["somo.json"]["size_vs_json"] == 1.0
+
+class TestMessageDispatch:
+    """Testes para a leitura validada e o despacho das mensagens recebidas"""
+
+    def send(self, manager: ConnectionManager, websocket: FakeWebSocket, message: str) -> list:
+        async def scenario():
+            await manager.handle_message(websocket, message)
+            await manager.drain()
+
+        websocket.sent.clear()
+        asyncio.run(scenario())
+        return received_events(websocket)
+
+    def test_errors_keep_their_codes(self):
+        """JSON inválido, ação desconhecida e campos inválidos mantêm os códigos de erro"""
+        manager = ConnectionManager()
+        room, websocket = create_connected_room(manager, bot_count=1)
+
+        assert self.send(manager, websocket, "{bad")[0]["code"] == "INVALID_JSON"
+        unknown = self.send(manager, websocket, json.dumps({"action": "fly", "room_id": room.id}))[0]
+        assert unknown["code"] == "UNKNOWN_ACTION" and unknown["message"] == "Unknown action: fly"
+        assert self.send(manager, websocket, json.dumps({"room_id": room.id}))[0]["code"] == "UNKNOWN_ACTION"
+        assert self.send(manager, websocket, json.dumps({"action": "play_card", "room_id": room.id}))[0]["code"] == "PLAY_CARD_ERROR"
+        assert self.send(manager, websocket, "[1, 2]")[0]["code"] == "INVALID_MESSAGE"
+        asyncio.run(room_manager.remove_room(room.id))
+
+    def test_valid_action_reaches_handler(self):
+        """Uma ação válida chega ao handler já como modelo"""
+        manager = ConnectionManager()
+        room, websocket = create_connected_room(manager, bot_count=1)
+        received = []
+
+        async def handler(player_id, action):
+            received.append((player_id, action))
+
+        manager.handlers["chat"] = (handler, "CHAT_ERROR")
+        self.send(manager, websocket, json.dumps({"action": "chat", "room_id": room.id, "message": "oi"}))
+
+        assert received[0][0] == "human1"
+        assert isinstance(received[0][1], ChatAction) and received[0][1].message == "oi"
+        asyncio.run(room_manager.remove_room(room.id))
+
+    def test_benchmark_paths_agree(self):
+        """As duas leituras do benchmark aceitam a mesma mistura de mensagens"""
+        messages = make_messages(200)
+        report = compare_dispatch(messages, repeats=1)
+
+        assert report["messages"] == 200
+        assert {"legacy", "adapter"} <= set(report["results"])
+
+class TestSessionResume:
+    """Testes para a retomada de sessão (assento reservado e reenvio do que foi perdido)"""
+
+    def start(self, grace: float = 60):
+        manager = ConnectionManager(resume_grace=grace)
+        room, websocket = create_connected_room(manager, bot_count=2)
+        manager.game_engine.start_game(room, 5)
+        return manager, room, websocket
+
+    def play_bot_turn(self, manager: ConnectionManager, room: RoomState) -> list:
+        bot = next(p for p in room.players if p.is_bot)
+        room.current_turn = bot.id
+        result = manager.game_engine.apply_action(room, bot.id, manager.bot_manager.get_bot_action(room, bot))
+        manager._queue_events(room, result["events"])
+        manager.broadcast_ticker.flush_now(room.id)
+        return result["events"]
+
+    def test_seat_held_until_grace_expires(self):
+        """Quem cai mantém o assento na janela; depois sai da sala"""
+        manager, room, websocket = self.start(grace=0.05)
+
+        async def scenario():
+            manager.start_session("human1")
+            manager.disconnect(websocket)
+            held = room_manager.player_to_room.get("human1") == room.id and manager.sessions.held_count() == 1
+            await asyncio.sleep(0.1)
+            return held
+
+        assert asyncio.run(scenario())
+        assert "human1" not in room_manager.player_to_room
+        assert manager.sessions.resume(manager.sessions.player_tokens.get("human1")) is None
+        asyncio.run(room_manager.remove_room(room.id))
+
+    def test_inactive_room_cleanup_releases_room_state(self):
+        """A limpeza de salas inativas também descarta buffer de retomada, flush agendado e eventos pendentes"""
+        manager, room, websocket = self.start()
+
+        async def scenario():
+            self.play_bot_turn(manager, room)
+            bot = next(p for p in room.players if p.is_bot)
+            room.current_turn = bot.id
+            result = manager.game_engine.apply_action(room, bot.id, manager.bot_manager.get_bot_action(room, bot))
+            manager._queue_events(room, result["events"])
+            pending = (room.id in manager.replay_buffer.rooms, room.id in manager.broadcast_ticker.timers,
+                       room.id in manager.pending_events)
+
+            room_manager.room_last_activity[room.id] = time.time() - 3600
+            await room_manager._cleanup_inactive_rooms()
+            return pending
+
+        assert asyncio.run(scenario()) == (True, True, True)
+        assert room.id not in room_manager.rooms
+        assert room.id not in manager.replay_buffer.rooms
+        assert room.id not in manager.broadcast_ticker.timers
+        assert room.id not in manager.broadcast_ticker.last_flush
+        assert room.id not in manager.pending_events
+
+    def test_resume_replays_only_missed_events(self):
+        """Ao voltar, o jogador recebe só os eventos perdidos e um patch desde a sua versão"""
+        manager, room, websocket = self.start()
+        resumed = FakeWebSocket()
+
+        async def scenario():
+            manager.start_session("human1")
+            await manager.broadcast_room_state(room.id)
+            await manager.drain()
+            token = received_events(websocket)[0]["resume_token"]
+            seen = (room.version, json.loads(manager.public_room_json(room)))
+            manager.disconnect(websocket)
+
+            missed = self.play_bot_turn(manager, room) + self.play_bot_turn(manager, room)
+            player_id = manager.sessions.resume(token)
+            await manager.connect(resumed, player_id)
+            manager.start_session(player_id, True, seen[0])
+            await manager.drain()
+            return player_id, seen, missed
+
+        player_id, (version, public), missed = asyncio.run(scenario())
+        session, batch = [json.loads(m) for m in resumed.sent]
+        patch = batch["events"][-1]
+
+        assert player_id == "human1" and session["resumed"] is True
+        assert batch["events"][:-1] == missed
+        assert patch["event"] == "room_patch" and (patch["base"], patch["version"]) == (version, room.version)
+        assert apply_patch(public, patch) == json.loads(manager.public_room_json(room))
+        assert manager.sessions.held_count() == 0
+        asyncio.run(room_manager.remove_room(room.id))
+
+    def test_resume_outside_buffer_gets_full_state(self):
+        """Versão que já saiu do buffer (ou desconhecida) recebe o estado completo"""
+        manager, room, websocket = self.start()
+        manager.replay_buffer.size = 2
+
+        async def scenario():
+            manager.start_session("human1")
+            manager.disconnect(websocket)
+            for _ in range(3):
+                self.play_bot_turn(manager, room)
+            resumed = FakeWebSocket()
+            await manager.connect(resumed, manager.sessions.resume(manager.sessions.player_tokens["human1"]))
+            manager.start_session("human1", True, 0)
+            await manager.drain()
+            return resumed
+
+        events = received_events(asyncio.run(scenario()))
+
+        assert [e["event"] for e in events] == ["session", "room_state"]
+        assert events[1]["version"] == room.version
+        asyncio.run(room_manager.remove_room(room.id))
@@ -0,0 +1,39 @@
+import sys
+import os
+
+# Adiciona o diretório pai ao path para importar os módulos
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from app.sim import play_game, run_simulation
+
+class TestSimulator:
+    """Testes para o simulador headless de partidas entre bots"""
+    
+    def test_play_game_is_reproducible(self):
+        """A mesma semente produz a mesma partida"""
+        first = play_game(7, ["LOW", "MID", "HIGH"])
+        second = play_game(7, ["LOW", "MID", "HIGH"])
+        
+        assert first == second
+        assert first["winner"] in (0, 1, 2)
+        assert first["turns"] > 0
+        # O vencedor é o único que não perdeu os 3 tokens
+        assert sorted(first["penalties"]).count(3) == 2
+    
+    def test_run_simulation_report(self):
+        """O relatório agrega vitórias, turnos e punições"""
+        report = run_simulation(20, ["MID", "MID", "HIGH"], seed=1, workers=1, batch_size=8)
+        
+        assert report["games"] == 20
+        assert report["unfinished"] == 0
+        assert set(report["win_rate"]) == {"MID", "HIGH"}
+        assert abs(report["win_rate"]["MID"] * 2 + report["win_rate"]["HIGH"] - 1) < 1e-6
+        assert sum(report["penalties"]["histogram"].values()) == 20
+    
+    def test_process_pool_matches_inline(self):
+        """Rodar em vários processos dá o mesmo resultado que rodar inline"""
+        inline = run_simulation(12, seed=3, workers=1, batch_size=4)
+        pooled = run_simulation(12, seed=3, workers=2, batch_size=4)
+        
+        for key in ("avg_turns", "win_rate", "penalties"):
+            assert inline[key] == pooled[key]
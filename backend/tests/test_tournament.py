@@ -0,0 +1,61 @@
+import sys
+import os
+
+# Adiciona o diretório pai ao path para importar os módulos
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from app.engine.bots import MCTS_TIME_BUDGET
+from app.tournament import fit_elo, match_strategies, play_match, run_tournament, swiss_tables, table_tasks
+
+class TestTournament:
+    """Testes para o torneio entre estratégias de bot"""
+    
+    def test_play_match_ranks(self):
+        """A partida é reprodutível e termina com um único primeiro lugar"""
+        first = play_match(5, ["LOW", "MID", "HIGH"])
+        second = play_match(5, ["LOW", "MID", "HIGH"])
+        
+        assert first["ranks"] == second["ranks"]
+        assert first["finished"]
+        assert sorted(first["ranks"])[:2] == [0, 2]  # Vencedor, depois o último eliminado
+        assert set(first["latencies"]) == {"LOW", "MID", "HIGH"}
+    
+    def test_tables_rotate_seats(self):
+        """Cada inscrito passa por todos os assentos com as mesmas sementes"""
+        tasks = table_tasks(("A", "B", "C"), 3, seed=10)
+        
+        assert [seed for seed, _ in tasks] == [10, 11, 12]
+        assert {seats[0] for _, seats in tasks} == {"A", "B", "C"}
+        assert swiss_tables(["A", "B", "C", "D"], {"D": 2, "C": 1}, 3) == [("D", "C", "A"), ("C", "A", "B")]
+    
+    def test_fit_elo(self):
+        """3 vitórias em 4 valem ~190 pontos de Elo; a média fica em 1500"""
+        pairs = [("A", "B", 1.0)] * 300 + [("A", "B", 0.0)] * 100
+        elo = fit_elo(pairs, ["A", "B"])
+        
+        assert abs(elo["A"] + elo["B"] - 3000) < 1e-6
+        assert 185 < elo["A"] - elo["B"] < 192
+    
+    def test_round_robin_report(self):
+        """O relatório traz Elo com intervalo e latência por inscrito; pool = inline"""
+        inline = run_tournament(["LOW", "MID", "HIGH"], games_per_table=12, workers=1, batch_size=5, bootstrap=20)
+        pooled = run_tournament(["LOW", "MID", "HIGH"], games_per_table=12, workers=2, batch_size=5, bootstrap=20)
+        
+        assert inline["games"] == 12
+        for row in inline["standings"]:
+            low, high = row["elo_ci"]
+            assert low <= row["elo"] <= high
+            assert row["games"] == 12
+            assert row["latency"]["decisions"] > 0
+        
+        strip = lambda report: [{k: v for k, v in row.items() if k != "latency"} for row in report["standings"]]
+        assert strip(inline) == strip(pooled)
+    
+    def test_expert_budget_is_per_run(self):
+        """O orçamento do EXPERT vale só para o torneio que o pediu, mesmo rodando no processo atual"""
+        report = run_tournament(["LOW", "EXPERT"], table_size=2, games_per_table=1, workers=1,
+                                bootstrap=0, expert_budget=0.002)
+        
+        assert report["games"] == 1
+        assert match_strategies(0.002)["EXPERT"].search.time_budget == 0.002
+        assert match_strategies()["EXPERT"].search.time_budget == MCTS_TIME_BUDGET
@@ -0,0 +1,62 @@
+import sys
+import os
+import json
+
+import pytest
+
+# Adiciona o diretório pai ao path para importar os módulos
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from app.engine.bots import BotManager, GreedyBotStrategy, load_bot_params
+from app.tuner import Tuner, default_params, save_params
+
+class TestTuner:
+    """Testes para o ajuste de parâmetros dos bots"""
+    
+    def test_candidates_share_seeds(self):
+        """Candidatos iguais na mesma etapa têm exatamente o mesmo resultado"""
+        tuner = Tuner("MID", ["LOW", "HIGH"], seed=3, workers=1)
+        params = default_params("MID")
+        first, second = tuner.evaluate([params, dict(params)], 12)
+        
+        assert first == second
+        assert len(first) == 12
+        assert tuner.grid(3)[0] == {"reset_threshold": 0.0, "danger_threshold": 0.0}
+        assert len(tuner.grid(3)) == 9
+    
+    def test_grid_writes_loadable_params(self, tmp_path):
+        """O arquivo gerado é aceito pelo carregador do servidor"""
+        path = str(tmp_path / "bot_params.json")
+        with open(path, "w") as f:
+            json.dump({"MID": {"reset_threshold": 0.4}, "_note": "kept"}, f)
+        
+        report = Tuner("MID", ["LOW", "MID"], workers=1).run("grid", games=10, validation_games=20, steps=2)
+        save_params(path, report)
+        params = load_bot_params(path)
+        
+        assert report["default"]["params"] == default_params("MID")
+        assert params["MID"] == report["best"]["params"]
+        with open(path) as f:
+            assert json.load(f)["_note"] == "kept"  # Outras chaves do arquivo são mantidas
+    
+    def test_bot_manager_uses_params(self):
+        """Parâmetros carregados trocam a estratégia e invalidam o cache de decisões"""
+        manager = BotManager({"MID": {"reset_threshold": 0.9}})
+        
+        assert isinstance(manager.strategies["MID"], GreedyBotStrategy)
+        assert manager.strategies["MID"].reset_threshold == 0.9
+        assert manager.strategies["MID"].danger_threshold == 0.8
+        assert manager.decision_cache.stats()["entries"] == 0
+        with pytest.raises(ValueError):
+            Tuner("LOW", ["MID"])
+    
+    def test_defensive_threshold_not_tunable(self, tmp_path):
+        """O limiar da Defensive não muda jogadas, então não é ajustável"""
+        path = str(tmp_path / "bot_params.json")
+        with open(path, "w") as f:
+            json.dump({"HIGH": {"reset_threshold": 0.4}}, f)
+        
+        with pytest.raises(ValueError):
+            load_bot_params(path)
+        with pytest.raises(ValueError):
+            Tuner("HIGH", ["MID"])
@@ -1,5 +1,7 @@
-import { ServerEvent, ClientAction } from '../types';
+import { ServerEvent, BatchEvent, ClientAction } from '../types';
 
+// Token de retomada da sessão (sobrevive a recarregar a aba)
+const RESUME_TOKEN_KEY = 'somo.resume_token';
 
 export class WebSocketClient {
   private ws: WebSocket | null = null;
@@ -8,6 +10,8 @@ export class WebSocketClient {
   private maxReconnectAttempts = 5;
   private reconnectDelay = 1000;
   private eventHandlers: Map<string, (event: ServerEvent) => void> = new Map();
+  private resumeToken: string | null = sessionStorage.getItem(RESUME_TOKEN_KEY);
+  private resumeVersion: () => number = () => 0;
   private connectionHandlers: {
     onConnect?: () => void;
     onDisconnect?: () => void;
@@ -21,7 +25,7 @@ export class WebSocketClient {
   connect(): Promise<void> {
     return new Promise((resolve, reject) => {
       try {
-        this.ws = new WebSocket(this.url);
+        this.ws = new WebSocket(this.buildUrl());
 
         this.ws.onopen = () => {
           console.log('WebSocket connected');
@@ -32,19 +36,15 @@ export class WebSocketClient {
 
         this.ws.onmessage = (event) => {
           try {
-            const data: ServerEvent = JSON.parse(event.data);
+            const data: ServerEvent | BatchEvent = JSON.parse(event.data);
             console.log('Received:', data);
             
-            // Chama handler específico do evento
-            const handler = this.eventHandlers.get(data.event);
-            if (handler) {
-              handler(data);
-            }
-            
-            // Chama handler genérico
-            const genericHandler = this.eventHandlers.get('*');
-            if (genericHandler) {
-              genericHandler(data);
+            // Envelope com tudo o que uma ação produziu: eventos na ordem,
+            // estado da sala por último (os updates do React saem num render só)
+            if (data.event === 'batch') {
+              data.events.forEach(inner => this.dispatch(inner));
+            } else {
+              this.dispatch(data);
             }
           } catch (error) {
             console.error('Error parsing WebSocket message:', error);
@@ -72,6 +72,39 @@ export class WebSocketClient {
     });
   }
 
+  // Com um token, a reconexão retoma a sessão (mesmo jogador e assento) e o
+  // servidor manda só o que foi perdido desde a última versão recebida
+  private buildUrl(): string {
+    if (!this.resumeToken) {
+      return this.url;
+    }
+    const separator = this.url.includes('?') ? '&' : '?';
+    const params = new URLSearchParams({
+      resume: this.resumeToken,
+      version: String(this.resumeVersion())
+    });
+    return `${this.url}${separator}${params}`;
+  }
+
+  private dispatch(data: ServerEvent) {
+    if (data.event === 'session') {
+      this.resumeToken = data.resume_token;
+      sessionStorage.setItem(RESUME_TOKEN_KEY, data.resume_token);
+    }
+
+    // Chama handler específico do evento
+    const handler = this.eventHandlers.get(data.event);
+    if (handler) {
+      handler(data);
+    }
+    
+    // Chama handler genérico
+    const genericHandler = this.eventHandlers.get('*');
+    if (genericHandler) {
+      genericHandler(data);
+    }
+  }
+
   private scheduleReconnect() {
     this.reconnectAttempts++;
     const delay = this.reconnectDelay * Math.pow(2, this.reconnectAttempts - 1);
@@ -83,7 +116,15 @@ export class WebSocketClient {
     }, delay);
   }
 
+  // Última versão da sala que o cliente tem (enviada ao retomar a sessão)
+  setResumeVersion(provider: () => number) {
+    this.resumeVersion = provider;
+  }
+
   disconnect() {
+    // Saída intencional: a sessão não é retomada
+    this.resumeToken = null;
+    sessionStorage.removeItem(RESUME_TOKEN_KEY);
     if (this.ws) {
       this.ws.close(1000, 'Client disconnect');
       this.ws = null;
@@ -191,7 +232,14 @@ export const gameActions = {
     });
   },
 
-  addBot: (roomId: string, difficulty: 'LOW' | 'MID' | 'HIGH' = 'LOW') => {
+  resync: (roomId: string) => {
+    wsClient.send({
+      action: 'resync',
+      room_id: roomId
+    });
+  },
+
+  addBot: (roomId: string, difficulty: 'LOW' | 'MID' | 'HIGH' | 'EXPERT' | 'MASTER' = 'LOW') => {
     wsClient.send({
       action: 'add_bot',
       room_id: roomId,
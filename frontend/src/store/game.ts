@@ -1,5 +1,5 @@
 import { create } from 'zustand';
-import { GameState, ServerEvent, ChatMessage, Notification } from '../types';
+import { GameState, RoomState, ServerEvent, ChatMessage, Notification } from '../types';
 import { wsClient, gameActions } from '../api/ws';
 
 interface GameStore extends GameState {
@@ -18,7 +18,7 @@ interface GameStore extends GameState {
   passTurn: () => void;
   
   // Bot actions
-  addBot: (difficulty?: 'LOW' | 'MID' | 'HIGH') => void;
+  addBot: (difficulty?: 'LOW' | 'MID' | 'HIGH' | 'EXPERT' | 'MASTER') => void;
   
   // Chat actions
   sendChat: (message: string) => void;
@@ -42,6 +42,7 @@ const initialState: GameState = {
   connected: false,
   connecting: false,
   room: undefined,
+  roomVersion: 0,
   selfHand: [],
   currentView: 'lobby',
   showChat: false,
@@ -79,6 +80,7 @@ export const useGameStore = create<GameStore>((set, get) => ({
 
       // Setup message handler
       wsClient.on('*', get().handleServerEvent);
+      wsClient.setResumeVersion(() => get().roomVersion);
 
       // Connect
       await wsClient.connect();
@@ -200,15 +202,50 @@ export const useGameStore = create<GameStore>((set, get) => ({
     const state = get();
 
     switch (event.event) {
+      case 'session':
+        // Sessão nova com uma sala na tela: o assento expirou durante a queda
+        if (!event.resumed && state.room) {
+          set({ room: undefined, roomVersion: 0, selfHand: [], playedCards: [], currentView: 'lobby' });
+          state.addNotification('warning', 'Sua sessão expirou; você saiu da sala');
+        }
+        set({ selfId: event.player_id });
+        break;
+
       case 'room_state':
         set({
           room: event.room,
+          roomVersion: event.version,
           selfHand: event.self_hand || [],
           currentView: 'room',
           selfId: event.self_id
         });
         break;
 
+      case 'room_patch': {
+        // Patch já coberto por um estado completo mais novo: ignora
+        if (state.room?.id === event.room_id && event.version <= state.roomVersion) {
+          break;
+        }
+
+        // Patch fora de sequência (mensagem perdida): pede o estado completo
+        if (!state.room || state.room.id !== event.room_id || event.base !== state.roomVersion) {
+          gameActions.resync(event.room_id);
+          break;
+        }
+
+        const room: RoomState = { ...state.room, ...event.set };
+        const changed = event.players;
+        if (changed) {
+          room.players = room.players.map(p => (changed[p.id] ? { ...p, ...changed[p.id] } : p));
+        }
+        set({
+          room,
+          roomVersion: event.version,
+          ...(event.self_hand ? { selfHand: event.self_hand } : {})
+        });
+        break;
+      }
+
         case 'round_started':
           state.addNotification('info', `Nova rodada! Limite: ${event.limit}`);
           set({ playedCards: [] }); // limpa a mesa
@@ -87,7 +87,13 @@ export interface ChatAction {
 export interface AddBotAction {
   action: 'add_bot';
   room_id: string;
-  difficulty?: 'LOW' | 'MID' | 'HIGH';
+  difficulty?: 'LOW' | 'MID' | 'HIGH' | 'EXPERT' | 'MASTER';
+}
+
+// Pede o estado completo da sala (o cliente perdeu uma versão)
+export interface ResyncAction {
+  action: 'resync';
+  room_id: string;
 }
 
 export type ClientAction = 
@@ -98,16 +104,29 @@ export type ClientAction =
   | PlaySpecialAction 
   | PassTurnAction 
   | ChatAction 
-  | AddBotAction;
+  | AddBotAction
+  | ResyncAction;
 
 // Eventos do servidor para o cliente
 export interface RoomStateEvent {
   event: 'room_state';
+  version: number;
   room: RoomState;
   self_hand?: CardComp[];
   self_id: string;
 }
 
+// Só o que mudou desde a versão `base` (ver backend/app/services/room_sync.py)
+export interface RoomPatchEvent {
+  event: 'room_patch';
+  room_id: string;
+  base: number;
+  version: number;
+  set?: Partial<RoomState>;
+  players?: Record<string, Partial<PlayerState>>;
+  self_hand?: CardComp[];
+}
+
 export interface RoundStartedEvent {
   event: 'round_started';
   limit: number;
@@ -175,8 +194,18 @@ export interface ChatEvent {
   message: string;
 }
 
+// Token para retomar a sessão após uma queda (ver backend/app/services/sessions.py)
+export interface SessionEvent {
+  event: 'session';
+  player_id: string;
+  resume_token: string;
+  resumed: boolean;
+}
+
 export type ServerEvent = 
+  | SessionEvent 
   | RoomStateEvent 
+  | RoomPatchEvent 
   | RoundStartedEvent 
   | CardPlayedEvent 
   | EffectSetEvent 
@@ -190,6 +219,12 @@ export type ServerEvent =
   | ErrorEvent 
   | ChatEvent;
 
+// Envelope com os eventos de uma ação e o estado resultante (último item)
+export interface BatchEvent {
+  event: 'batch';
+  events: ServerEvent[];
+}
+
 // Estado do jogo no cliente
 export interface GameState {
   // Conexão
@@ -198,6 +233,7 @@ export interface GameState {
   
   // Sala atual
   room?: RoomState;
+  roomVersion: number;
   selfHand: CardComp[];
   
   // UI
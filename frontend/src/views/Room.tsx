@@ -283,6 +283,18 @@ const Room: React.FC = () => {
                 >
                   HIGH <Bot size={18} />
                 </Button>
+                <Button
+                  onClick={() => addBot('EXPERT')}
+                  className="flex items-center justify-center px-4 py-2 bg-transparent border border-[#9370DB] text-[#9370DB] hover:bg-[#9370DB] hover:text-black transition-colors"
+                >
+                  EXPERT <Bot size={18} />
+                </Button>
+                <Button
+                  onClick={() => addBot('MASTER')}
+                  className="flex items-center justify-center px-4 py-2 bg-transparent border border-[#FF6347] text-[#FF6347] hover:bg-[#FF6347] hover:text-black transition-colors"
+                >
+                  MASTER <Bot size={18} />
+                </Button>
               </div>
             )}
 